@@ -14,7 +14,9 @@ from flask_wtf.csrf import CSRFProtect
 # Local application imports
 from audit import init_audit
 from config import config
+from due_scheduler import init_due_scheduler
 from extensions import db, migrate, login_manager
+from maintenance import init_maintenance
 from models import User
 
 # Load environment variables from .env if present
@@ -105,6 +107,12 @@ init_limiter(limiter)
 # Initialize Audit System
 init_audit(app, start_cleanup_thread=True)
 
+# Initialize background maintenance (rolling reminder horizon, reminder archive, adherence rollups)
+init_maintenance(app, start_materializer=True)
+
+# Initialize due reminder push (per-process heap scheduler feeding the calendar reminder stream)
+init_due_scheduler(app)
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
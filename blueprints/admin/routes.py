@@ -4,6 +4,7 @@ from models import AuditLog
 from audit import get_audit_system_stats, _audit_batcher, cleanup_old_audit_logs
 from forms import AuditForm
 from blueprints.core.decorators import roles_required, role_required
+from blueprints.core.history_cache import get_history_cache_stats
 
 admin_bp = Blueprint('admin', __name__, url_prefix='')
 
@@ -21,9 +22,10 @@ def admin_audit_logs():
     per_page = 25
     logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).paginate(page=page, per_page=per_page, error_out=False)
     audit_stats = get_audit_system_stats() if current_user.role == 'superadmin' else None
+    history_cache_stats = get_history_cache_stats() if current_user.role == 'superadmin' else None
     flush_form = AuditForm()
     cleanup_form = AuditForm()
-    return render_template('admin_audit_logs.html', logs=logs, current_user=current_user, audit_stats=audit_stats, flush_form=flush_form, cleanup_form=cleanup_form)
+    return render_template('admin_audit_logs.html', logs=logs, current_user=current_user, audit_stats=audit_stats, history_cache_stats=history_cache_stats, flush_form=flush_form, cleanup_form=cleanup_form)
 
 @admin_bp.route('/admin/flush-audit-batch', methods=['POST'])
 @role_required('superadmin')
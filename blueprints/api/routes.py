@@ -1,12 +1,35 @@
-from flask import Blueprint, jsonify, url_for, request
+from flask import Blueprint, current_app, jsonify, url_for, request
 from flask_login import login_required, current_user
-from models import Appointment, DogMedicine, AppointmentType, Dog
+from models import Appointment, DogMedicine, AppointmentType
 from datetime import datetime, timedelta
 from extensions import db
-import re
+from blueprints.core import event_titles
+from blueprints.core.care_search import build_snippet, parse_search_terms, search_care_records
+from blueprints.core.etags import get_rescue_data_version, get_rescue_etag, not_modified, with_etag
+from blueprints.core.recurrence import get_appointment_occurrences, get_recurring_series, single_criterion
+import logging
 
 api_bp = Blueprint('api', __name__, url_prefix='')
 
+# Page size per group for /api/calendar/reminders
+REMINDERS_PAGE_SIZE = 50
+MAX_REMINDERS_PAGE_SIZE = 200
+# Page size for /api/search/care
+CARE_SEARCH_PAGE_SIZE = 20
+MAX_CARE_SEARCH_PAGE_SIZE = 100
+
+def _parse_window_param(value):
+    """Parse a FullCalendar start/end parameter into a naive local datetime (None if missing or invalid)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace(' ', '+'))  # '+' in offsets arrives as a space when not URL-encoded
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
 @api_bp.route('/api/calendar/events')
 @login_required
 def calendar_events_api():
@@ -18,20 +41,52 @@ def calendar_events_api():
         
         events = []
         
+        # Only load the window on screen; FullCalendar sends it as start/end
+        window_start = _parse_window_param(request.args.get('start'))
+        window_end = _parse_window_param(request.args.get('end'))
+        
         # Apply rescue filtering based on user role and parameters
-        if current_user.role == 'superadmin':
-            if rescue_id:
-                # Filter by specific rescue for superadmin
-                appointments = Appointment.query.join(Dog).filter(Dog.rescue_id == rescue_id).options(db.joinedload(Appointment.dog), db.joinedload(Appointment.type)).all()
-                medicines = DogMedicine.query.join(Dog).filter(Dog.rescue_id == rescue_id).options(db.joinedload(DogMedicine.dog), db.joinedload(DogMedicine.preset)).filter(DogMedicine.start_date != None).all()
-            else:
-                # Show all rescues for superadmin when no specific rescue selected
-                appointments = Appointment.query.options(db.joinedload(Appointment.dog), db.joinedload(Appointment.type)).all()
-                medicines = DogMedicine.query.options(db.joinedload(DogMedicine.dog), db.joinedload(DogMedicine.preset)).filter(DogMedicine.start_date != None).all()
-        else:
-            # Regular users only see their rescue's data
-            appointments = Appointment.query.join(Dog).filter(Dog.rescue_id == current_user.rescue_id).options(db.joinedload(Appointment.dog), db.joinedload(Appointment.type)).all()
-            medicines = DogMedicine.query.join(Dog).filter(Dog.rescue_id == current_user.rescue_id).options(db.joinedload(DogMedicine.dog), db.joinedload(DogMedicine.preset)).filter(DogMedicine.start_date != None).all()
+        effective_rescue_id = rescue_id if current_user.role == 'superadmin' else current_user.rescue_id
+        
+        # A user without a rescue has no events (None would mean every rescue's)
+        if effective_rescue_id is None and current_user.role != 'superadmin':
+            return jsonify([])
+        
+        # Unchanged rescue data and window: let the browser reuse its copy
+        etag = get_rescue_etag(effective_rescue_id or None, window_start, window_end)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        appointments_query = Appointment.query.options(db.joinedload(Appointment.dog), db.joinedload(Appointment.type))
+        medicines_query = DogMedicine.query.options(db.joinedload(DogMedicine.dog), db.joinedload(DogMedicine.preset)).filter(DogMedicine.start_date != None)
+        if effective_rescue_id:
+            appointments_query = appointments_query.filter(Appointment.rescue_id == effective_rescue_id)
+            medicines_query = medicines_query.filter(DogMedicine.rescue_id == effective_rescue_id)
+        # Recurring series are expanded below when the window is bounded; otherwise they show as their first occurrence
+        if window_start and window_end:
+            appointments_query = appointments_query.filter(single_criterion())
+        # Appointments overlapping the window are shown, including ones that started before it;
+        # medicine events are drawn on their start date, so only start_date has to fall in the window
+        if window_start:
+            appointments_query = appointments_query.filter(
+                (Appointment.start_datetime >= window_start) | (Appointment.end_datetime > window_start)
+            )
+            medicines_query = medicines_query.filter(DogMedicine.start_date >= window_start.date())
+        if window_end:
+            appointments_query = appointments_query.filter(Appointment.start_datetime < window_end)
+            medicines_query = medicines_query.filter(DogMedicine.start_date <= window_end.date())
+        appointments = appointments_query.all()
+        medicines = medicines_query.all()
+        # Recurring series are expanded into their occurrences in the window only
+        if window_start and window_end:
+            appointments += get_appointment_occurrences(
+                get_recurring_series(effective_rescue_id or None, window_start, window_end).all(),
+                window_start, window_end - timedelta(microseconds=1)
+            )
+        
+        # Per-event title logging is costly on big months; only build it when debugging
+        debug_titles = current_app.logger.isEnabledFor(logging.DEBUG)
         
         # Process appointments
         for appt in appointments:
@@ -43,61 +98,22 @@ def calendar_events_api():
             # Construct URL to dog details, anchoring to the specific appointment if possible
             # This assumes your dog_details page can handle an anchor like #appointment-ID
             event_url = url_for('dogs.dog_details', dog_id=appt.dog_id, _anchor=f"appointment-{appt.id}") if appt.dog_id else '#'
+            event_id = f'appt-{appt.id}-{appt.occurrence_key}' if appt.is_occurrence else f'appt-{appt.id}'
             
             # Format: "DogName: AppointmentType" (pet name first)
-            # Sophisticated data cleaning for complex database structure
             raw_dog_name = appt.dog.name if appt.dog else "Unknown Dog"
             raw_appt_type = appt.type.name if appt.type else (appt.title if appt.title else "Appointment")
-            
-            # Enhanced dog name cleaning - remove various prefixes and codes
-            clean_dog_name = raw_dog_name
-            # Remove patterns like "9-C ", "10-O ", "123-A ", etc.
-            clean_dog_name = re.sub(r'^\d+-[A-Z]+\s+', '', clean_dog_name)
-            # Remove standalone numbers and letters at start
-            clean_dog_name = re.sub(r'^\d+[A-Z]?\s+', '', clean_dog_name)
-            
-            # Enhanced appointment type cleaning and mapping
-            clean_appt_type = raw_appt_type
-            
-            # Map complex product names to simple appointment types
-            appt_type_lower = clean_appt_type.lower()
-            if any(med in appt_type_lower for med in ['rescue', 'nsaid', 'medication', 'medicine', 'drug', 'pill', 'tablet', 'dose']):
-                if any(word in appt_type_lower for word in ['comfort', 'nsaid', 'pain', 'anti-inflammatory']):
-                    clean_appt_type = "Pain Medication"
-                elif any(word in appt_type_lower for word in ['digest', 'probiotic', 'stomach', 'gastro']):
-                    clean_appt_type = "Digestive Medication"
-                elif any(word in appt_type_lower for word in ['vitamin', 'supplement', 'nutrition']):
-                    clean_appt_type = "Vitamin/Supplement"
-                elif any(word in appt_type_lower for word in ['oil', 'omega', 'fatty']):
-                    clean_appt_type = "Nutritional Oil"
-                elif any(word in appt_type_lower for word in ['benadryl', 'diphenhydramine', 'allergy', 'antihistamine']):
-                    clean_appt_type = "Allergy Medication"
-                else:
-                    clean_appt_type = "Medication"
-            elif any(word in appt_type_lower for word in ['vet', 'visit', 'checkup', 'exam', 'doctor']):
-                clean_appt_type = "Vet Visit"
-            elif any(word in appt_type_lower for word in ['groom', 'bath', 'nail', 'trim']):
-                clean_appt_type = "Grooming"
-            elif any(word in appt_type_lower for word in ['adoption', 'adopt', 'home']):
-                clean_appt_type = "Adoption"
-            elif any(word in appt_type_lower for word in ['surgery', 'operation', 'procedure']):
-                clean_appt_type = "Surgery"
-            else:
-                # Clean any remaining rescue/product prefixes
-                clean_appt_type = re.sub(r'^Rescue\w*\s*', '', clean_appt_type, flags=re.IGNORECASE)
-                clean_appt_type = re.sub(r'\s*(NSAID|Probiotic|Multivitamin|Supplement)\s*$', '', clean_appt_type, flags=re.IGNORECASE)
-                if not clean_appt_type.strip():
-                    clean_appt_type = "Appointment"
-            
+            clean_dog_name = event_titles.clean_dog_name(raw_dog_name)
+            clean_appt_type = event_titles.classify_appointment_type(raw_appt_type)
             event_title_str = f"{clean_dog_name}: {clean_appt_type}"
             
-            # Debug logging
-            print(f"[CALENDAR API] Raw dog name: '{raw_dog_name}' -> Clean: '{clean_dog_name}'")
-            print(f"[CALENDAR API] Raw appt type: '{raw_appt_type}' -> Clean: '{clean_appt_type}'")
-            print(f"[CALENDAR API] Final event title: '{event_title_str}'")
+            if debug_titles:
+                current_app.logger.debug(f"[CALENDAR API] Raw dog name: '{raw_dog_name}' -> Clean: '{clean_dog_name}'")
+                current_app.logger.debug(f"[CALENDAR API] Raw appt type: '{raw_appt_type}' -> Clean: '{clean_appt_type}'")
+                current_app.logger.debug(f"[CALENDAR API] Final event title: '{event_title_str}'")
 
             event_data = {
-                'id': f'appt-{appt.id}', # Prefix ID to ensure uniqueness across types
+                'id': event_id, # Prefix ID to ensure uniqueness across types
                 'title': event_title_str,
                 'start': appt.start_datetime.isoformat(),
                 'color': event_color,
@@ -105,6 +121,8 @@ def calendar_events_api():
                 'allDay': False,  # Explicitly set for time-based views
                 'extendedProps': {
                     'eventType': 'appointment',
+                    'appointment_id': appt.id,
+                    'occurrence_key': appt.occurrence_key if appt.is_occurrence else None,
                     'dog_name': appt.dog.name if appt.dog else 'N/A',
                     'dog_id': appt.dog_id,
                     'appointment_type': appt.type.name if appt.type else 'N/A',
@@ -134,40 +152,10 @@ def calendar_events_api():
                 continue
             
             # Format: "DogName: MedicineName" (pet name first)
-            # Sophisticated cleaning for medicine events
             raw_dog_name = med.dog.name if med.dog else 'Unknown Dog'
             raw_med_name = med.custom_name or (med.preset.name if med.preset else "Medicine")
-            
-            # Enhanced dog name cleaning (same as appointments)
-            clean_dog_name = raw_dog_name
-            clean_dog_name = re.sub(r'^\d+-[A-Z]+\s+', '', clean_dog_name)
-            clean_dog_name = re.sub(r'^\d+[A-Z]?\s+', '', clean_dog_name)
-            
-            # Enhanced medicine name cleaning and mapping
-            clean_med_name = raw_med_name
-            med_name_lower = clean_med_name.lower()
-            
-            # Map complex medicine names to user-friendly types
-            if any(med in med_name_lower for med in ['rescue', 'nsaid', 'comfort']):
-                if any(word in med_name_lower for word in ['comfort', 'nsaid', 'pain']):
-                    clean_med_name = "Pain Medication"
-                elif any(word in med_name_lower for word in ['digest', 'probiotic']):
-                    clean_med_name = "Digestive Medication"
-                elif any(word in med_name_lower for word in ['oil', 'omega']):
-                    clean_med_name = "Nutritional Oil"
-                elif any(word in med_name_lower for word in ['vitamin', 'multivitamin']):
-                    clean_med_name = "Vitamin/Supplement"
-                else:
-                    clean_med_name = "Medication"
-            elif any(word in med_name_lower for word in ['benadryl', 'diphenhydramine']):
-                clean_med_name = "Allergy Medication"
-            else:
-                # Clean any remaining rescue/product prefixes
-                clean_med_name = re.sub(r'^Rescue\w*\s*', '', clean_med_name, flags=re.IGNORECASE)
-                clean_med_name = re.sub(r'\s*(NSAID|Probiotic|Multivitamin|Supplement)\s*$', '', clean_med_name, flags=re.IGNORECASE)
-                if not clean_med_name.strip():
-                    clean_med_name = "Medication"
-            
+            clean_dog_name = event_titles.clean_dog_name(raw_dog_name)
+            clean_med_name = event_titles.classify_medicine_name(raw_med_name)
             event_title = f"{clean_dog_name}: {clean_med_name}"
             event_start_datetime = datetime.combine(med.start_date, datetime.min.time()) + timedelta(hours=9)
             event_end_datetime = event_start_datetime + timedelta(hours=1)
@@ -197,7 +185,7 @@ def calendar_events_api():
             })
 
         print(f"[CALENDAR API] Returning {len(events)} events (appointments: {len([e for e in events if e['id'].startswith('appt')])}, medicines: {len([e for e in events if e['id'].startswith('med')])})")
-        return jsonify(events)
+        return with_etag(jsonify(events), etag)
     except Exception as e:
         print(f"Error in calendar_events_api: {e}")
         return jsonify({"error": str(e), "message": "Failed to load calendar events."}), 500
@@ -206,80 +194,133 @@ def calendar_events_api():
 @api_bp.route('/api/calendar/reminders')
 @login_required
 def calendar_reminders_api():
-    """API endpoint for fetching filtered reminders for the calendar page."""
+    """
+    API endpoint for fetching filtered reminders for the calendar page.
+
+    Without a group parameter, returns every group's count and first page.
+    With group and cursor (a group's next_cursor), returns that group's next page.
+    """
     try:
-        from blueprints.core.utils import get_rescue_reminders
-        from models import Reminder, Rescue
-        from collections import defaultdict
+        from blueprints.core.dashboard import get_calendar_reminder_group_page, get_calendar_reminder_groups
+        from blueprints.core.schedules import MISSED_DOSE_LOOKBACK, get_rescue_virtual_doses
+        from blueprints.core.utils import get_effective_rescue_id, has_rescue_scope
+        from models import Rescue
         
         # Get rescue filtering parameters
         rescue_id = request.args.get('rescue_id', type=int)
+        group_name = request.args.get('group')
+        cursor = request.args.get('cursor')
+        limit = min(max(request.args.get('limit', type=int, default=REMINDERS_PAGE_SIZE), 1), MAX_REMINDERS_PAGE_SIZE)
+        if bool(group_name) != bool(cursor):
+            return jsonify({"error": "group and cursor must be given together", "message": "Invalid reminders page request."}), 400
         
         print(f"[REMINDERS API] User: {current_user.email if current_user else 'None'}, Role: {current_user.role if current_user else 'None'}, Requested rescue_id: {rescue_id}")
         
         # Apply rescue filtering based on user role and parameters
-        if current_user.role == 'superadmin':
-            rescues = Rescue.query.order_by(Rescue.name.asc()).all()
-            if rescue_id:
-                reminders_query = get_rescue_reminders(rescue_id).all()
-            else:
-                reminders_query = Reminder.query.filter(Reminder.status == 'pending').order_by(Reminder.due_datetime.asc()).all()
-        else:
-            rescues = None
-            rescue_id = current_user.rescue_id
-            reminders_query = get_rescue_reminders().filter(Reminder.status == 'pending').order_by(Reminder.due_datetime.asc()).all()
+        is_superadmin = current_user.role == 'superadmin'
+        rescue_id = get_effective_rescue_id(rescue_id)
         
-        # Group reminders same as calendar_view route
-        group_order = ["Vet Reminders", "Medication Reminders", "Other Reminders"]
-        grouped_reminders = defaultdict(list)
-        for group in group_order:
-            grouped_reminders[group] = []
+        # A user without a rescue has no reminders (None would mean every rescue's)
+        if not has_rescue_scope(rescue_id):
+            if group_name:
+                return jsonify({'group': group_name, 'reminders': [], 'next_cursor': None, 'selected_rescue_id': None})
+            return jsonify({'grouped_reminders': {}, 'group_counts': {}, 'next_cursors': {}, 'rescues': None,
+                            'selected_rescue_id': None})
         
-        for reminder in reminders_query:
-            group_name = "Other Reminders"
-            specific_type_name_for_grouping = None
-            if reminder.appointment_id and reminder.appointment:
-                if reminder.appointment.type:
-                    specific_type_name_for_grouping = reminder.appointment.type.name
-                    if "vet" in specific_type_name_for_grouping.lower():
-                        group_name = "Vet Reminders"
-                    elif "grooming" in specific_type_name_for_grouping.lower():
-                        group_name = "Grooming Reminders"
-                # else falls to Other Reminders
-            elif reminder.dog_medicine_id:
-                group_name = "Medication Reminders"
-            grouped_reminders[group_name].append(reminder)
+        # The payload only changes with the rescue's data and the day (the dose window is whole days),
+        # plus the rescue list for superadmins
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        etag = get_rescue_etag(rescue_id, today_start.date(), get_rescue_data_version(None) if is_superadmin else '',
+                               group_name, cursor, limit)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
         
-        ordered_final_groups = {group: grouped_reminders[group] for group in group_order if group in grouped_reminders}
-        other_dynamic_groups = {k: v for k, v in sorted(grouped_reminders.items()) if k not in ordered_final_groups and v}
-        ordered_final_groups.update(other_dynamic_groups)
+        # Doses from recent misses through the next week are listed with the medication reminders
+        doses = get_rescue_virtual_doses(rescue_id, today_start - MISSED_DOSE_LOOKBACK,
+                                         today_start + timedelta(days=8) - timedelta(microseconds=1))
         
-        # Convert reminder objects to serializable format
-        reminders_data = {}
-        for group_name, reminders_list in ordered_final_groups.items():
-            if reminders_list:  # Only include groups with reminders
-                reminders_data[group_name] = []
-                for reminder in reminders_list:
-                    reminder_data = {
-                        'id': reminder.id,
-                        'message': reminder.message,
-                        'due_datetime': reminder.due_datetime.strftime('%a, %b %d, %Y @ %I:%M %p UTC'),
-                        'dog_id': reminder.dog.id if reminder.dog else None,
-                        'dog_name': reminder.dog.name if reminder.dog else None,
-                        'appointment_id': reminder.appointment_id,
-                        'dog_medicine_id': reminder.dog_medicine_id
-                    }
-                    reminders_data[group_name].append(reminder_data)
+        if group_name:
+            try:
+                reminders_list, next_cursor = get_calendar_reminder_group_page(rescue_id, group_name, cursor, doses, limit)
+            except ValueError as e:
+                return jsonify({"error": str(e), "message": "Invalid reminders page request."}), 400
+            return with_etag(jsonify({
+                'group': group_name,
+                'reminders': [_serialize_reminder(reminder) for reminder in reminders_list],
+                'next_cursor': next_cursor,
+                'selected_rescue_id': rescue_id
+            }), etag)
+        
+        groups = get_calendar_reminder_groups(rescue_id, doses, limit)
+        rescues = Rescue.query.order_by(Rescue.name.asc()).all() if is_superadmin else None
         
         response_data = {
-            'grouped_reminders': reminders_data,
+            'grouped_reminders': {name: [_serialize_reminder(reminder) for reminder in group['reminders']]
+                                  for name, group in groups.items()},
+            'group_counts': {name: group['count'] for name, group in groups.items()},
+            'next_cursors': {name: group['next_cursor'] for name, group in groups.items()},
             'rescues': [{'id': r.id, 'name': r.name} for r in rescues] if rescues else None,
             'selected_rescue_id': rescue_id
         }
         
-        print(f"[REMINDERS API] Returning {sum(len(group) for group in reminders_data.values())} reminders in {len(reminders_data)} groups")
-        return jsonify(response_data)
+        print(f"[REMINDERS API] Returning {sum(len(group['reminders']) for group in groups.values())} of {sum(response_data['group_counts'].values())} reminders in {len(groups)} groups")
+        return with_etag(jsonify(response_data), etag)
         
     except Exception as e:
         print(f"Error in calendar_reminders_api: {e}")
-        return jsonify({"error": str(e), "message": "Failed to load calendar reminders."}), 500
\ No newline at end of file
+        return jsonify({"error": str(e), "message": "Failed to load calendar reminders."}), 500
+
+
+@api_bp.route('/api/search/care')
+@login_required
+def care_search_api():
+    """
+    Full-text search over dog notes, medical and personality info, care notes
+    and appointment descriptions, best matches first.
+
+    Query parameters: q (the search text), rescue_id (superadmins only),
+    limit and offset.
+    """
+    from blueprints.core.utils import get_effective_rescue_id, has_rescue_scope
+    
+    query_text = request.args.get('q', '').strip()
+    if not parse_search_terms(query_text):
+        return jsonify({"error": "q must contain at least one word", "message": "Enter something to search for."}), 400
+    rescue_id = get_effective_rescue_id(request.args.get('rescue_id', type=int))
+    # A user without a rescue has nothing to search (None would search every rescue)
+    if not has_rescue_scope(rescue_id):
+        return jsonify({'query': query_text, 'results': [], 'next_offset': None, 'selected_rescue_id': None})
+    limit = min(max(request.args.get('limit', type=int, default=CARE_SEARCH_PAGE_SIZE), 1), MAX_CARE_SEARCH_PAGE_SIZE)
+    offset = max(request.args.get('offset', type=int, default=0), 0)
+    
+    matches = search_care_records(query_text, rescue_id=rescue_id, limit=limit + 1, offset=offset)
+    terms = parse_search_terms(query_text)
+    results = [{
+        'source_model': document.source_model,
+        'source_id': document.source_id,
+        'dog_id': document.dog_id,
+        'dog_name': document.dog.name if document.dog else None,
+        'snippet': build_snippet(document.body, terms),
+        'score': float(score),
+        'url': url_for('dogs.dog_history', dog_id=document.dog_id) if document.source_model == 'DogNote'
+               else url_for('dogs.dog_details', dog_id=document.dog_id),
+    } for document, score in matches[:limit]]
+    return jsonify({
+        'query': query_text,
+        'results': results,
+        'next_offset': offset + limit if len(matches) > limit else None,
+        'selected_rescue_id': rescue_id
+    })
+
+
+def _serialize_reminder(reminder):
+    return {
+        'id': reminder.id,
+        'message': reminder.message,
+        'due_datetime': reminder.due_datetime.strftime('%a, %b %d, %Y @ %I:%M %p UTC'),
+        'dog_id': reminder.dog.id if reminder.dog else None,
+        'dog_name': reminder.dog.name if reminder.dog else None,
+        'appointment_id': reminder.appointment_id,
+        'dog_medicine_id': reminder.dog_medicine_id
+    }
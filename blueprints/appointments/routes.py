@@ -11,6 +11,12 @@ from flask_login import current_user, login_required
 from . import appointments_bp
 from blueprints.core.audit_helpers import log_audit_event
 from blueprints.core.decorators import rescue_access_required, roles_required
+from blueprints.core.recurrence import (find_occurrence_start, format_recurrence,
+                                        get_next_occurrence, parse_recurrence_form,
+                                        set_occurrence_exception)
+from blueprints.core.reminders import (build_appointment_reminder_rows,
+                                       insert_reminders, limit_to_horizon,
+                                       reconcile_appointment_reminders)
 from blueprints.core.utils import (check_rescue_access, get_first_user_id,
                                    get_rescue_appointments, htmx_error_response)
 from models import Appointment, AppointmentType, Dog, Reminder, db
@@ -49,6 +55,10 @@ def add_appointment(dog_id):
         return htmx_error_response(error_message, '#addAppointmentModalError')
     # Sanitize notes
     appt_notes = bleach.clean(appt_notes)
+    try:
+        recurrence, recurrence_value, recurrence_until = parse_recurrence_form(request.form)
+    except ValueError as e:
+        return htmx_error_response(str(e), '#addAppointmentModalError')
 
     try:
         start_dt = datetime.strptime(appt_start_datetime, '%Y-%m-%dT%H:%M')
@@ -79,6 +89,9 @@ def add_appointment(dog_id):
         description=appt_notes,
         start_datetime=start_dt,
         end_datetime=end_dt,
+        recurrence=recurrence,
+        recurrence_value=recurrence_value,
+        recurrence_until=recurrence_until,
         status=appt_status,
         created_by=temp_user_id
     )
@@ -98,6 +111,7 @@ def add_appointment(dog_id):
             'title': appt.title,
             'start_datetime': appt.start_datetime.isoformat() if appt.start_datetime else None,
             'end_datetime': appt.end_datetime.isoformat() if appt.end_datetime else None,
+            'recurrence': format_recurrence(appt) or None,
             'status': appt.status
         },
         ip_address=request.remote_addr,
@@ -107,49 +121,7 @@ def add_appointment(dog_id):
 
     # Reminder Generation
     try:
-        # Reminder 1: Info about the appointment itself
-        reminder_message_info = f"{dog.name}'s appointment for '{appt.title if appt.title else 'Appointment'}' is scheduled on {appt.start_datetime.strftime('%Y-%m-%d at %I:%M %p')}."
-        new_reminder_info = Reminder(
-            message=reminder_message_info,
-            due_datetime=appt.start_datetime, 
-            status='pending',
-            reminder_type='appointment_info',
-            dog_id=dog.id,
-            appointment_id=appt.id,
-            user_id=temp_user_id
-        )
-        db.session.add(new_reminder_info)
-
-        # Reminder 2: 24 hours before (if applicable)
-        if appt.start_datetime > datetime.utcnow() + timedelta(hours=23): # Give a bit of buffer
-            due_24h = appt.start_datetime - timedelta(hours=24)
-            reminder_message_24h = f"REMINDER: {dog.name}'s appointment '{appt.title if appt.title else 'Appointment'}' is in 24 hours ({due_24h.strftime('%Y-%m-%d at %I:%M %p')})."
-            new_reminder_24h = Reminder(
-                message=reminder_message_24h,
-                due_datetime=due_24h,
-                status='pending',
-                reminder_type='appointment_upcoming_24h',
-                dog_id=dog.id,
-                appointment_id=appt.id,
-                user_id=temp_user_id
-            )
-            db.session.add(new_reminder_24h)
-
-        # Reminder 3: 1 hour before (if applicable)
-        if appt.start_datetime > datetime.utcnow() + timedelta(minutes=59): # Give a bit of buffer
-            due_1h = appt.start_datetime - timedelta(hours=1)
-            reminder_message_1h = f"REMINDER: {dog.name}'s appointment '{appt.title if appt.title else 'Appointment'}' is in 1 hour ({due_1h.strftime('%Y-%m-%d at %I:%M %p')})."
-            new_reminder_1h = Reminder(
-                message=reminder_message_1h,
-                due_datetime=due_1h,
-                status='pending',
-                reminder_type='appointment_upcoming_1h',
-                dog_id=dog.id,
-                appointment_id=appt.id,
-                user_id=temp_user_id
-            )
-            db.session.add(new_reminder_1h)
-        
+        insert_reminders(limit_to_horizon(build_appointment_reminder_rows(appt, dog, temp_user_id)))
         db.session.commit() # Commit new reminders
     except Exception as e:
         db.session.rollback()
@@ -173,8 +145,6 @@ def edit_appointment(dog_id, appointment_id):
     # Get the appointment directly from the database
     appt = Appointment.query.filter_by(id=appointment_id, dog_id=dog_id).first_or_404()
     
-    # Store old start_datetime to check if it changed for reminder regeneration
-    old_start_datetime = appt.start_datetime
     appt_type_id = request.form.get('appt_type_id')
     appt_title = request.form.get('appt_title', '').strip()
     appt_notes = request.form.get('appt_notes', '').strip()
@@ -191,6 +161,10 @@ def edit_appointment(dog_id, appointment_id):
         return htmx_error_response(error_message, f'#editAppointmentModalError-{appointment_id}')
     # Sanitize notes
     appt_notes = bleach.clean(appt_notes)
+    try:
+        recurrence, recurrence_value, recurrence_until = parse_recurrence_form(request.form)
+    except ValueError as e:
+        return htmx_error_response(str(e), f'#editAppointmentModalError-{appointment_id}')
 
     appt.type_id = int(appt_type_id) if appt_type_id else None
     appt.title = appt_title
@@ -200,6 +174,9 @@ def edit_appointment(dog_id, appointment_id):
         appt.start_datetime = datetime.strptime(appt_start_datetime, '%Y-%m-%dT%H:%M')
     if appt_end_datetime:
         appt.end_datetime = datetime.strptime(appt_end_datetime, '%Y-%m-%dT%H:%M')
+    appt.recurrence = recurrence
+    appt.recurrence_value = recurrence_value
+    appt.recurrence_until = recurrence_until
     
     temp_user_id = get_first_user_id()
     if temp_user_id is None:
@@ -222,6 +199,7 @@ def edit_appointment(dog_id, appointment_id):
             'title': appt.title,
             'start_datetime': appt.start_datetime.isoformat() if appt.start_datetime else None,
             'end_datetime': appt.end_datetime.isoformat() if appt.end_datetime else None,
+            'recurrence': format_recurrence(appt) or None,
             'status': appt.status
         },
         ip_address=request.remote_addr,
@@ -229,62 +207,14 @@ def edit_appointment(dog_id, appointment_id):
         success=True
     )
 
-    # Reminder Generation/Update Logic
-    # Only update reminders if the start time has changed, or perhaps always regenerate for simplicity if other details changed.
-    # For now, let's always delete old and create new ones if the critical date changed or for simplicity.
-    if appt.start_datetime != old_start_datetime or True: # Condition to always regenerate for now
-        try:
-            # Delete existing reminders for this appointment
-            Reminder.query.filter_by(appointment_id=appt.id).delete()
-            # db.session.commit() # Commit deletion - or do it with new additions
-
-            # Reminder 1: Info about the appointment itself
-            reminder_message_info = f"{dog.name}'s appointment for '{appt.title if appt.title else 'Appointment'}' is scheduled on {appt.start_datetime.strftime('%Y-%m-%d at %I:%M %p')}."
-            new_reminder_info = Reminder(
-                message=reminder_message_info,
-                due_datetime=appt.start_datetime,
-                status='pending',
-                reminder_type='appointment_info',
-                dog_id=dog.id,
-                appointment_id=appt.id,
-                user_id=temp_user_id
-            )
-            db.session.add(new_reminder_info)
-
-            # Reminder 2: 24 hours before (if applicable)
-            if appt.start_datetime > datetime.utcnow() + timedelta(hours=23):
-                due_24h = appt.start_datetime - timedelta(hours=24)
-                reminder_message_24h = f"REMINDER: {dog.name}'s appointment '{appt.title if appt.title else 'Appointment'}' is in 24 hours ({due_24h.strftime('%Y-%m-%d at %I:%M %p')})."
-                new_reminder_24h = Reminder(
-                    message=reminder_message_24h,
-                    due_datetime=due_24h,
-                    status='pending',
-                    reminder_type='appointment_upcoming_24h',
-                    dog_id=dog.id,
-                    appointment_id=appt.id,
-                    user_id=temp_user_id
-                )
-                db.session.add(new_reminder_24h)
-
-            # Reminder 3: 1 hour before (if applicable)
-            if appt.start_datetime > datetime.utcnow() + timedelta(minutes=59):
-                due_1h = appt.start_datetime - timedelta(hours=1)
-                reminder_message_1h = f"REMINDER: {dog.name}'s appointment '{appt.title if appt.title else 'Appointment'}' is in 1 hour ({due_1h.strftime('%Y-%m-%d at %I:%M %p')})."
-                new_reminder_1h = Reminder(
-                    message=reminder_message_1h,
-                    due_datetime=due_1h,
-                    status='pending',
-                    reminder_type='appointment_upcoming_1h',
-                    dog_id=dog.id,
-                    appointment_id=appt.id,
-                    user_id=temp_user_id
-                )
-                db.session.add(new_reminder_1h)
-
-            db.session.commit() # Commit deletions and new reminders
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error updating/creating reminders for edited appointment: {e}")
+    # Reminder Update Logic: only rewrite the reminders whose due time or message changed
+    try:
+        changes = reconcile_appointment_reminders(appt, dog, temp_user_id)
+        db.session.commit()
+        print(f"Reconciled reminders for edited appointment: {changes}")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error updating/creating reminders for edited appointment: {e}")
 
     dog = Dog.query.get_or_404(dog_id)  # Refresh
     print('All appointments for dog:', dog_id)
@@ -369,6 +299,74 @@ def complete_appointment(dog_id, appointment_id):
     appointment_types = AppointmentType.query.filter_by(rescue_id=dog.rescue_id).all()
     return render_template('partials/appointments_list.html', dog=dog, appointment_types=appointment_types, now=datetime.now(), timedelta=timedelta)
 
+OCCURRENCE_ACTIONS = {'cancel': 'canceled', 'complete': 'completed', 'move': 'scheduled'}
+
+@appointments_bp.route('/dog/<int:dog_id>/appointment/<int:appointment_id>/occurrence/<occurrence_key>', methods=['POST'])
+@login_required
+def update_occurrence(dog_id, appointment_id, occurrence_key):
+    """Cancel, complete or move one occurrence of a recurring appointment (form field 'action')."""
+    dog = Dog.query.get_or_404(dog_id)
+    check_rescue_access(dog)
+    appt = Appointment.query.filter_by(id=appointment_id, dog_id=dog_id).first_or_404()
+    occurrence_start = find_occurrence_start(appt, occurrence_key)
+    if occurrence_start is None:
+        abort(404)
+    action = request.form.get('action', '')
+    if action not in OCCURRENCE_ACTIONS:
+        return htmx_error_response('Unknown occurrence action.', '#appointments-list')
+
+    start_dt = end_dt = None
+    if action == 'move':
+        try:
+            start_dt = datetime.strptime(request.form.get('appt_start_datetime', ''), '%Y-%m-%dT%H:%M')
+            end_text = request.form.get('appt_end_datetime')
+            end_dt = datetime.strptime(end_text, '%Y-%m-%dT%H:%M') if end_text else None
+        except ValueError:
+            return htmx_error_response('Invalid date/time format.', '#appointments-list')
+
+    set_occurrence_exception(appt, occurrence_start, OCCURRENCE_ACTIONS[action], start_dt, end_dt)
+    db.session.commit()
+
+    temp_user_id = get_first_user_id()
+    log_audit_event(
+        user_id=temp_user_id,
+        rescue_id=dog.rescue_id,
+        action=action,
+        resource_type='AppointmentOccurrence',
+        resource_id=appt.id,
+        details={
+            'dog_id': dog.id,
+            'occurrence_start': occurrence_start.isoformat(),
+            'start_datetime': start_dt.isoformat() if start_dt else None,
+            'end_datetime': end_dt.isoformat() if end_dt else None,
+            'status': OCCURRENCE_ACTIONS[action]
+        },
+        ip_address=request.remote_addr,
+        user_agent=request.headers.get('User-Agent'),
+        success=True
+    )
+
+    # The occurrence's pending reminders follow it (dropped when canceled or completed)
+    try:
+        reconcile_appointment_reminders(appt, dog, temp_user_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error reconciling reminders for appointment occurrence: {e}")
+
+    dog = Dog.query.get_or_404(dog_id)  # Refresh
+    appointment_types = AppointmentType.query.filter_by(rescue_id=dog.rescue_id).all()
+    return render_template('partials/appointments_list.html', dog=dog, appointment_types=appointment_types, now=datetime.now(), timedelta=timedelta)
+
+@appointments_bp.app_template_global('next_appointment_occurrence')
+def next_appointment_occurrence(appointment, after):
+    """Template helper: the next occurrence of a recurring appointment, or None."""
+    return get_next_occurrence(appointment, after)
+
+@appointments_bp.app_template_filter('recurrence_text')
+def recurrence_text(appointment):
+    return format_recurrence(appointment)
+
 # --- Appointment List and Details ---
 
 @appointments_bp.route('/appointments')
@@ -413,5 +411,8 @@ def api_get_appointment(appointment_id):
         'description': appt.description,
         'start_datetime': appt.start_datetime.isoformat() if appt.start_datetime else '',
         'end_datetime': appt.end_datetime.isoformat() if appt.end_datetime else '',
+        'recurrence': appt.recurrence or 'none',
+        'recurrence_value': appt.recurrence_value,
+        'recurrence_until': appt.recurrence_until.isoformat() if appt.recurrence_until else '',
         'status': appt.status
     })
\ No newline at end of file
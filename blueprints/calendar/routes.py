@@ -1,15 +1,27 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+import json
+import queue
+from flask import Blueprint, abort, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
-from collections import defaultdict
 from datetime import datetime, timedelta
+from blueprints.core.adherence import get_adherence_summary, get_adherence_window, record_given_doses
+from blueprints.core.dashboard import (build_reminder_page, decode_reminder_cursor, doses_after, get_calendar_stats,
+                                       get_pending_reminder_items, group_reminders_for_calendar, reminder_sort_key,
+                                       stored_reminders_after)
+from blueprints.core.pagination import encode_cursor
 from blueprints.core.decorators import rescue_access_required
-from models import Reminder, Rescue, Appointment, DogMedicine, Dog, AppointmentType
-from blueprints.core.utils import get_rescue_reminders, check_rescue_access, get_effective_rescue_id, filter_by_rescue, get_filtered_reminders
+from blueprints.core.etags import not_modified, with_etag
+from blueprints.core.ics import get_cached_calendar_feed, get_calendar_feed_etag, stream_calendar_feed
+from due_scheduler import get_due_scheduler
+from models import Reminder, Rescue, Appointment, DogMedicine, Dog, AppointmentType, User
+from blueprints.core.recurrence import parse_recurrence_form
+from blueprints.core.reminders import build_appointment_reminder_rows, insert_reminders, limit_to_horizon, set_reminder_status
+from blueprints.core.schedules import MISSED_DOSE_LOOKBACK, build_dose_status_rows, find_scheduled_dose, get_rescue_virtual_doses, get_virtual_doses_by_id, merge_with_doses, record_dose_status
+from blueprints.core.utils import get_rescue_reminders, check_rescue_access, get_effective_rescue_id, filter_by_rescue, get_filtered_reminders, get_reminder_filter_window, get_first_user_id, has_rescue_scope
 
 calendar_bp = Blueprint('calendar', __name__, url_prefix='')
 
 @calendar_bp.route('/reminder/<int:reminder_id>/acknowledge', methods=['POST'])
-@rescue_access_required(lambda kwargs: Reminder.query.get(kwargs['reminder_id']).dog.rescue_id if Reminder.query.get(kwargs['reminder_id']).dog else None)
+@rescue_access_required(lambda kwargs: Reminder.query.with_entities(Reminder.rescue_id).filter_by(id=kwargs['reminder_id']).scalar())
 @login_required
 def acknowledge_reminder(reminder_id):
     from app import db
@@ -19,7 +31,7 @@ def acknowledge_reminder(reminder_id):
     return '', 200
 
 @calendar_bp.route('/calendar/acknowledge_reminder/<int:reminder_id>', methods=['POST'])
-@rescue_access_required(lambda kwargs: Reminder.query.get(kwargs['reminder_id']).dog.rescue_id if Reminder.query.get(kwargs['reminder_id']).dog else None)
+@rescue_access_required(lambda kwargs: Reminder.query.with_entities(Reminder.rescue_id).filter_by(id=kwargs['reminder_id']).scalar())
 @login_required
 def calendar_acknowledge_reminder(reminder_id):
     from app import db
@@ -29,7 +41,7 @@ def calendar_acknowledge_reminder(reminder_id):
     return '', 200
 
 @calendar_bp.route('/reminder/<int:reminder_id>/dismiss', methods=['POST'])
-@rescue_access_required(lambda kwargs: Reminder.query.get(kwargs['reminder_id']).dog.rescue_id if Reminder.query.get(kwargs['reminder_id']).dog else None)
+@rescue_access_required(lambda kwargs: Reminder.query.with_entities(Reminder.rescue_id).filter_by(id=kwargs['reminder_id']).scalar())
 @login_required
 def dismiss_reminder(reminder_id):
     from app import db
@@ -38,6 +50,110 @@ def dismiss_reminder(reminder_id):
     db.session.commit()
     return '', 200
 
+def _set_dose_status(dog_medicine_id, dose_key, status):
+    """Record a virtual medicine dose as acknowledged or dismissed."""
+    from app import db
+    med = DogMedicine.query.get_or_404(dog_medicine_id)
+    check_rescue_access(med)
+    due_datetime = find_scheduled_dose(med, dose_key)
+    if due_datetime is None:
+        abort(404)
+    record_dose_status(med, due_datetime, status, user_id=get_first_user_id())
+    if status == 'acknowledged':
+        record_given_doses([(med, due_datetime)], user_id=current_user.id)
+    db.session.commit()
+    return '', 200
+
+@calendar_bp.route('/reminder/dose-<int:dog_medicine_id>-<dose_key>/acknowledge', methods=['POST'])
+@login_required
+def acknowledge_dose(dog_medicine_id, dose_key):
+    return _set_dose_status(dog_medicine_id, dose_key, 'acknowledged')
+
+@calendar_bp.route('/calendar/acknowledge_reminder/dose-<int:dog_medicine_id>-<dose_key>', methods=['POST'])
+@login_required
+def calendar_acknowledge_dose(dog_medicine_id, dose_key):
+    return _set_dose_status(dog_medicine_id, dose_key, 'acknowledged')
+
+@calendar_bp.route('/reminder/dose-<int:dog_medicine_id>-<dose_key>/dismiss', methods=['POST'])
+@login_required
+def dismiss_dose(dog_medicine_id, dose_key):
+    return _set_dose_status(dog_medicine_id, dose_key, 'dismissed')
+
+def _get_dose_window(filter_type, now):
+    """Window of virtual doses matching a reminder filter (overdue doses only go back MISSED_DOSE_LOOKBACK)."""
+    window_start, window_end = get_reminder_filter_window(filter_type, now)
+    if window_start is None:
+        window_start = now - MISSED_DOSE_LOOKBACK
+        window_end = window_end - timedelta(microseconds=1)
+    return window_start, window_end
+
+def _get_filtered_reminder_items(filter_type, rescue_id=None, cursor=None, limit=None):
+    """
+    Get a page of filtered stored reminders merged with the virtual medicine doses due in the same window.
+
+    Pages are keyset-paginated on (due_datetime, source, id): cursor is the
+    previous page's next_cursor, so acknowledging reminders between pages
+    neither skips nor repeats rows.
+
+    Raises:
+        ValueError: If cursor is malformed
+
+    Returns:
+        tuple: (items, next_cursor); next_cursor is None on the last page
+    """
+    now = datetime.now()
+    window_start, window_end = _get_dose_window(filter_type, now)
+    doses = sorted(get_rescue_virtual_doses(get_effective_rescue_id(rescue_id), window_start, window_end), key=reminder_sort_key)
+    reminders_query = get_filtered_reminders(filter_type, rescue_id=rescue_id)
+    if cursor:
+        key = decode_reminder_cursor(cursor)
+        reminders_query = reminders_query.filter(stored_reminders_after(key))
+        doses = doses_after(doses, key)
+    if limit is None:
+        return merge_with_doses(reminders_query.all(), doses), None
+    # One extra stored row tells build_reminder_page whether another page follows
+    return build_reminder_page(reminders_query.limit(limit + 1).all(), doses, limit)
+
+def _render_reminder_list(filter_type):
+    """HTMX partial (or JSON count) for one reminder tab, paged with ?cursor=...&limit=..."""
+    rescue_id = request.args.get('rescue_id', type=int)
+    limit = request.args.get('limit', type=int, default=None)
+    try:
+        reminders_list, next_cursor = _get_filtered_reminder_items(
+            filter_type, rescue_id=rescue_id, cursor=request.args.get('cursor'), limit=limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Check if this is an HTMX request
+    if request.headers.get('HX-Request'):
+        return render_template('partials/reminder_list_items.html',
+                             reminders=reminders_list,
+                             reminder_type=filter_type,
+                             next_cursor=next_cursor,
+                             now=datetime.now())
+    
+    # Return JSON for non-HTMX requests
+    return jsonify({'reminders': len(reminders_list), 'next_cursor': next_cursor})
+
+# First page size of each reminder tab on the calendar page; "Show more" loads the rest by cursor
+REMINDER_TAB_PAGE_SIZE = 5
+
+def _build_reminder_tabs(items, now):
+    """Split the calendar page's reminders into its overdue/today/upcoming tabs in keyset order, with each tab's cursor past its first page."""
+    tabs = {'overdue': [], 'today': [], 'upcoming': []}
+    for item in sorted(items, key=reminder_sort_key):
+        if item.due_datetime < now:
+            tabs['overdue'].append(item)
+        elif item.due_datetime.date() == now.date():
+            tabs['today'].append(item)
+        else:
+            tabs['upcoming'].append(item)
+    cursors = {
+        name: encode_cursor(*reminder_sort_key(tab[REMINDER_TAB_PAGE_SIZE - 1])) if len(tab) > REMINDER_TAB_PAGE_SIZE else None
+        for name, tab in tabs.items()
+    }
+    return tabs, cursors
+
 @calendar_bp.route('/calendar')
 @login_required
 def calendar_view():
@@ -47,90 +163,18 @@ def calendar_view():
     # Get rescues for dropdown (only for superadmin)
     rescues = Rescue.query.order_by(Rescue.name.asc()).all() if current_user.role == 'superadmin' else None
     
-    # Get reminders based on effective rescue_id
-    base_query = Reminder.query.filter(Reminder.status == 'pending')
-    reminders_query = filter_by_rescue(base_query, Reminder, rescue_id).order_by(Reminder.due_datetime.asc()).all()
-    
-    group_order = ["Vet Reminders", "Medication Reminders", "Other Reminders"]
-    grouped_reminders = defaultdict(list)
-    for group in group_order:
-        grouped_reminders[group] = []
-    
-    for reminder in reminders_query:
-        group_name = "Other Reminders"
-        specific_type_name_for_grouping = None
-        if reminder.appointment_id and reminder.appointment:
-            if reminder.appointment.type:
-                specific_type_name_for_grouping = reminder.appointment.type.name
-                if "vet" in specific_type_name_for_grouping.lower():
-                    group_name = "Vet Reminders"
-                elif "grooming" in specific_type_name_for_grouping.lower():
-                    group_name = "Grooming Reminders"
-            # else falls to Other Reminders
-        elif reminder.dog_medicine_id:
-            group_name = "Medication Reminders"
-        grouped_reminders[group_name].append(reminder)
-    
-    ordered_final_groups = {group: grouped_reminders[group] for group in group_order if group in grouped_reminders}
-    other_dynamic_groups = {k: v for k, v in sorted(grouped_reminders.items()) if k not in ordered_final_groups and v}
-    ordered_final_groups.update(other_dynamic_groups)
-    
-    # Calculate calendar stats
-    today = datetime.now()
-    today_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today.replace(hour=23, minute=59, second=59, microsecond=999999)
-    week_from_today = today + timedelta(days=7)
-    
-    # Get appointment counts
-    appointments_today_query = Appointment.query.filter(
-        Appointment.start_datetime >= today_start,
-        Appointment.start_datetime <= today_end
-    )
-    appointments_week_query = Appointment.query.filter(
-        Appointment.start_datetime >= today_start,
-        Appointment.start_datetime <= week_from_today
-    )
-    
-    appointments_today = filter_by_rescue(appointments_today_query, Appointment, rescue_id).count()
-    appointments_week = filter_by_rescue(appointments_week_query, Appointment, rescue_id).count()
-    
-    # Get active medicines count for today
-    medicines_query = DogMedicine.query.filter(DogMedicine.status == 'active')
-    medicines_today = filter_by_rescue(medicines_query, DogMedicine, rescue_id).count()
-    
-    # Count active reminders
-    active_reminders = len(reminders_query)
+    # All pending reminders (eager-loaded in one query) plus doses from recent misses through the next week
+    now = datetime.now()
+    reminders_query = get_pending_reminder_items(effective_rescue_id, now=now, doses_until=now + timedelta(days=7))
+    ordered_final_groups = group_reminders_for_calendar(reminders_query)
+    reminder_tabs, reminder_tab_cursors = _build_reminder_tabs(reminders_query, now)
     
-    # For the filter counts, we need total counts (not just today/this week)
-    total_appointments = filter_by_rescue(Appointment.query, Appointment, rescue_id).count()
-    total_medicines = filter_by_rescue(
-        DogMedicine.query.filter(DogMedicine.status == 'active'), 
-        DogMedicine, 
-        rescue_id
-    ).count()
+    # Calculate calendar stats (one aggregate query)
+    calendar_stats = get_calendar_stats(effective_rescue_id, len(reminders_query), now=now)
     
-    calendar_stats = {
-        'today_count': appointments_today + medicines_today,
-        'week_count': appointments_week + medicines_today,  # medicines are ongoing
-        'medications_today': medicines_today,
-        'appointments_week': appointments_week,
-        'active_reminders': active_reminders,
-        'total_events': total_appointments + total_medicines + active_reminders,
-        'medications_count': total_medicines,
-        'appointments_count': total_appointments,
-        'monitoring_count': 0  # Placeholder for now
-    }
-    
-    # Calculate adherence stats (placeholder for now)
-    stats = {
-        'given_on_time': 0,
-        'given_late': 0,
-        'missed': 0
-    }
-    
-    # Calculate adherence rate
-    total_doses = stats['given_on_time'] + stats['given_late'] + stats['missed']
-    adherence_rate = 100 if total_doses == 0 else int((stats['given_on_time'] / total_doses) * 100)
+    # Medication adherence over the last 30 days, from the daily rollups
+    stats = get_adherence_summary(effective_rescue_id, *get_adherence_window(now.date()))
+    adherence_rate = stats['rate']
     
     # Get dogs and appointment types for the modal
     dogs = filter_by_rescue(Dog.query, Dog, rescue_id).order_by(Dog.name).all()
@@ -139,10 +183,13 @@ def calendar_view():
     
     return render_template('calendar_view.html', 
                          grouped_reminders=ordered_final_groups, 
+                         reminder_tabs=reminder_tabs,
+                         reminder_tab_cursors=reminder_tab_cursors,
+                         reminder_tab_page_size=REMINDER_TAB_PAGE_SIZE,
                          rescues=rescues, 
                          selected_rescue_id=effective_rescue_id,
                          calendar_stats=calendar_stats,
-                         current_date=today,
+                         current_date=now,
                          now=datetime.now(),
                          timedelta=timedelta,
                          stats=stats,
@@ -153,65 +200,114 @@ def calendar_view():
 @calendar_bp.route('/calendar/reminders/overdue')
 @login_required
 def get_overdue_reminders():
-    rescue_id = request.args.get('rescue_id', type=int)
-    offset = request.args.get('offset', type=int, default=0)
-    limit = request.args.get('limit', type=int, default=None)
-    
-    # Use the helper function to get filtered reminders
-    reminders_query = get_filtered_reminders('overdue', rescue_id=rescue_id, offset=offset, limit=limit)
-    reminders_list = reminders_query.all()
-    
-    # Check if this is an HTMX request
-    if request.headers.get('HX-Request'):
-        return render_template('partials/reminder_list_items.html',
-                             reminders=reminders_list,
-                             reminder_type='overdue',
-                             now=datetime.now())
-    
-    # Return JSON for non-HTMX requests
-    return jsonify({'reminders': len(reminders_list)})
+    return _render_reminder_list('overdue')
 
 @calendar_bp.route('/calendar/reminders/today')
 @login_required
 def get_today_reminders():
-    rescue_id = request.args.get('rescue_id', type=int)
-    offset = request.args.get('offset', type=int, default=0)
-    limit = request.args.get('limit', type=int, default=None)
-    
-    # Use the helper function to get filtered reminders
-    reminders_query = get_filtered_reminders('today', rescue_id=rescue_id, offset=offset, limit=limit)
-    reminders_list = reminders_query.all()
-    
-    # Check if this is an HTMX request
-    if request.headers.get('HX-Request'):
-        return render_template('partials/reminder_list_items.html',
-                             reminders=reminders_list,
-                             reminder_type='today',
-                             now=datetime.now())
-    
-    # Return JSON for non-HTMX requests
-    return jsonify({'reminders': len(reminders_list)})
+    return _render_reminder_list('today')
 
 @calendar_bp.route('/calendar/reminders/upcoming')
 @login_required
 def get_upcoming_reminders():
-    rescue_id = request.args.get('rescue_id', type=int)
-    offset = request.args.get('offset', type=int, default=0)
-    limit = request.args.get('limit', type=int, default=None)
-    
-    # Use the helper function to get filtered reminders
-    reminders_query = get_filtered_reminders('upcoming', rescue_id=rescue_id, offset=offset, limit=limit)
-    reminders_list = reminders_query.all()
-    
-    # Check if this is an HTMX request
-    if request.headers.get('HX-Request'):
-        return render_template('partials/reminder_list_items.html',
-                             reminders=reminders_list,
-                             reminder_type='upcoming',
-                             now=datetime.now())
-    
-    # Return JSON for non-HTMX requests
-    return jsonify({'reminders': len(reminders_list)})
+    return _render_reminder_list('upcoming')
+
+# Seconds between keep-alive comments on the reminder stream, so proxies don't close idle connections
+STREAM_HEARTBEAT_SECONDS = 25
+
+@calendar_bp.route('/calendar/reminders/stream')
+@login_required
+def reminder_stream():
+    """Server-sent events: a "reminder_due" event whenever reminders of this rescue become due."""
+    scheduler = get_due_scheduler()
+    if scheduler is None:
+        return '', 204  # Push disabled; tells EventSource not to reconnect
+    rescue_id = get_effective_rescue_id(request.args.get('rescue_id', type=int))
+    # Subscribing with None receives every rescue's events; only superadmins may
+    if not has_rescue_scope(rescue_id):
+        abort(403)
+    subscription = scheduler.subscribe(rescue_id)
+
+    def stream():
+        try:
+            yield 'retry: 10000\n\n'
+            while True:
+                try:
+                    payload = subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: reminder_due\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            scheduler.unsubscribe(rescue_id, subscription)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+BULK_REMINDER_ACTIONS = {'acknowledge': 'acknowledged', 'dismiss': 'dismissed'}
+
+@calendar_bp.route('/calendar/reminders/bulk', methods=['POST'])
+@login_required
+def bulk_update_reminders():
+    """
+    Acknowledge or dismiss many reminders at once and return the refreshed list fragment.
+
+    Form fields:
+        action: 'acknowledge' or 'dismiss'
+        reminder_ids: Reminder ids (repeatable), including virtual "dose-..." ids
+        filter_type / dog_id: Instead of ids, every pending reminder in a list
+            ('overdue', 'today', 'upcoming'), optionally for one dog
+        list_type / limit: The list to render back (defaults to filter_type, then 'overdue')
+    """
+    from app import db
+    status = BULK_REMINDER_ACTIONS.get(request.form.get('action'))
+    rescue_id = request.form.get('rescue_id', type=int)
+    filter_type = request.form.get('filter_type')
+    list_type = request.form.get('list_type') or filter_type or 'overdue'
+    reminder_ids = request.form.getlist('reminder_ids')
+    if status is None or list_type not in ('overdue', 'today', 'upcoming') or not (reminder_ids or filter_type):
+        abort(400)
+    # A user without a rescue has no reminders to update (None would mean every rescue's)
+    if not current_user.is_superadmin() and current_user.rescue_id is None:
+        abort(403)
+
+    if reminder_ids:
+        stored_ids = {int(reminder_id) for reminder_id in reminder_ids if reminder_id.isdigit()}
+        reminders_query = Reminder.query.filter(Reminder.id.in_(stored_ids))
+        # Tenancy is part of the UPDATE's WHERE, so another rescue's reminders can never match
+        if not current_user.is_superadmin():
+            reminders_query = reminders_query.filter(Reminder.rescue_id == current_user.rescue_id)
+        # Requested reminders that don't exist or belong to another rescue are reported as not found
+        if stored_ids and reminders_query.count() < len(stored_ids):
+            abort(404)
+        doses = get_virtual_doses_by_id([reminder_id for reminder_id in reminder_ids if reminder_id.startswith('dose-')])
+        for dose in doses:
+            check_rescue_access(dose.dog_medicine)
+    else:
+        try:
+            # Tenancy is part of the filter: only the effective rescue's reminders match
+            reminders_query = get_filtered_reminders(filter_type, rescue_id=rescue_id).order_by(None)
+            window_start, window_end = _get_dose_window(filter_type, datetime.now())
+        except ValueError:
+            abort(400)
+        dog_id = request.form.get('dog_id', type=int)
+        if dog_id is not None:
+            reminders_query = reminders_query.filter(Reminder.dog_id == dog_id)
+        doses = get_rescue_virtual_doses(get_effective_rescue_id(rescue_id), window_start, window_end, dog_id=dog_id)
+
+    set_reminder_status(reminders_query, status)
+    insert_reminders(build_dose_status_rows(doses, status, user_id=get_first_user_id()))
+    if status == 'acknowledged':
+        record_given_doses([(dose.dog_medicine, dose.due_datetime) for dose in doses], user_id=current_user.id)
+    db.session.commit()
+
+    limit = request.form.get('limit', type=int)
+    reminders_list, next_cursor = _get_filtered_reminder_items(list_type, rescue_id=rescue_id, limit=limit)
+    return render_template('partials/reminder_list_items.html',
+                           reminders=reminders_list,
+                           reminder_type=list_type,
+                           next_cursor=next_cursor,
+                           now=datetime.now())
 
 @calendar_bp.route('/calendar/add-appointment', methods=['POST'])
 @login_required
@@ -238,14 +334,23 @@ def add_appointment():
     except ValueError:
         flash('Invalid date format provided.', 'danger')
         return redirect(url_for('calendar.calendar_view'))
+    try:
+        recurrence, recurrence_value, recurrence_until = parse_recurrence_form(request.form)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('calendar.calendar_view'))
     
     # Create appointment
     appointment = Appointment(
         dog_id=dog_id,
+        rescue_id=dog.rescue_id,
         type_id=appt_type_id,
         title=title,
         start_datetime=start_datetime,
         end_datetime=end_datetime,
+        recurrence=recurrence,
+        recurrence_value=recurrence_value,
+        recurrence_until=recurrence_until,
         description=notes,
         status='scheduled'
     )
@@ -253,17 +358,48 @@ def add_appointment():
     db.session.add(appointment)
     db.session.flush()  # Flush to get the appointment ID
     
-    # Create reminder for the appointment
-    reminder = Reminder(
-        dog_id=dog_id,
-        appointment_id=appointment.id,
-        message=f"Appointment: {title}",
-        due_datetime=start_datetime,
-        status='pending'
-    )
-    
-    db.session.add(reminder)
+    # Create reminders for the appointment
+    insert_reminders(limit_to_horizon(build_appointment_reminder_rows(appointment, dog, get_first_user_id())))
     db.session.commit()
     
     flash(f'Appointment "{title}" has been scheduled for {dog.name}.', 'success')
-    return redirect(url_for('calendar.calendar_view'))
\ No newline at end of file
+    return redirect(url_for('calendar.calendar_view'))
+
+@calendar_bp.route('/calendar/feed/<token>.ics')
+def calendar_feed(token):
+    """ICS subscription feed; authenticated by the user's calendar feed token instead of a session."""
+    user = User.query.filter_by(calendar_feed_token=token, is_active=True).first()
+    if user is None or (user.role != 'superadmin' and user.rescue_id is None):
+        abort(404)
+    rescue_id = None if user.role == 'superadmin' else user.rescue_id
+
+    today = datetime.now().date()
+    etag = get_calendar_feed_etag(rescue_id, today)
+    cached_response = not_modified(etag)
+    if cached_response:
+        return cached_response
+    body = get_cached_calendar_feed(rescue_id, etag)
+    if body is None:
+        # Not rendered since the last change: stream it out of the database batch by batch
+        body = stream_with_context(stream_calendar_feed(rescue_id, etag, today))
+    response = Response(body, mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename="care-calendar.ics"'
+    return with_etag(response, etag)
+
+@calendar_bp.route('/calendar/feed/token', methods=['POST'])
+@login_required
+def generate_calendar_feed_token():
+    from app import db
+    current_user.generate_calendar_feed_token()
+    db.session.commit()
+    flash('A new calendar feed link was created. Any previous link no longer works.', 'success')
+    return redirect(url_for('calendar.calendar_view'))
+
+@calendar_bp.route('/calendar/feed/token/revoke', methods=['POST'])
+@login_required
+def revoke_calendar_feed_token():
+    from app import db
+    current_user.revoke_calendar_feed_token()
+    db.session.commit()
+    flash('Your calendar feed link was revoked.', 'success')
+    return redirect(url_for('calendar.calendar_view'))
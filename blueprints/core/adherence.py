@@ -0,0 +1,233 @@
+# Standard library imports
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+# Third-party imports
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload
+
+# Local application imports
+from blueprints.core.schedules import expand_dose_schedule
+from extensions import db
+from models import DogMedicine, DogMedicineHistory, MedicineAdherenceDay
+
+# Medication adherence is pre-aggregated per medicine per day in
+# medicine_adherence_day. Recording a given dose writes its DogMedicineHistory
+# row and bumps that day's on-time or late count; the nightly job closes
+# finished days by storing how many doses were scheduled, which makes the rest
+# of them missed. Pages read a handful of rollup rows instead of expanding
+# schedules and scanning history.
+
+ON_TIME_GRACE = timedelta(hours=1)  # Doses given up to this long after their due time are on time
+ADHERENCE_WINDOW_DAYS = 30  # Period shown on the calendar and dog pages
+CLOSE_CATCHUP_DAYS = 7  # Finished days the nightly job (re)closes, in case a run was missed
+
+
+def classify_given_dose(due_datetime, given_at):
+    """'given_on_time' or 'given_late' for a dose given at given_at."""
+    return 'given_on_time' if given_at <= due_datetime + ON_TIME_GRACE else 'given_late'
+
+
+def _insert_on_conflict(table):
+    """INSERT for the session's backend that supports ON CONFLICT (PostgreSQL and SQLite)."""
+    dialect = db.session.get_bind().dialect.name
+    return {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}[dialect](table)
+
+
+def record_given_doses(doses, user_id=None, given_at=None):
+    """
+    Record scheduled doses as given and count them in the daily rollups.
+
+    Doses that already have a history row are skipped, so recording the same
+    dose twice (e.g. a repeated acknowledge) counts it once. The skip is done
+    by the unique (dog_medicine_id, due_datetime) constraint, so concurrent
+    requests for the same dose cannot both count it. Does not commit.
+
+    Args:
+        doses (iterable): (DogMedicine, due_datetime) pairs
+        user_id (int): User who gave the doses
+        given_at (datetime): When they were given (default now, local time like due times)
+
+    Returns:
+        int: Number of doses recorded
+    """
+    given_at = given_at or datetime.now()
+    doses = {(med.id, due): med for med, due in doses}
+    if not doses:
+        return 0
+    history = DogMedicineHistory.__table__
+    inserted = db.session.execute(
+        _insert_on_conflict(history).values([{
+            'dog_medicine_id': med.id,
+            'date_given': given_at.date(),
+            'given_by': user_id,
+            'due_datetime': due,
+            'given_at': given_at,
+        } for (_, due), med in doses.items()])
+        .on_conflict_do_nothing(index_elements=['dog_medicine_id', 'due_datetime'])
+        .returning(history.c.dog_medicine_id, history.c.due_datetime)
+    ).all()
+    new = [(doses[(med_id, due)], due) for med_id, due in inserted]
+    if not new:
+        return 0
+
+    increments = Counter()
+    medicines = {}
+    for med, due in new:
+        increments[(med.id, due.date(), classify_given_dose(due, given_at))] += 1
+        medicines[med.id] = med
+    for (med_id, day, column), count in increments.items():
+        _increment_day(medicines[med_id], day, column, count)
+    return len(new)
+
+
+def _increment_day(dog_medicine, day, column, count):
+    """Add count to one rollup column, creating the day's row if needed, in one upsert."""
+    table = MedicineAdherenceDay.__table__
+    statement = _insert_on_conflict(table).values(
+        dog_medicine_id=dog_medicine.id,
+        dog_id=dog_medicine.dog_id,
+        rescue_id=dog_medicine.rescue_id,
+        day=day,
+        given_on_time=count if column == 'given_on_time' else 0,
+        given_late=count if column == 'given_late' else 0,
+    )
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['dog_medicine_id', 'day'],
+        set_={column: table.c[column] + count, 'updated_at': datetime.utcnow()}
+    ))
+
+
+def close_adherence_days(through_day=None, catchup_days=CLOSE_CATCHUP_DAYS, batch_size=500):
+    """
+    Store the scheduled dose count of every medicine for finished days.
+
+    Covers catchup_days days up to and including through_day (default
+    yesterday). Counts are set rather than added, so re-running is a no-op.
+    Medicines no longer active only have their open days closed; no new days
+    are added for them. Medicines are walked in id order in batches, one
+    transaction per batch.
+
+    Returns:
+        int: Number of medicine-days closed
+    """
+    through_day = through_day or date.today() - timedelta(days=1)
+    first_day = through_day - timedelta(days=catchup_days - 1)
+    window_start = datetime.combine(first_day, time.min)
+    window_end = datetime.combine(through_day, time.max)
+    table = MedicineAdherenceDay.__table__
+    # Same medicines whose doses were listed as due (see get_rescue_virtual_doses),
+    # plus any with open days left from before they were stopped or paused
+    open_days = select(table.c.dog_medicine_id).where(table.c.day.between(first_day, through_day),
+                                                      table.c.doses_scheduled == None)
+    medicines = DogMedicine.query.options(joinedload(DogMedicine.dog)).filter(or_(
+        and_(DogMedicine.status == 'active',
+             DogMedicine.start_date <= through_day,
+             (DogMedicine.end_date == None) | (DogMedicine.end_date >= first_day)),
+        DogMedicine.id.in_(open_days)
+    ))
+    closed = 0
+    last_id = 0
+    while True:
+        batch = medicines.filter(DogMedicine.id > last_id).order_by(DogMedicine.id.asc()).limit(batch_size).all()
+        if not batch:
+            break
+        scheduled = Counter()
+        for med in batch:
+            for due in expand_dose_schedule(med, window_start, window_end):
+                scheduled[(med.id, due.date())] += 1
+        existing = {(med_id, day): doses for med_id, day, doses in db.session.execute(
+            select(table.c.dog_medicine_id, table.c.day, table.c.doses_scheduled)
+            .where(table.c.dog_medicine_id.in_([med.id for med in batch]), table.c.day.between(first_day, through_day))
+        )}
+        medicines_by_id = {med.id: med for med in batch}
+        # Medicines no longer active are not listed as due, so only their existing days close
+        for key in list(scheduled):
+            if medicines_by_id[key[0]].status != 'active' and key not in existing:
+                del scheduled[key]
+        new_rows = []
+        # Days with doses given but none scheduled (the schedule changed since) close with nothing missed
+        for key, doses in existing.items():
+            if key not in scheduled and doses is None:
+                scheduled[key] = 0
+        for (med_id, day), count in scheduled.items():
+            if (med_id, day) not in existing:
+                med = medicines_by_id[med_id]
+                new_rows.append({'dog_medicine_id': med_id, 'dog_id': med.dog_id, 'rescue_id': med.rescue_id, 'day': day,
+                                 'doses_scheduled': count, 'given_on_time': 0, 'given_late': 0})
+            elif existing[(med_id, day)] != count:
+                db.session.execute(
+                    update(table).where(table.c.dog_medicine_id == med_id, table.c.day == day)
+                    .values(doses_scheduled=count, updated_at=datetime.utcnow())
+                )
+        if new_rows:
+            # A dose recorded since the select above may have created the row; keep its given counts
+            statement = _insert_on_conflict(table)
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['dog_medicine_id', 'day'],
+                set_={'doses_scheduled': statement.excluded.doses_scheduled, 'updated_at': datetime.utcnow()}
+            ), new_rows)
+        db.session.commit()
+        closed += len(scheduled)
+        last_id = batch[-1].id
+    return closed
+
+
+def _summary_columns():
+    missed = case(
+        (MedicineAdherenceDay.doses_scheduled > MedicineAdherenceDay.given_on_time + MedicineAdherenceDay.given_late,
+         MedicineAdherenceDay.doses_scheduled - MedicineAdherenceDay.given_on_time - MedicineAdherenceDay.given_late),
+        else_=0
+    )
+    return (
+        func.coalesce(func.sum(MedicineAdherenceDay.given_on_time), 0),
+        func.coalesce(func.sum(MedicineAdherenceDay.given_late), 0),
+        func.coalesce(func.sum(missed), 0),
+    )
+
+
+def _summary(given_on_time, given_late, missed):
+    total = given_on_time + given_late + missed
+    return {
+        'given_on_time': given_on_time,
+        'given_late': given_late,
+        'missed': missed,
+        'rate': 100 if total == 0 else int(given_on_time / total * 100),
+    }
+
+
+def get_adherence_window(today=None, days=ADHERENCE_WINDOW_DAYS):
+    """(first_day, last_day) of the last days days, today included."""
+    today = today or date.today()
+    return today - timedelta(days=days - 1), today
+
+
+def get_adherence_summary(rescue_id, first_day, last_day, dog_id=None):
+    """
+    Totals over a range of days, for a rescue (None for all rescues) or one dog.
+
+    Returns:
+        dict: given_on_time, given_late, missed and rate (percent given on time)
+    """
+    query = select(*_summary_columns()).where(MedicineAdherenceDay.day.between(first_day, last_day))
+    if rescue_id is not None:
+        query = query.where(MedicineAdherenceDay.rescue_id == rescue_id)
+    if dog_id is not None:
+        query = query.where(MedicineAdherenceDay.dog_id == dog_id)
+    return _summary(*db.session.execute(query).one())
+
+
+def get_medicine_adherence(dog_id, first_day, last_day):
+    """
+    Totals over a range of days for each of a dog's medicines.
+
+    Returns:
+        dict: dog_medicine_id -> summary dict (see get_adherence_summary)
+    """
+    rows = db.session.execute(
+        select(MedicineAdherenceDay.dog_medicine_id, *_summary_columns())
+        .where(MedicineAdherenceDay.dog_id == dog_id, MedicineAdherenceDay.day.between(first_day, last_day))
+        .group_by(MedicineAdherenceDay.dog_medicine_id)
+    ).all()
+    return {med_id: _summary(*counts) for med_id, *counts in rows}
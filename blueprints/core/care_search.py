@@ -0,0 +1,194 @@
+# Standard library imports
+import re
+from datetime import datetime
+
+# Third-party imports
+from sqlalchemy import column, delete, event, func, insert, inspect, literal_column, select, table, update
+from sqlalchemy.orm import Session, joinedload
+
+# Local application imports
+from extensions import db
+from models import Appointment, CareSearchDocument, Dog, DogNote
+
+# Free text about dogs (dog notes, medical info and personality, care notes,
+# appointment descriptions) is copied into care_search_document, one row per
+# record, by the after_flush hook below. The backend's full-text index over it
+# (FTS5 on SQLite, a tsvector GIN index on PostgreSQL; see models.py) turns a
+# rescue-wide search for "ate sock" into an index lookup ranked by relevance.
+# scripts/backfill_care_search.py fills the table for existing records.
+
+DOG_SEARCH_FIELDS = ('notes', 'medical_info', 'personality_notes', 'energy_level', 'social_notes', 'special_story',
+                     'temperament_tags')
+NOTE_SEARCH_FIELDS = ('category', 'note_text')
+APPOINTMENT_SEARCH_FIELDS = ('title', 'description')
+SEARCH_FIELDS = {Dog: DOG_SEARCH_FIELDS, DogNote: NOTE_SEARCH_FIELDS, Appointment: APPOINTMENT_SEARCH_FIELDS}
+CARE_SEARCH_FTS = table('care_search_fts', column('rowid'))  # SQLite FTS5 table, see models.py
+MAX_SEARCH_TERMS = 8
+SNIPPET_LENGTH = 160
+
+
+# --- Documents ---
+
+def build_search_document(record):
+    """The care_search_document row for a dog, note or appointment, or None when it has no text."""
+    body = '\n'.join(str(value).strip() for value in (getattr(record, field) for field in SEARCH_FIELDS[type(record)])
+                     if value and str(value).strip())
+    if not body:
+        return None
+    dog_id = record.id if isinstance(record, Dog) else record.dog_id
+    return {
+        'rescue_id': record.rescue_id,
+        'dog_id': dog_id,
+        'source_model': type(record).__name__,
+        'source_id': record.id,
+        'body': body,
+        'updated_at': datetime.utcnow(),
+    }
+
+
+def _delete_documents(connection, source_model, source_ids):
+    source_ids = list(source_ids)
+    if source_ids:
+        table = CareSearchDocument.__table__
+        connection.execute(delete(table).where(table.c.source_model == source_model, table.c.source_id.in_(source_ids)))
+
+
+def _write_documents(connection, records):
+    """Replace the documents of records (all of one model) with freshly built ones."""
+    if not records:
+        return
+    _delete_documents(connection, type(records[0]).__name__, [record.id for record in records])
+    rows = [row for row in (build_search_document(record) for record in records) if row]
+    if rows:
+        connection.execute(insert(CareSearchDocument.__table__), rows)
+
+
+def _text_changed(target):
+    state = inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in SEARCH_FIELDS[type(target)])
+
+
+@event.listens_for(Session, 'after_flush')
+def _index_care_text(session, flush_context):
+    searchable = tuple(SEARCH_FIELDS)
+    changed = [target for target in session.new if isinstance(target, searchable)]
+    moved_dogs = []
+    for target in session.dirty:
+        if not isinstance(target, searchable) or not session.is_modified(target):
+            continue
+        if _text_changed(target):
+            changed.append(target)
+        elif isinstance(target, Dog):
+            moved_dogs.append(target)  # rescue_id is synced below
+    deleted = [target for target in session.deleted if isinstance(target, (DogNote, Appointment))]
+    if not (changed or moved_dogs or deleted):
+        return
+
+    connection = session.connection()
+    for model in searchable:
+        _write_documents(connection, [target for target in changed if type(target) is model])
+        _delete_documents(connection, model.__name__, [target.id for target in deleted if type(target) is model])
+    table = CareSearchDocument.__table__
+    for dog in moved_dogs + [target for target in changed if isinstance(target, Dog)]:
+        connection.execute(update(table).where(table.c.dog_id == dog.id, table.c.rescue_id != dog.rescue_id)
+                           .values(rescue_id=dog.rescue_id))
+
+
+@event.listens_for(Dog, 'before_delete')
+def _delete_dog_documents(mapper, connection, target):
+    connection.execute(delete(CareSearchDocument.__table__).where(CareSearchDocument.__table__.c.dog_id == target.id))
+
+
+def rebuild_care_search_documents(batch_size=500):
+    """
+    Rebuild care_search_document from dogs, notes and appointments.
+
+    Each model is walked in id order in batches, one transaction per batch;
+    documents are replaced, so running it again is safe.
+
+    Returns:
+        int: Number of documents written
+    """
+    written = 0
+    for model in SEARCH_FIELDS:
+        last_id = 0
+        while True:
+            batch = model.query.filter(model.id > last_id).order_by(model.id.asc()).limit(batch_size).all()
+            if not batch:
+                break
+            _write_documents(db.session.connection(), batch)
+            db.session.commit()
+            written += sum(1 for record in batch if build_search_document(record))
+            last_id = batch[-1].id
+    return written
+
+
+# --- Search ---
+
+def parse_search_terms(query_text):
+    """Lower-cased words of a search box entry; punctuation and operators are dropped."""
+    return re.findall(r'\w+', (query_text or '').lower())[:MAX_SEARCH_TERMS]
+
+
+def _sqlite_search(terms):
+    # Every term must match; the last one as a prefix so results follow typing
+    match = ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+    fts_table = literal_column('care_search_fts')
+    rank = -func.bm25(fts_table)  # bm25 is lower for better matches
+    statement = (select(CareSearchDocument, rank.label('score'))
+                 .join(CARE_SEARCH_FTS, CARE_SEARCH_FTS.c.rowid == CareSearchDocument.id)
+                 .where(fts_table.op('MATCH')(match.strip())))
+    return statement, rank
+
+
+def _postgresql_search(terms):
+    config = literal_column("'english'")  # Rendered inline so the planner matches the GIN expression index
+    tsquery = func.to_tsquery(config, ' & '.join(terms[:-1] + [f'{terms[-1]}:*']))
+    vector = func.to_tsvector(config, CareSearchDocument.body)
+    rank = func.ts_rank(vector, tsquery)
+    return select(CareSearchDocument, rank.label('score')).where(vector.op('@@')(tsquery)), rank
+
+
+def _fallback_search(terms):
+    rank = literal_column('0')
+    statement = select(CareSearchDocument, rank.label('score')).where(
+        *(CareSearchDocument.body.icontains(term, autoescape=True) for term in terms))
+    return statement, CareSearchDocument.updated_at
+
+
+def search_care_records(query_text, rescue_id=None, limit=20, offset=0):
+    """
+    Full-text search over dogs' notes, care notes and appointments, best matches first.
+
+    Words are stemmed ("limping" finds "limps") and all of them must match,
+    the last one as a prefix.
+
+    Args:
+        query_text (str): What was typed in the search box
+        rescue_id (int): Rescue to search, None for all rescues
+
+    Returns:
+        list: (CareSearchDocument, score) pairs; higher scores match better
+    """
+    terms = parse_search_terms(query_text)
+    if not terms:
+        return []
+    dialect = db.session.get_bind().dialect.name
+    build = {'sqlite': _sqlite_search, 'postgresql': _postgresql_search}.get(dialect, _fallback_search)
+    statement, rank = build(terms)
+    if rescue_id is not None:
+        statement = statement.where(CareSearchDocument.rescue_id == rescue_id)
+    statement = (statement.options(joinedload(CareSearchDocument.dog))
+                 .order_by(rank.desc(), CareSearchDocument.id.desc()).limit(limit).offset(offset))
+    return [(document, score) for document, score in db.session.execute(statement).all()]
+
+
+def build_snippet(body, terms, length=SNIPPET_LENGTH):
+    """A one-line excerpt of body around the first search term found in it."""
+    flat = ' '.join(body.split())
+    lower = flat.lower()
+    positions = [lower.find(term[:max(len(term) - 2, 3)]) for term in terms]  # Rough stem, so "limping" finds "limps"
+    start = min((position for position in positions if position >= 0), default=0)
+    start = max(start - length // 4, 0)
+    snippet = flat[start:start + length]
+    return ('...' if start > 0 else '') + snippet + ('...' if start + length < len(flat) else '')
@@ -0,0 +1,309 @@
+# Standard library imports
+import heapq
+from datetime import datetime, timedelta
+
+# Third-party imports
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+# Local application imports
+from blueprints.core.pagination import decode_cursor, encode_cursor
+from blueprints.core.recurrence import get_appointment_occurrences, get_recurring_series, single_criterion
+from blueprints.core.schedules import MISSED_DOSE_LOOKBACK, get_rescue_virtual_doses, merge_with_doses
+from blueprints.core.utils import reminder_keyset_after
+from extensions import db
+from models import Appointment, AppointmentType, DogMedicine, Reminder
+
+# Pending reminders shown on the dashboard, calendar and reminders API all come
+# from one range query over Reminder (eager-loading everything the templates
+# touch) merged with one virtual dose expansion, and are bucketed in Python.
+
+
+def get_pending_reminder_items(rescue_id, now=None, due_before=None, doses_until=None):
+    """
+    Get pending reminders and virtual doses for a rescue in one pass.
+
+    Args:
+        rescue_id (int): Effective rescue id, None for all rescues
+        now (datetime): Reference time (default: datetime.now())
+        due_before (datetime): Inclusive upper bound for stored reminders, None for no bound
+        doses_until (datetime): Inclusive end of the virtual dose window (default: due_before)
+
+    Returns:
+        list: Reminders and VirtualDoses sorted by due_datetime
+    """
+    now = now or datetime.now()
+    reminders_query = Reminder.query.options(
+        joinedload(Reminder.appointment).joinedload(Appointment.type),
+        joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
+        joinedload(Reminder.dog)
+    ).filter(Reminder.status == 'pending')
+    if rescue_id is not None:
+        reminders_query = reminders_query.filter(Reminder.rescue_id == rescue_id)
+    if due_before is not None:
+        reminders_query = reminders_query.filter(Reminder.due_datetime <= due_before)
+    reminders = reminders_query.order_by(Reminder.due_datetime.asc()).all()
+
+    doses_until = doses_until or due_before
+    if doses_until is None:
+        return reminders
+    # Unacknowledged doses only stay overdue for MISSED_DOSE_LOOKBACK
+    doses = get_rescue_virtual_doses(rescue_id, now - MISSED_DOSE_LOOKBACK, doses_until)
+    return merge_with_doses(reminders, doses)
+
+
+def bucket_reminders_by_due(items, now):
+    """
+    Split due-sorted reminders into overdue, today and upcoming buckets.
+
+    'today' holds everything due today, including what is already overdue,
+    matching the dashboard's "Today" list; 'upcoming' starts tomorrow.
+    """
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow_start = today_start + timedelta(days=1)
+    buckets = {'overdue': [], 'today': [], 'upcoming': []}
+    for item in items:
+        if item.due_datetime < now:
+            buckets['overdue'].append(item)
+        if item.due_datetime >= tomorrow_start:
+            buckets['upcoming'].append(item)
+        elif item.due_datetime >= today_start:
+            buckets['today'].append(item)
+    return buckets
+
+
+def get_dashboard_reminders(rescue_id, now=None):
+    """Get the dashboard's overdue and today reminder buckets: everything pending up to the end of today."""
+    now = now or datetime.now()
+    today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+    items = get_pending_reminder_items(rescue_id, now=now, due_before=today_end)
+    return bucket_reminders_by_due(items, now)
+
+
+CALENDAR_GROUP_ORDER = ["Vet Reminders", "Medication Reminders", "Other Reminders"]
+DOSE_CALENDAR_GROUP = "Medication Reminders"
+
+
+def group_reminders_for_calendar(items):
+    """Group reminders into the calendar sidebar's Vet/Medication/Other (plus Grooming) groups."""
+    group_order = CALENDAR_GROUP_ORDER
+    grouped_reminders = {group: [] for group in group_order}
+    for reminder in items:
+        group_name = "Other Reminders"
+        if reminder.appointment_id and reminder.appointment:
+            if reminder.appointment.type:
+                type_name = reminder.appointment.type.name.lower()
+                if "vet" in type_name:
+                    group_name = "Vet Reminders"
+                elif "grooming" in type_name:
+                    group_name = "Grooming Reminders"
+            # else falls to Other Reminders
+        elif reminder.dog_medicine_id:
+            group_name = "Medication Reminders"
+        grouped_reminders.setdefault(group_name, []).append(reminder)
+
+    ordered_final_groups = {group: grouped_reminders[group] for group in group_order}
+    other_dynamic_groups = {k: v for k, v in sorted(grouped_reminders.items()) if k not in ordered_final_groups and v}
+    ordered_final_groups.update(other_dynamic_groups)
+    return ordered_final_groups
+
+
+def get_calendar_stats(rescue_id, active_reminders, now=None):
+    """
+    Get the calendar page's stat counters with a single aggregate query.
+
+    Occurrences of recurring appointments this week are expanded and added to
+    the today/week counts; the totals count each series once.
+
+    Args:
+        rescue_id (int): Effective rescue id, None for all rescues
+        active_reminders (int): Number of pending reminders already loaded for the page
+        now (datetime): Reference time (default: datetime.now())
+
+    Returns:
+        dict: The calendar_stats values rendered by calendar_view.html
+    """
+    now = now or datetime.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+    week_from_today = now + timedelta(days=7)
+
+    def count_appointments(*criteria):
+        query = select(func.count(Appointment.id)).where(*criteria)
+        if rescue_id is not None:
+            query = query.where(Appointment.rescue_id == rescue_id)
+        return query.scalar_subquery()
+
+    active_medicines = select(func.count(DogMedicine.id)).where(DogMedicine.status == 'active')
+    if rescue_id is not None:
+        active_medicines = active_medicines.where(DogMedicine.rescue_id == rescue_id)
+
+    appointments_today, appointments_week, total_appointments, total_medicines = db.session.execute(select(
+        count_appointments(single_criterion(), Appointment.start_datetime >= today_start, Appointment.start_datetime <= today_end),
+        count_appointments(single_criterion(), Appointment.start_datetime >= today_start, Appointment.start_datetime <= week_from_today),
+        count_appointments(),
+        active_medicines.scalar_subquery()
+    )).one()
+    occurrences = get_appointment_occurrences(get_recurring_series(rescue_id, today_start, week_from_today).all(),
+                                              today_start, week_from_today)
+    appointments_today += sum(1 for occurrence in occurrences if occurrence.start_datetime <= today_end)
+    appointments_week += len(occurrences)
+
+    return {
+        'today_count': appointments_today + total_medicines,
+        'week_count': appointments_week + total_medicines,  # medicines are ongoing
+        'medications_today': total_medicines,
+        'appointments_week': appointments_week,
+        'active_reminders': active_reminders,
+        'total_events': total_appointments + total_medicines + active_reminders,
+        'medications_count': total_medicines,
+        'appointments_count': total_appointments,
+        'monitoring_count': 0  # Placeholder for now
+    }
+
+
+# The same grouping in SQL, so the reminders API can count and paginate per group.
+# Within a group rows are ordered by (due_datetime, source, id); stored reminders
+# sort before virtual doses due at the same time.
+STORED_SOURCE = 0
+DOSE_SOURCE = 1
+
+
+def calendar_group_expression():
+    """SQL CASE equivalent of group_reminders_for_calendar (needs the joins from _calendar_group_select)."""
+    type_name = func.lower(AppointmentType.name)
+    return case(
+        (and_(Appointment.id.isnot(None), type_name.like('%vet%')), "Vet Reminders"),
+        (and_(Appointment.id.isnot(None), type_name.like('%grooming%')), "Grooming Reminders"),
+        (Appointment.id.isnot(None), "Other Reminders"),
+        (Reminder.dog_medicine_id.isnot(None), "Medication Reminders"),
+        else_="Other Reminders"
+    )
+
+
+def _calendar_group_select(rescue_id, *columns):
+    query = select(*columns).select_from(Reminder).outerjoin(
+        Appointment, Reminder.appointment_id == Appointment.id
+    ).outerjoin(
+        AppointmentType, Appointment.type_id == AppointmentType.id
+    ).where(Reminder.status == 'pending')
+    if rescue_id is not None:
+        query = query.where(Reminder.rescue_id == rescue_id)
+    return query
+
+
+def reminder_sort_key(item):
+    """Keyset order of reminders and doses listed together: (due_datetime, source, id)."""
+    return (item.due_datetime, DOSE_SOURCE if item.is_virtual else STORED_SOURCE, item.id)
+
+
+def decode_reminder_cursor(cursor):
+    """
+    Decode a next_cursor from build_reminder_page.
+
+    Raises:
+        ValueError: If cursor is malformed
+
+    Returns:
+        tuple: The reminder_sort_key of the last item on the previous page
+    """
+    due, source, last_id = decode_cursor(cursor, datetime, int, (int, str))
+    if (source, type(last_id)) not in ((STORED_SOURCE, int), (DOSE_SOURCE, str)):
+        raise ValueError('Invalid cursor: unknown row source')
+    return due, source, last_id
+
+
+def stored_reminders_after(key):
+    """SQL criterion for stored reminders after a decoded cursor key."""
+    due, source, last_id = key
+    # Doses sort after every stored row due at the same time
+    return reminder_keyset_after(due, last_id if source == STORED_SOURCE else None)
+
+
+def doses_after(doses, key):
+    """Doses after a decoded cursor key, in keyset order."""
+    return sorted((dose for dose in doses if reminder_sort_key(dose) > key), key=reminder_sort_key)
+
+
+def build_reminder_page(stored, doses, limit):
+    """Merge stored rows and doses (both sorted, both past the cursor) into one page and its next_cursor."""
+    items = list(heapq.merge(stored, doses, key=reminder_sort_key))
+    page = items[:limit]
+    next_cursor = encode_cursor(*reminder_sort_key(page[-1])) if len(items) > limit else None
+    return page, next_cursor
+
+
+def _order_groups(names):
+    return [group for group in CALENDAR_GROUP_ORDER if group in names] + \
+        sorted(name for name in names if name not in CALENDAR_GROUP_ORDER)
+
+
+def get_calendar_reminder_groups(rescue_id, doses, limit):
+    """
+    Count pending reminders per calendar group and load each group's first page.
+
+    Uses one GROUP BY query for the counts and one row_number() query for the
+    first limit rows of every group; doses are added to the medication group.
+
+    Args:
+        rescue_id (int): Effective rescue id, None for all rescues
+        doses (list): VirtualDoses to list in the medication group
+        limit (int): Page size per group
+
+    Returns:
+        dict: group name -> {'count', 'reminders', 'next_cursor'}, in display order
+    """
+    doses = sorted(doses, key=reminder_sort_key)  # Keyset order, not get_virtual_doses' (due, medicine) order
+    group = calendar_group_expression()
+    counts = dict(db.session.execute(_calendar_group_select(rescue_id, group, func.count(Reminder.id)).group_by(group)).all())
+    if doses:
+        counts[DOSE_CALENDAR_GROUP] = counts.get(DOSE_CALENDAR_GROUP, 0) + len(doses)
+
+    ranked = _calendar_group_select(
+        rescue_id,
+        Reminder.id,
+        group.label('calendar_group'),
+        func.row_number().over(partition_by=group, order_by=(Reminder.due_datetime, Reminder.id)).label('position')
+    ).subquery()
+    rows = db.session.execute(
+        select(Reminder, ranked.c.calendar_group)
+        .join(ranked, ranked.c.id == Reminder.id)
+        .where(ranked.c.position <= limit + 1)
+        .options(selectinload(Reminder.dog))
+        .order_by(Reminder.due_datetime, Reminder.id)
+    ).all()
+    stored_by_group = {}
+    for reminder, group_name in rows:
+        stored_by_group.setdefault(group_name, []).append(reminder)
+
+    groups = {}
+    for group_name in _order_groups(counts):
+        page, next_cursor = build_reminder_page(
+            stored_by_group.get(group_name, []),
+            doses if group_name == DOSE_CALENDAR_GROUP else [],
+            limit
+        )
+        groups[group_name] = {'count': counts[group_name], 'reminders': page, 'next_cursor': next_cursor}
+    return groups
+
+
+def get_calendar_reminder_group_page(rescue_id, group_name, cursor, doses, limit):
+    """
+    Load the page of a calendar group that follows cursor.
+
+    Raises:
+        ValueError: If cursor is malformed
+
+    Returns:
+        tuple: (reminders, next_cursor)
+    """
+    key = decode_reminder_cursor(cursor)
+    stored = db.session.execute(
+        _calendar_group_select(rescue_id, Reminder)
+        .where(calendar_group_expression() == group_name, stored_reminders_after(key))
+        .options(selectinload(Reminder.dog))
+        .order_by(Reminder.due_datetime, Reminder.id)
+        .limit(limit + 1)
+    ).scalars().all()
+    doses = doses_after(doses, key) if group_name == DOSE_CALENDAR_GROUP else []
+    return build_reminder_page(stored, doses, limit)
@@ -0,0 +1,445 @@
+# Standard library imports
+from datetime import datetime, timedelta
+from itertools import chain
+from types import SimpleNamespace
+
+# Third-party imports
+from sqlalchemy import and_, delete, event, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+
+# Local application imports
+from extensions import db
+from models import (Appointment, AppointmentType, Dog, DogEvent, DogMedicine,
+                    DogNote, MedicinePreset, Reminder, ReminderArchive, User)
+
+# A dog's history timeline is stored in dog_event as it happens instead of
+# being rebuilt from every source table on each view. The after_flush hook
+# below turns ORM inserts, updates and deletes of dogs, notes, appointments,
+# medicines and reminders into event rows in the same transaction; the Core
+# reminder writers in reminders.py append theirs with append_reminder_events.
+# Events describing a record (intake, a note, an appointment, a medicine, a
+# created reminder) follow the record when it is edited or deleted; updates,
+# status changes and personality observations are appended. Reminders moved
+# to the archive keep their events. scripts/backfill_dog_events.py rebuilds the table from the
+# source tables with rebuild_dog_events.
+
+PERSONALITY_FIELDS = ('personality_notes', 'energy_level', 'social_notes', 'special_story', 'temperament_tags')
+MEDICINE_UPDATE_FIELDS = ('dosage', 'unit', 'form', 'frequency', 'frequency_value', 'dose_times', 'status')
+MEDICINE_RECORD_EVENT_PREFIXES = ('Medication - ', 'Medication Logged - ', 'Medication Ended - ')
+DOG_EVENT_BATCH_SIZE = 500  # Events per query when walking a whole timeline
+HANDLED_REMINDER_STATUSES = ('acknowledged', 'dismissed')
+
+
+def _row(dog_id, rescue_id, timestamp, event_type, description, author, source_model, source_id):
+    return {
+        'dog_id': dog_id,
+        'rescue_id': rescue_id,
+        'timestamp': timestamp,
+        'event_type': event_type,
+        'description': description,
+        'author': author,
+        'source_model': source_model,
+        'source_id': source_id,
+    }
+
+
+def _names(connection, id_column, name_column, ids):
+    ids = {id_ for id_ in ids if id_ is not None}
+    if not ids:
+        return {}
+    return dict(connection.execute(select(id_column, name_column).where(id_column.in_(ids))).all())
+
+
+class _Lookups:
+    """User, appointment type and preset names for a set of records, one query per table."""
+
+    def __init__(self, connection, notes=(), appointments=(), medicines=(), reminders=()):
+        self.users = _names(connection, User.id, User.name, chain(
+            (note.user_id for note in notes),
+            (appt.created_by for appt in appointments),
+            (med.created_by for med in medicines),
+            (reminder.user_id for reminder in reminders),
+        ))
+        self.types = _names(connection, AppointmentType.id, AppointmentType.name, (appt.type_id for appt in appointments))
+        self.presets = _names(connection, MedicinePreset.id, MedicinePreset.name, (med.medicine_id for med in medicines))
+
+    def medicine_name(self, med):
+        return med.custom_name or self.presets.get(med.medicine_id) or "Unnamed Medicine"
+
+
+# --- Event builders ---
+
+def intake_events(dog):
+    if not dog.intake_date:
+        return []
+    return [_row(dog.id, dog.rescue_id, datetime.combine(dog.intake_date, datetime.min.time()), 'Dog Record',
+                 f'{dog.name} was taken into care.', 'System', 'Dog', dog.id)]
+
+
+def has_personality(dog):
+    return any(getattr(dog, field) for field in PERSONALITY_FIELDS)
+
+
+def personality_event(dog, timestamp):
+    details = []
+    if dog.energy_level:
+        details.append(f"Energy level: {dog.energy_level}")
+    if dog.temperament_tags:
+        tags = [tag.strip() for tag in dog.temperament_tags.split(',') if tag.strip()]
+        if tags:
+            details.append(f"Traits: {', '.join(tags[:3])}")
+    if dog.personality_notes:
+        details.append(f"Character: {dog.personality_notes[:100]}{'...' if len(dog.personality_notes) > 100 else ''}")
+    if dog.social_notes:
+        details.append(f"Social: {dog.social_notes[:100]}{'...' if len(dog.social_notes) > 100 else ''}")
+    description = f"Personality observations recorded for {dog.name}. " + " | ".join(details)
+    return _row(dog.id, dog.rescue_id, timestamp, 'Personality Profile', description, 'Care Team', 'DogPersonality', dog.id)
+
+
+def note_events(note, lookups):
+    return [_row(note.dog_id, note.rescue_id, note.timestamp, f'Note - {note.category}', note.note_text,
+                 lookups.users.get(note.user_id, 'Unknown User'), 'DogNote', note.id)]
+
+
+def _appointment_type_name(appt, lookups):
+    return lookups.types.get(appt.type_id, 'General')
+
+
+def appointment_events(appt, lookups):
+    return [_row(appt.dog_id, appt.rescue_id, appt.created_at or datetime.utcnow(),
+                 f'Appointment - {_appointment_type_name(appt, lookups)}',
+                 f'Appointment "{appt.title}" scheduled for {appt.start_datetime.strftime("%Y-%m-%d %I:%M %p")}. Status: {appt.status}.',
+                 lookups.users.get(appt.created_by, 'System/Unknown'), 'Appointment', appt.id)]
+
+
+def appointment_update_event(appt, lookups, timestamp):
+    return _row(appt.dog_id, appt.rescue_id, timestamp, f'Appointment Update - {_appointment_type_name(appt, lookups)}',
+                f'Details for appointment "{appt.title}" were updated. New Status: {appt.status}.',
+                'System/Unknown', 'Appointment', appt.id)
+
+
+def medicine_events(med, lookups):
+    """Start event, plus a logged event when the record was created ahead of the start date."""
+    name = lookups.medicine_name(med)
+    author = lookups.users.get(med.created_by, 'System/Unknown')
+    start = datetime.combine(med.start_date, datetime.min.time())
+    events = [_row(med.dog_id, med.rescue_id, start, f'Medication - {name}',
+                   f'Started medication: {name}. Dosage: {med.dosage} {med.unit}, Frequency: {med.frequency}. Status: {med.status}.',
+                   author, 'DogMedicine', med.id)]
+    created_at = med.created_at or datetime.utcnow()
+    if created_at.date() != med.start_date and created_at < start:
+        events.append(_row(med.dog_id, med.rescue_id, created_at, f'Medication Logged - {name}',
+                           f'Medication record for {name} was created/updated.', author, 'DogMedicine', med.id))
+    return events + medicine_ended_events(med, lookups)
+
+
+def medicine_ended_events(med, lookups):
+    if not med.end_date:
+        return []
+    name = lookups.medicine_name(med)
+    return [_row(med.dog_id, med.rescue_id, datetime.combine(med.end_date, datetime.max.time()) - timedelta(seconds=1),
+                 f'Medication Ended - {name}', f'Ended medication: {name}.',
+                 lookups.users.get(med.created_by, 'System/Unknown'), 'DogMedicine', med.id)]
+
+
+def medicine_update_event(med, lookups, timestamp):
+    name = lookups.medicine_name(med)
+    return _row(med.dog_id, med.rescue_id, timestamp, f'Medication Update - {name}',
+                f'Medication {name} was updated. Dosage: {med.dosage} {med.unit}, Frequency: {med.frequency}. Status: {med.status}.',
+                'System/Unknown', 'DogMedicine', med.id)
+
+
+def reminder_created_event(reminder, lookups):
+    return _row(reminder.dog_id, reminder.rescue_id, reminder.created_at or datetime.utcnow(), 'Reminder Created',
+                f'Reminder set: "{reminder.message}" due {reminder.due_datetime.strftime("%Y-%m-%d %I:%M %p")}',
+                lookups.users.get(reminder.user_id, 'System'), 'Reminder', reminder.id)
+
+
+def reminder_status_event(reminder, lookups, timestamp):
+    return _row(reminder.dog_id, reminder.rescue_id, timestamp, f'Reminder {reminder.status.title()}',
+                f'Reminder "{reminder.message}" was {reminder.status}.',
+                lookups.users.get(reminder.user_id, 'System'), 'Reminder', reminder.id)
+
+
+def reminder_events(reminder, lookups):
+    """Created event, plus the status event of a handled reminder."""
+    events = [reminder_created_event(reminder, lookups)]
+    if reminder.status in HANDLED_REMINDER_STATUSES:
+        events.append(reminder_status_event(reminder, lookups, reminder.updated_at or reminder.created_at or datetime.utcnow()))
+    return events
+
+
+# --- Writers ---
+
+def insert_dog_events(connection, rows):
+    if rows:
+        connection.execute(insert(DogEvent.__table__), rows)
+
+
+def delete_source_events(connection, source_model, source_ids, event_type_prefix=None):
+    """Delete the events of deleted (or rewritten) source records, optionally only those whose type starts with one of event_type_prefix."""
+    source_ids = list(source_ids)
+    if not source_ids:
+        return
+    table = DogEvent.__table__
+    statement = delete(table).where(table.c.source_model == source_model, table.c.source_id.in_(source_ids))
+    if event_type_prefix:
+        prefixes = (event_type_prefix,) if isinstance(event_type_prefix, str) else event_type_prefix
+        statement = statement.where(or_(*(table.c.event_type.startswith(prefix, autoescape=True) for prefix in prefixes)))
+    connection.execute(statement)
+
+
+def append_reminder_events(connection, rows, timestamp=None):
+    """
+    Events for reminders written with Core statements, which the ORM hook doesn't see.
+
+    Args:
+        rows (list): Reminder column mappings including id; rows that aren't
+            pending get their status event as well
+        timestamp (datetime): When they were written (default now)
+    """
+    if not rows:
+        return
+    timestamp = timestamp or datetime.utcnow()
+    reminders = [SimpleNamespace(**{'created_at': timestamp, 'updated_at': timestamp, 'user_id': None, **row}) for row in rows]
+    lookups = _Lookups(connection, reminders=reminders)
+    insert_dog_events(connection, [event for reminder in reminders for event in reminder_events(reminder, lookups)])
+
+
+def append_reminder_status_events(connection, reminders, timestamp=None):
+    """Status events for reminders acknowledged or dismissed with a Core UPDATE (mappings including id and status)."""
+    if not reminders:
+        return
+    timestamp = timestamp or datetime.utcnow()
+    reminders = [SimpleNamespace(**reminder) for reminder in reminders]
+    lookups = _Lookups(connection, reminders=reminders)
+    insert_dog_events(connection, [reminder_status_event(reminder, lookups, timestamp) for reminder in reminders])
+
+
+def _changed(target, fields):
+    state = inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_dog_events(session, flush_context):
+    new = [target for target in session.new if isinstance(target, (Dog, DogNote, Appointment, DogMedicine, Reminder))]
+    dirty = [target for target in session.dirty
+             if isinstance(target, (Dog, DogNote, Appointment, DogMedicine, Reminder)) and session.is_modified(target)]
+    deleted = [target for target in session.deleted if isinstance(target, (DogNote, Appointment, DogMedicine, Reminder))]
+    if not (new or dirty or deleted):
+        return
+
+    connection = session.connection()
+    records = new + dirty
+    lookups = _Lookups(
+        connection,
+        notes=[target for target in records if isinstance(target, DogNote)],
+        appointments=[target for target in records if isinstance(target, Appointment)],
+        medicines=[target for target in records if isinstance(target, DogMedicine)],
+        reminders=[target for target in records if isinstance(target, Reminder)],
+    )
+    now = datetime.utcnow()
+    rows = []
+
+    for target in new:
+        if isinstance(target, Dog):
+            rows += intake_events(target)
+            if has_personality(target):
+                rows.append(personality_event(target, now))
+        elif isinstance(target, DogNote):
+            rows += note_events(target, lookups)
+        elif isinstance(target, Appointment):
+            rows += appointment_events(target, lookups)
+        elif isinstance(target, DogMedicine):
+            rows += medicine_events(target, lookups)
+        else:
+            rows += reminder_events(target, lookups)
+
+    for target in dirty:
+        if isinstance(target, Dog):
+            if _changed(target, ('name', 'intake_date')):
+                delete_source_events(connection, 'Dog', [target.id])
+                rows += intake_events(target)
+            if _changed(target, PERSONALITY_FIELDS) and has_personality(target):
+                rows.append(personality_event(target, now))
+            if _changed(target, ('rescue_id',)):
+                connection.execute(update(DogEvent.__table__).where(DogEvent.__table__.c.dog_id == target.id)
+                                   .values(rescue_id=target.rescue_id))
+        elif isinstance(target, DogNote):
+            delete_source_events(connection, 'DogNote', [target.id])
+            rows += note_events(target, lookups)
+        elif isinstance(target, Appointment):
+            delete_source_events(connection, 'Appointment', [target.id], event_type_prefix='Appointment - ')
+            rows += appointment_events(target, lookups)
+            rows.append(appointment_update_event(target, lookups, now))
+        elif isinstance(target, DogMedicine):
+            delete_source_events(connection, 'DogMedicine', [target.id], event_type_prefix=MEDICINE_RECORD_EVENT_PREFIXES)
+            rows += medicine_events(target, lookups)
+            if _changed(target, MEDICINE_UPDATE_FIELDS):
+                rows.append(medicine_update_event(target, lookups, now))
+        else:
+            if _changed(target, ('message', 'due_datetime')):
+                delete_source_events(connection, 'Reminder', [target.id], event_type_prefix='Reminder Created')
+                rows.append(reminder_created_event(target, lookups))
+            if _changed(target, ('status',)) and target.status in HANDLED_REMINDER_STATUSES:
+                rows.append(reminder_status_event(target, lookups, now))
+
+    for model_name, model in (('DogNote', DogNote), ('Appointment', Appointment), ('DogMedicine', DogMedicine), ('Reminder', Reminder)):
+        delete_source_events(connection, model_name, [target.id for target in deleted if isinstance(target, model)])
+
+    insert_dog_events(connection, rows)
+
+
+@event.listens_for(Dog, 'before_delete')
+def _delete_dog_events(mapper, connection, target):
+    connection.execute(delete(DogEvent.__table__).where(DogEvent.__table__.c.dog_id == target.id))
+
+
+# --- Backfill ---
+
+def rebuild_dog_events(dog_ids=None, batch_size=100, now=None):
+    """
+    Rebuild dog_event from the source tables.
+
+    Dogs are processed in id order in batches of batch_size, each batch in
+    its own transaction: its events are deleted and regenerated, so running
+    it again is safe. Appointment updates are reconstructed from updated_at
+    only (one per appointment), and personality profiles are stamped now, as
+    neither has any earlier history to recover.
+
+    Args:
+        dog_ids (list): Dogs to rebuild, None for all dogs
+
+    Returns:
+        int: Number of events written
+    """
+    now = now or datetime.utcnow()
+    dogs_query = Dog.query
+    if dog_ids is not None:
+        dogs_query = dogs_query.filter(Dog.id.in_(dog_ids))
+    written = 0
+    last_id = 0
+    while True:
+        dogs = dogs_query.filter(Dog.id > last_id).order_by(Dog.id.asc()).limit(batch_size).all()
+        if not dogs:
+            break
+        ids = [dog.id for dog in dogs]
+        notes = DogNote.query.filter(DogNote.dog_id.in_(ids)).all()
+        appointments = Appointment.query.filter(Appointment.dog_id.in_(ids)).all()
+        medicines = DogMedicine.query.filter(DogMedicine.dog_id.in_(ids)).all()
+        reminders = Reminder.query.filter(Reminder.dog_id.in_(ids)).all()
+        reminders += ReminderArchive.query.filter(ReminderArchive.dog_id.in_(ids)).all()
+        connection = db.session.connection()
+        lookups = _Lookups(connection, notes=notes, appointments=appointments, medicines=medicines, reminders=reminders)
+
+        rows = []
+        for dog in dogs:
+            rows += intake_events(dog)
+            if has_personality(dog):
+                rows.append(personality_event(dog, now))
+        for note in notes:
+            rows += note_events(note, lookups)
+        for appt in appointments:
+            rows += appointment_events(appt, lookups)
+            if appt.updated_at and appt.updated_at != appt.created_at:
+                rows.append(appointment_update_event(appt, lookups, appt.updated_at))
+        for med in medicines:
+            rows += medicine_events(med, lookups)
+        for reminder in reminders:
+            rows += reminder_events(reminder, lookups)
+
+        connection.execute(delete(DogEvent.__table__).where(DogEvent.__table__.c.dog_id.in_(ids)))
+        insert_dog_events(connection, rows)
+        db.session.commit()
+        written += len(rows)
+        last_id = dogs[-1].id
+    return written
+
+
+# --- Reads ---
+
+def get_dog_events_query(dog_id):
+    """A dog's timeline, newest first (an index range scan on (dog_id, timestamp))."""
+    return DogEvent.query.filter(DogEvent.dog_id == dog_id).order_by(DogEvent.timestamp.desc(), DogEvent.id.desc())
+
+
+def filter_dog_events(query, start=None, end=None, event_types=(), categories=(), search=None):
+    """
+    Narrow a timeline query with the history page's filters, in SQL.
+
+    Matching is case-insensitive and by substring, as the filters have always
+    been: an event type filter of "medication" matches "Medication Ended - X".
+
+    Args:
+        start (datetime): Keep events at or after this time
+        end (datetime): Keep events before this time
+        event_types (list): Keep events whose type contains any of these
+        categories (list): Keep note events whose category contains any of these
+        search (str): Keep events whose description or type contains this
+    """
+    if start is not None:
+        query = query.filter(DogEvent.timestamp >= start)
+    if end is not None:
+        query = query.filter(DogEvent.timestamp < end)
+    if event_types:
+        query = query.filter(or_(*(DogEvent.event_type.icontains(event_type, autoescape=True) for event_type in event_types)))
+    if categories:
+        query = query.filter(DogEvent.event_type.startswith('Note - ', autoescape=True),
+                             or_(*(DogEvent.event_type.icontains(category, autoescape=True) for category in categories)))
+    if search:
+        query = query.filter(or_(DogEvent.description.icontains(search, autoescape=True),
+                                 DogEvent.event_type.icontains(search, autoescape=True)))
+    return query
+
+
+def dog_event_keyset_before(timestamp, event_id):
+    """SQL criterion for events after a (timestamp, id) position in newest-first order."""
+    return or_(DogEvent.timestamp < timestamp, and_(DogEvent.timestamp == timestamp, DogEvent.id < event_id))
+
+
+def get_recent_dog_events(rescue_id=None, limit=20):
+    """
+    The newest events across all of a rescue's dogs (None for all rescues).
+
+    One index range scan on (rescue_id, timestamp), or on timestamp for all
+    rescues, stopped after limit rows.
+    """
+    query = DogEvent.query.options(joinedload(DogEvent.dog))
+    if rescue_id is not None:
+        query = query.filter(DogEvent.rescue_id == rescue_id)
+    return query.order_by(DogEvent.timestamp.desc(), DogEvent.id.desc()).limit(limit).all()
+
+
+def iter_dog_events(dog_id, query=None, batch_size=DOG_EVENT_BATCH_SIZE):
+    """
+    Yield a dog's timeline newest first, fetched in keyset batches.
+
+    Only one batch is held at a time and nothing past the last batch consumed
+    is read, so callers that stop early (islice) or stream the output (CSV
+    exports) cost the same however long the history is.
+
+    Args:
+        query: A timeline query to walk instead (e.g. narrowed by filter_dog_events)
+    """
+    query = query if query is not None else get_dog_events_query(dog_id)
+    batch = query.limit(batch_size).all()
+    while batch:
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        last = batch[-1]
+        batch = query.filter(dog_event_keyset_before(last.timestamp, last.id)).limit(batch_size).all()
+
+
+def get_dog_events_page(dog_id, page=1, per_page=50):
+    """
+    One page of a dog's timeline.
+
+    Returns:
+        tuple: (events, total)
+    """
+    query = get_dog_events_query(dog_id)
+    total = query.order_by(None).count()
+    events = query.offset((max(page, 1) - 1) * per_page).limit(per_page).all()
+    return events, total
@@ -0,0 +1,49 @@
+# Standard library imports
+import hashlib
+
+# Third-party imports
+from flask import current_app, request
+from sqlalchemy import func, select
+
+# Local application imports
+from extensions import db
+from models import Rescue
+
+# Conditional GET for JSON endpoints whose payload is a function of a rescue's
+# data (Rescue.data_version, bumped by the hooks in models.py) and the request
+# arguments. The version lookup is a single-row Core select, so an unchanged
+# payload is answered with 304 Not Modified before any ORM work.
+
+
+def get_rescue_data_version(rescue_id):
+    """Current data version of a rescue, or of all rescues together when rescue_id is None."""
+    if rescue_id is None:
+        total, count = db.session.execute(
+            select(func.coalesce(func.sum(Rescue.data_version), 0), func.count(Rescue.id))
+        ).one()
+        return f"{total}.{count}"
+    return str(db.session.execute(select(Rescue.data_version).where(Rescue.id == rescue_id)).scalar() or 0)
+
+
+def build_etag(*parts):
+    """Strong ETag value for a payload determined entirely by parts."""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def get_rescue_etag(rescue_id, *parts):
+    """ETag for the current request's payload of a rescue (None for all rescues)."""
+    return build_etag(request.path, rescue_id, get_rescue_data_version(rescue_id), *parts)
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already has etag, otherwise None."""
+    if request.if_none_match.contains(etag):
+        return with_etag(current_app.response_class(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Attach etag and ask the browser to revalidate before reusing the cached payload."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
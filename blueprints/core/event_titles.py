@@ -0,0 +1,112 @@
+# Standard library imports
+import re
+from functools import lru_cache
+
+# Third-party imports
+from sqlalchemy import event
+
+# Local application imports
+from models import AppointmentType, MedicinePreset
+
+# Calendar event titles are "DogName: Category", where the dog name has intake
+# codes stripped and the category is mapped from the appointment type or
+# medicine name by keyword. The result depends only on the source string, so
+# each is classified once and memoized; the memo is cleared whenever appointment
+# types or medicine presets change so it doesn't keep renamed entries around.
+
+TITLE_CACHE_SIZE = 4096
+
+
+def _keywords(*words):
+    """Compile a substring alternation equivalent to any(word in text for word in words)."""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# Intake codes in front of dog names, e.g. "9-C ", "10-O ", "123-A ", "12 ", "7B "
+_DOG_CODE_PREFIX_PATTERN = re.compile(r'^\d+-[A-Z]+\s+')
+_DOG_NUMBER_PREFIX_PATTERN = re.compile(r'^\d+[A-Z]?\s+')
+# Rescue/product naming left over on unrecognized types
+_RESCUE_PREFIX_PATTERN = re.compile(r'^Rescue\w*\s*', re.IGNORECASE)
+_PRODUCT_SUFFIX_PATTERN = re.compile(r'\s*(NSAID|Probiotic|Multivitamin|Supplement)\s*$', re.IGNORECASE)
+
+# Appointment types that are really medication products
+APPOINTMENT_MEDICATION_KEYWORDS = _keywords('rescue', 'nsaid', 'medication', 'medicine', 'drug', 'pill', 'tablet', 'dose')
+APPOINTMENT_MEDICATION_RULES = [
+    (_keywords('comfort', 'nsaid', 'pain', 'anti-inflammatory'), 'Pain Medication'),
+    (_keywords('digest', 'probiotic', 'stomach', 'gastro'), 'Digestive Medication'),
+    (_keywords('vitamin', 'supplement', 'nutrition'), 'Vitamin/Supplement'),
+    (_keywords('oil', 'omega', 'fatty'), 'Nutritional Oil'),
+    (_keywords('benadryl', 'diphenhydramine', 'allergy', 'antihistamine'), 'Allergy Medication'),
+]
+APPOINTMENT_RULES = [
+    (_keywords('vet', 'visit', 'checkup', 'exam', 'doctor'), 'Vet Visit'),
+    (_keywords('groom', 'bath', 'nail', 'trim'), 'Grooming'),
+    (_keywords('adoption', 'adopt', 'home'), 'Adoption'),
+    (_keywords('surgery', 'operation', 'procedure'), 'Surgery'),
+]
+
+# Rescue-branded medicine products
+MEDICINE_PRODUCT_KEYWORDS = _keywords('rescue', 'nsaid', 'comfort')
+MEDICINE_PRODUCT_RULES = [
+    (_keywords('comfort', 'nsaid', 'pain'), 'Pain Medication'),
+    (_keywords('digest', 'probiotic'), 'Digestive Medication'),
+    (_keywords('oil', 'omega'), 'Nutritional Oil'),
+    (_keywords('vitamin', 'multivitamin'), 'Vitamin/Supplement'),
+]
+MEDICINE_RULES = [
+    (_keywords('benadryl', 'diphenhydramine'), 'Allergy Medication'),
+]
+
+
+def _first_match(rules, text, default):
+    for pattern, label in rules:
+        if pattern.search(text):
+            return label
+    return default
+
+
+def _classify(name, product_keywords, product_rules, rules, empty_label):
+    lowered = name.lower()
+    if product_keywords.search(lowered):
+        return _first_match(product_rules, lowered, 'Medication')
+    label = _first_match(rules, lowered, None)
+    if label:
+        return label
+    cleaned = _PRODUCT_SUFFIX_PATTERN.sub('', _RESCUE_PREFIX_PATTERN.sub('', name))
+    return cleaned if cleaned.strip() else empty_label
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def clean_dog_name(dog_name):
+    """Strip intake codes from the front of a dog name."""
+    return _DOG_NUMBER_PREFIX_PATTERN.sub('', _DOG_CODE_PREFIX_PATTERN.sub('', dog_name))
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def classify_appointment_type(type_name):
+    """Map an appointment type name (or title) to the category shown on the calendar."""
+    return _classify(type_name, APPOINTMENT_MEDICATION_KEYWORDS, APPOINTMENT_MEDICATION_RULES,
+                     APPOINTMENT_RULES, 'Appointment')
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def classify_medicine_name(medicine_name):
+    """Map a medicine preset or custom name to the category shown on the calendar."""
+    return _classify(medicine_name, MEDICINE_PRODUCT_KEYWORDS, MEDICINE_PRODUCT_RULES,
+                     MEDICINE_RULES, 'Medication')
+
+
+def clear_title_cache():
+    clean_dog_name.cache_clear()
+    classify_appointment_type.cache_clear()
+    classify_medicine_name.cache_clear()
+
+
+@event.listens_for(AppointmentType, 'after_insert')
+@event.listens_for(AppointmentType, 'after_update')
+@event.listens_for(AppointmentType, 'after_delete')
+@event.listens_for(MedicinePreset, 'after_insert')
+@event.listens_for(MedicinePreset, 'after_update')
+@event.listens_for(MedicinePreset, 'after_delete')
+def _invalidate_title_cache(mapper, connection, target):
+    clear_title_cache()
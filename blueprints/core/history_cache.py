@@ -0,0 +1,104 @@
+# Standard library imports
+import threading
+from collections import OrderedDict, namedtuple
+
+# Third-party imports
+from sqlalchemy import select
+
+# Local application imports
+from extensions import db
+from models import Dog
+
+# Computed views of a dog's history (the recent-activity widget, timeline
+# pages, filtered API results) are cached in process under
+# (dog_id, Dog.history_version). The version is bumped in the same transaction
+# as any change to the dog, its notes, appointments, medicines or reminders
+# (hooks in models.py, Core writers in reminders.py), so a write invalidates
+# every cached view of that dog and a lookup costs one primary-key select.
+# Views hold plain HistoryEvent tuples, never ORM objects, so they outlive the
+# session that computed them.
+
+HISTORY_CACHE_SIZE = 256  # Dogs (at their current version) kept
+HISTORY_CACHE_VIEWS = 32  # Views kept per dog: pages, filter combinations
+
+HistoryEvent = namedtuple('HistoryEvent', 'id dog_id timestamp event_type description author source_model source_id')
+
+_history_cache = OrderedDict()  # (dog_id, version) -> OrderedDict(view_key -> value)
+_cached_versions = {}  # dog_id -> version cached for it
+_history_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+_history_cache_lock = threading.Lock()
+
+
+def snapshot_events(events):
+    """Detached copies of DogEvent rows, safe to keep across requests."""
+    return [HistoryEvent(event.id, event.dog_id, event.timestamp, event.event_type, event.description, event.author,
+                         event.source_model, event.source_id) for event in events]
+
+
+def get_dog_history_version(dog_id):
+    return db.session.execute(select(Dog.history_version).where(Dog.id == dog_id)).scalar() or 0
+
+
+def cached_dog_history(dog_id, view_key, compute):
+    """
+    Return a view of a dog's history, computing and caching it on a miss.
+
+    Args:
+        view_key (tuple): Identifies the view (e.g. ('page', 2, 50)); hashable
+        compute (callable): Builds the view; must return plain values
+            (see snapshot_events), not ORM objects
+    """
+    key = (dog_id, get_dog_history_version(dog_id))
+    with _history_cache_lock:
+        views = _history_cache.get(key)
+        if views is not None and view_key in views:
+            _history_cache.move_to_end(key)
+            views.move_to_end(view_key)
+            _history_cache_stats['hits'] += 1
+            return views[view_key]
+        _history_cache_stats['misses'] += 1
+
+    value = compute()
+    with _history_cache_lock:
+        _store(key, view_key, value)
+    return value
+
+
+def _store(key, view_key, value):
+    dog_id, version = key
+    cached_version = _cached_versions.get(dog_id)
+    if cached_version is not None and cached_version != version:
+        if cached_version > version:
+            return  # Computed from an older version than another request already cached
+        _history_cache.pop((dog_id, cached_version), None)
+        _history_cache_stats['invalidations'] += 1
+    _cached_versions[dog_id] = version
+    views = _history_cache.setdefault(key, OrderedDict())
+    views[view_key] = value
+    views.move_to_end(view_key)
+    _history_cache.move_to_end(key)
+    while len(views) > HISTORY_CACHE_VIEWS:
+        views.popitem(last=False)
+        _history_cache_stats['evictions'] += 1
+    while len(_history_cache) > HISTORY_CACHE_SIZE:
+        (evicted_dog_id, _), _ = _history_cache.popitem(last=False)
+        _cached_versions.pop(evicted_dog_id, None)
+        _history_cache_stats['evictions'] += 1
+
+
+def get_history_cache_stats():
+    """Counters since startup plus the current size, for the admin page."""
+    with _history_cache_lock:
+        stats = dict(_history_cache_stats)
+        stats['dogs'] = len(_history_cache)
+        stats['views'] = sum(len(views) for views in _history_cache.values())
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups * 100 if lookups else 0
+    stats['capacity'] = HISTORY_CACHE_SIZE
+    return stats
+
+
+def clear_history_cache():
+    with _history_cache_lock:
+        _history_cache.clear()
+        _cached_versions.clear()
@@ -0,0 +1,262 @@
+# Standard library imports
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Third-party imports
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import joinedload
+
+# Local application imports
+from blueprints.core import event_titles
+from blueprints.core.etags import build_etag, get_rescue_data_version
+from blueprints.core.recurrence import is_recurring, recurring_criterion, single_criterion
+from blueprints.core.schedules import get_dose_times, get_medicine_display_name
+from blueprints.core.utils import parse_medicine_frequency
+from extensions import db
+from models import Appointment, AppointmentException, DogMedicine, Rescue
+
+# iCalendar (RFC 5545) subscription feed of a rescue's appointments and medicine
+# schedules. Calendar clients poll it every few minutes, so the rendered body is
+# cached per rescue under its data version (bumped on every change by the hooks
+# in models.py): a poll with nothing changed is one version lookup, and a miss
+# streams the feed out of yield_per batches while it fills the cache.
+
+FEED_BATCH_SIZE = 500
+FEED_CACHE_SIZE = 32  # Rescues (plus the superadmin all-rescues feed) kept rendered
+FEED_HISTORY = timedelta(days=180)  # Past appointments older than this are left out
+FEED_UID_DOMAIN = 'care-center'
+FEED_MAX_LINE_OCTETS = 75
+RRULE_FREQUENCIES = {'daily': 'DAILY', 'weekly': 'WEEKLY', 'monthly': 'MONTHLY', 'yearly': 'YEARLY', 'every_x_days': 'DAILY'}
+
+_feed_cache = OrderedDict()  # rescue_id -> (etag, body)
+_feed_cache_lock = threading.Lock()
+
+
+def escape_text(value):
+    """Escape a TEXT property value."""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold_line(line):
+    """Fold a content line into 75-octet CRLF-terminated pieces without splitting UTF-8 sequences."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= FEED_MAX_LINE_OCTETS:
+        return encoded + b'\r\n'
+    pieces = []
+    limit = FEED_MAX_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(encoded[:cut])
+        encoded = encoded[cut:]
+        limit = FEED_MAX_LINE_OCTETS - 1  # Continuation lines start with a space
+    return b'\r\n '.join(pieces) + b'\r\n'
+
+
+def _format_datetime(value):
+    """Floating local time; stored datetimes have no timezone."""
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def _format_stamp(value):
+    """UTC timestamp (created_at/updated_at are stored as naive UTC)."""
+    return (value or datetime(1970, 1, 1)).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _render(lines):
+    return b''.join(fold_line(line) for line in lines)
+
+
+def _recurrence_rule(appointment):
+    """RRULE for a series. Clients skip months too short for a 29th-31st start, where the app uses the last day."""
+    rrule = f"RRULE:FREQ={RRULE_FREQUENCIES[appointment.recurrence]}"
+    if appointment.recurrence == 'every_x_days':
+        rrule += f";INTERVAL={max(appointment.recurrence_value or 1, 1)}"
+    if appointment.recurrence_until:
+        rrule += f";UNTIL={appointment.recurrence_until.strftime('%Y%m%d')}T235959"
+    return rrule
+
+
+def _appointment_lines(appointment, exceptions=()):
+    """A VEVENT for an appointment; a series gets its RRULE plus an EXDATE or override per exception."""
+    raw_dog_name = appointment.dog.name if appointment.dog else 'Unknown Dog'
+    raw_type = appointment.type.name if appointment.type else (appointment.title or 'Appointment')
+    summary = f"{event_titles.clean_dog_name(raw_dog_name)}: {event_titles.classify_appointment_type(raw_type)}"
+    uid = f'UID:appointment-{appointment.id}@{FEED_UID_DOMAIN}'
+    duration = None
+    if appointment.end_datetime and appointment.end_datetime > appointment.start_datetime:
+        duration = appointment.end_datetime - appointment.start_datetime
+
+    def event_lines(start, end, status, extra):
+        lines = ['BEGIN:VEVENT', uid, f'DTSTAMP:{_format_stamp(appointment.updated_at or appointment.created_at)}',
+                 f'DTSTART:{_format_datetime(start)}']
+        if end and end > start:
+            lines.append(f'DTEND:{_format_datetime(end)}')
+        lines += extra
+        lines.append(f'SUMMARY:{escape_text(summary)}')
+        if appointment.description:
+            lines.append(f'DESCRIPTION:{escape_text(appointment.description)}')
+        if status == 'canceled':
+            lines.append('STATUS:CANCELLED')
+        lines.append('END:VEVENT')
+        return lines
+
+    extra = []
+    if is_recurring(appointment):
+        extra.append(_recurrence_rule(appointment))
+        extra += [f'EXDATE:{_format_datetime(exception.occurrence_start)}'
+                  for exception in exceptions if exception.status == 'canceled']
+    lines = event_lines(appointment.start_datetime, appointment.end_datetime, appointment.status, extra)
+    for exception in exceptions:
+        if exception.status == 'canceled':
+            continue
+        start = exception.start_datetime or exception.occurrence_start
+        end = exception.end_datetime or (start + duration if duration else None)
+        lines += event_lines(start, end, exception.status,
+                             [f'RECURRENCE-ID:{_format_datetime(exception.occurrence_start)}'])
+    return lines
+
+
+def _appointment_batch_lines(batch):
+    series_ids = [appointment.id for appointment in batch if is_recurring(appointment)]
+    exceptions_by_series = {}
+    if series_ids:
+        for exception in AppointmentException.query.filter(AppointmentException.appointment_id.in_(series_ids)).order_by(
+                AppointmentException.occurrence_start):
+            exceptions_by_series.setdefault(exception.appointment_id, []).append(exception)
+    return [line for appointment in batch for line in _appointment_lines(appointment, exceptions_by_series.get(appointment.id, ()))]
+
+
+def _medicine_lines(dog_medicine):
+    """One daily (or every-x-days) recurring event per dose time; as-needed medicines have none."""
+    raw_dog_name = dog_medicine.dog.name if dog_medicine.dog else 'Unknown Dog'
+    medicine_name = get_medicine_display_name(dog_medicine)
+    summary = f"{event_titles.clean_dog_name(raw_dog_name)}: {event_titles.classify_medicine_name(medicine_name)}"
+    description = medicine_name
+    if dog_medicine.dosage and dog_medicine.unit:
+        description += f" ({dog_medicine.dosage} {dog_medicine.unit})"
+    description += f" - {dog_medicine.frequency}"
+
+    interval_days = max(dog_medicine.frequency_value or parse_medicine_frequency(dog_medicine.frequency)['interval_days'], 1)
+    rrule = f'RRULE:FREQ=DAILY;INTERVAL={interval_days}'
+    if dog_medicine.end_date:
+        rrule += f";UNTIL={dog_medicine.end_date.strftime('%Y%m%d')}T235959"
+
+    lines = []
+    for dose_time in get_dose_times(dog_medicine):
+        lines += [
+            'BEGIN:VEVENT',
+            f"UID:medicine-{dog_medicine.id}-{dose_time.strftime('%H%M')}@{FEED_UID_DOMAIN}",
+            f'DTSTAMP:{_format_stamp(dog_medicine.updated_at or dog_medicine.created_at)}',
+            f'DTSTART:{_format_datetime(datetime.combine(dog_medicine.start_date, dose_time))}',
+            'DURATION:PT15M',
+            rrule,
+            f'SUMMARY:{escape_text(summary)}',
+            f'DESCRIPTION:{escape_text(description)}',
+            'END:VEVENT',
+        ]
+    return lines
+
+
+def _batches(query):
+    """Execute query in yield_per batches, yielding one list of ORM objects per batch."""
+    result = db.session.execute(query.execution_options(yield_per=FEED_BATCH_SIZE))
+    for batch in result.scalars().partitions():
+        yield batch
+
+
+def iter_calendar_feed(rescue_id, calendar_name, history_start):
+    """
+    Render a rescue's feed as a sequence of byte chunks, one per database batch.
+
+    Args:
+        rescue_id (int): Rescue id, None for all rescues
+        calendar_name (str): X-WR-CALNAME shown by calendar clients
+        history_start (datetime): Appointments starting before this are left out
+
+    Yields:
+        bytes: Folded, CRLF-terminated iCalendar content
+    """
+    yield _render([
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{FEED_UID_DOMAIN}//Care Calendar//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(calendar_name)}',
+        'X-PUBLISHED-TTL:PT15M',
+    ])
+
+    appointments = select(Appointment).options(
+        joinedload(Appointment.dog), joinedload(Appointment.type)
+    ).where(or_(
+        and_(single_criterion(), Appointment.start_datetime >= history_start),
+        and_(recurring_criterion(), or_(Appointment.recurrence_until.is_(None),
+                                        Appointment.recurrence_until >= history_start.date()))
+    )).order_by(Appointment.id)
+    medicines = select(DogMedicine).options(
+        joinedload(DogMedicine.dog), joinedload(DogMedicine.preset)
+    ).where(DogMedicine.status == 'active', DogMedicine.start_date.isnot(None)).order_by(DogMedicine.id)
+    if rescue_id is not None:
+        appointments = appointments.where(Appointment.rescue_id == rescue_id)
+        medicines = medicines.where(DogMedicine.rescue_id == rescue_id)
+
+    for batch in _batches(appointments):
+        yield _render(_appointment_batch_lines(batch))
+    for batch in _batches(medicines):
+        yield _render(line for dog_medicine in batch for line in _medicine_lines(dog_medicine))
+
+    yield _render(['END:VCALENDAR'])
+
+
+def get_calendar_feed_etag(rescue_id, today=None):
+    """ETag of a rescue's feed: its data version plus the day (which moves the history window)."""
+    today = today or datetime.now().date()
+    return build_etag('calendar-feed', rescue_id, get_rescue_data_version(rescue_id), today.isoformat())
+
+
+def get_cached_calendar_feed(rescue_id, etag):
+    """Return the cached body of a rescue's feed if it was rendered for etag, otherwise None."""
+    with _feed_cache_lock:
+        cached = _feed_cache.get(rescue_id)
+        if cached is None or cached[0] != etag:
+            return None
+        _feed_cache.move_to_end(rescue_id)
+        return cached[1]
+
+
+def _store_calendar_feed(rescue_id, etag, body):
+    with _feed_cache_lock:
+        _feed_cache[rescue_id] = (etag, body)
+        _feed_cache.move_to_end(rescue_id)
+        while len(_feed_cache) > FEED_CACHE_SIZE:
+            _feed_cache.popitem(last=False)
+
+
+def stream_calendar_feed(rescue_id, etag, today=None):
+    """
+    Stream a freshly rendered feed, caching the body under etag once it is complete.
+
+    A client that disconnects midway leaves the cache untouched.
+    """
+    today = today or datetime.now().date()
+    if rescue_id is None:
+        calendar_name = 'Care Calendar - All Rescues'
+    else:
+        rescue_name = db.session.execute(select(Rescue.name).where(Rescue.id == rescue_id)).scalar()
+        calendar_name = f'Care Calendar - {rescue_name}' if rescue_name else 'Care Calendar'
+    history_start = datetime.combine(today, datetime.min.time()) - FEED_HISTORY
+
+    chunks = []
+    for chunk in iter_calendar_feed(rescue_id, calendar_name, history_start):
+        chunks.append(chunk)
+        yield chunk
+    _store_calendar_feed(rescue_id, etag, b''.join(chunks))
+
+
+def clear_calendar_feed_cache():
+    with _feed_cache_lock:
+        _feed_cache.clear()
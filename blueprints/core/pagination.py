@@ -0,0 +1,45 @@
+# Standard library imports
+import base64
+import json
+from datetime import datetime
+
+# Keyset pagination cursors are the sort key of the last row on a page,
+# serialized to URL-safe base64 JSON so clients treat them as opaque tokens.
+
+
+def encode_cursor(*values):
+    """Encode a row's sort key (datetimes, ints, strings) as an opaque cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+    return encoded.decode().rstrip('=')
+
+
+def decode_cursor(cursor, *types):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The opaque cursor token
+        *types: Expected type of each key part (datetime, int or str); a tuple
+            of types accepts any of them
+
+    Returns:
+        tuple: The decoded sort key
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match types
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError('wrong number of key parts')
+        decoded = []
+        for value, expected in zip(values, types):
+            if expected is datetime:
+                value = datetime.fromisoformat(value)
+            elif isinstance(value, bool) or not isinstance(value, expected):
+                raise ValueError(f'unexpected key part {value!r}')
+            decoded.append(value)
+        return tuple(decoded)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Invalid cursor: {e}') from e
@@ -0,0 +1,337 @@
+# Standard library imports
+import calendar
+from datetime import datetime, time, timedelta
+
+# Third-party imports
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+
+# Local application imports
+from extensions import db
+from models import Appointment, AppointmentException
+
+# A recurring appointment is one row holding the rule (recurrence, recurrence_value,
+# recurrence_until); its occurrences are expanded on read, only within the requested
+# window. Occurrences that were canceled, completed or moved are stored sparsely as
+# AppointmentException rows keyed by the start the rule gives them.
+
+RECURRENCE_RULES = ('daily', 'weekly', 'monthly', 'yearly', 'every_x_days')
+RECURRENCE_DISPLAY_NAMES = {
+    'daily': 'Daily',
+    'weekly': 'Weekly',
+    'monthly': 'Monthly',
+    'yearly': 'Yearly',
+    'every_x_days': 'Every X days',
+}
+OCCURRENCE_KEY_FORMAT = '%Y%m%d%H%M'
+EXCEPTION_STATUSES = ('scheduled', 'completed', 'canceled')
+
+
+def is_recurring(appointment):
+    """True if the appointment row is a series expanded by a recurrence rule."""
+    return not appointment.is_occurrence and appointment.recurrence in RECURRENCE_RULES
+
+
+def recurring_criterion():
+    """SQL filter matching recurring series."""
+    return Appointment.recurrence.in_(RECURRENCE_RULES)
+
+
+def single_criterion():
+    """SQL filter matching one-off appointments (no rule, or 'none'/'custom_text')."""
+    return or_(Appointment.recurrence.is_(None), Appointment.recurrence.notin_(RECURRENCE_RULES))
+
+
+def format_recurrence(appointment):
+    """Human-readable rule, e.g. 'Weekly' or 'Every 3 days until 2026-12-01'."""
+    if appointment.recurrence == 'every_x_days':
+        text = f"Every {appointment.recurrence_value or 1} days"
+    else:
+        text = RECURRENCE_DISPLAY_NAMES.get(appointment.recurrence, '')
+    if text and appointment.recurrence_until:
+        text += f" until {appointment.recurrence_until.strftime('%Y-%m-%d')}"
+    return text
+
+
+def parse_recurrence_form(form):
+    """
+    Read the recurrence fields of an appointment form.
+
+    Raises:
+        ValueError: With a message for the user if a field is invalid
+
+    Returns:
+        tuple: (recurrence, recurrence_value, recurrence_until); recurrence is None for one-off appointments
+    """
+    recurrence = form.get('appt_recurrence', '').strip() or None
+    if recurrence in (None, 'none'):
+        return None, None, None
+    if recurrence not in RECURRENCE_RULES:
+        raise ValueError('Invalid repeat option.')
+
+    recurrence_value = None
+    if recurrence == 'every_x_days':
+        try:
+            recurrence_value = int(form.get('appt_recurrence_value', ''))
+        except ValueError:
+            raise ValueError('Enter how many days apart the appointments are.')
+        if not 1 <= recurrence_value <= 365:
+            raise ValueError('Days between appointments must be between 1 and 365.')
+
+    recurrence_until = None
+    until_text = form.get('appt_recurrence_until', '').strip()
+    if until_text:
+        try:
+            recurrence_until = datetime.strptime(until_text, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Invalid repeat-until date.')
+    return recurrence, recurrence_value, recurrence_until
+
+
+def _add_months(start, months):
+    """start shifted by a number of months, clamping the day to the month's length (Jan 31 -> Feb 28)."""
+    total = start.month - 1 + months
+    year, month = start.year + total // 12, total % 12 + 1
+    return start.replace(year=year, month=month, day=min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def expand_recurrence(appointment, window_start, window_end):
+    """
+    Yield the rule start of every occurrence of a series within a window.
+
+    Jumps straight to the first occurrence at or after window_start, so the
+    cost is proportional to the number of occurrences in the window, not to
+    the age of the series.
+
+    Args:
+        appointment: Recurring Appointment
+        window_start (datetime): Inclusive start of the window
+        window_end (datetime): Inclusive end of the window
+
+    Yields:
+        datetime: Occurrence starts in ascending order
+    """
+    start = appointment.start_datetime
+    last = window_end
+    if appointment.recurrence_until:
+        last = min(last, datetime.combine(appointment.recurrence_until, time.max))
+    if start is None or last < start:
+        return
+
+    if appointment.recurrence in ('monthly', 'yearly'):
+        months = 1 if appointment.recurrence == 'monthly' else 12
+        # One step early: clamped days can put an occurrence before its calendar month's window
+        elapsed = (window_start.year - start.year) * 12 + window_start.month - start.month
+        index = max(elapsed // months - 1, 0)
+        while True:
+            occurrence = _add_months(start, index * months)
+            if occurrence > last:
+                return
+            if occurrence >= window_start:
+                yield occurrence
+            index += 1
+
+    step_days = {'daily': 1, 'weekly': 7}.get(appointment.recurrence) or max(appointment.recurrence_value or 1, 1)
+    step = timedelta(days=step_days)
+    index = 0
+    if window_start > start:
+        index, remainder = divmod(window_start - start, step)
+        index += 1 if remainder else 0
+    occurrence = start + index * step
+    while occurrence <= last:
+        yield occurrence
+        index += 1
+        occurrence = start + index * step
+
+
+def is_rule_occurrence(appointment, occurrence_start):
+    """True if the series' rule has an occurrence starting at occurrence_start."""
+    return any(True for _ in expand_recurrence(appointment, occurrence_start, occurrence_start))
+
+
+class AppointmentOccurrence:
+    """
+    One occurrence of a recurring appointment, expanded from its series.
+
+    Exposes the same attributes templates, serializers and reminder builders
+    read from Appointment (id is the series id), so both can be listed
+    together. Changing a single occurrence stores an AppointmentException
+    (see set_occurrence_exception).
+    """
+    is_occurrence = True
+    recurrence = None
+    recurrence_value = None
+    recurrence_until = None
+
+    def __init__(self, appointment, occurrence_start, exception=None):
+        self.series = appointment
+        self.id = appointment.id
+        self.appointment_id = appointment.id
+        self.dog = appointment.dog
+        self.dog_id = appointment.dog_id
+        self.rescue_id = appointment.rescue_id
+        self.type = appointment.type
+        self.type_id = appointment.type_id
+        self.title = appointment.title
+        self.description = appointment.description
+        self.created_at = appointment.created_at
+        self.updated_at = appointment.updated_at
+        self.occurrence_start = occurrence_start
+        self.occurrence_key = occurrence_start.strftime(OCCURRENCE_KEY_FORMAT)
+        self.exception = exception
+
+        duration = None
+        if appointment.end_datetime and appointment.end_datetime > appointment.start_datetime:
+            duration = appointment.end_datetime - appointment.start_datetime
+        self.start_datetime = occurrence_start
+        self.status = appointment.status
+        if exception is not None:
+            self.status = exception.status
+            if exception.start_datetime:
+                self.start_datetime = exception.start_datetime
+            if exception.end_datetime:
+                duration = exception.end_datetime - self.start_datetime
+        self.end_datetime = self.start_datetime + duration if duration else None
+
+    def __repr__(self):
+        return f"<AppointmentOccurrence appointment={self.appointment_id} start={self.start_datetime}>"
+
+
+def get_appointment_occurrences(series, window_start, window_end):
+    """
+    Expand recurring series into their occurrences starting within a window.
+
+    Loads the series' exceptions for the window with one query. Canceled
+    occurrences are dropped; moved ones are listed at their new start,
+    including ones moved into the window from outside it.
+
+    Args:
+        series (list): Recurring Appointments (dog and type ideally eager-loaded)
+        window_start (datetime): Inclusive start of the window
+        window_end (datetime): Inclusive end of the window
+
+    Returns:
+        list: AppointmentOccurrences sorted by start_datetime
+    """
+    if not series:
+        return []
+    series_by_id = {appointment.id: appointment for appointment in series}
+    exceptions = AppointmentException.query.filter(
+        AppointmentException.appointment_id.in_(series_by_id),
+        or_(
+            and_(AppointmentException.occurrence_start >= window_start, AppointmentException.occurrence_start <= window_end),
+            and_(AppointmentException.start_datetime >= window_start, AppointmentException.start_datetime <= window_end)
+        )
+    ).all()
+    exceptions_by_occurrence = {(exception.appointment_id, exception.occurrence_start): exception for exception in exceptions}
+
+    occurrences = []
+    for appointment in series:
+        for occurrence_start in expand_recurrence(appointment, window_start, window_end):
+            exception = exceptions_by_occurrence.pop((appointment.id, occurrence_start), None)
+            occurrences.append(AppointmentOccurrence(appointment, occurrence_start, exception))
+    # Left over: occurrences whose rule start is outside the window but were moved into it
+    for (appointment_id, occurrence_start), exception in exceptions_by_occurrence.items():
+        if exception.start_datetime and is_rule_occurrence(series_by_id[appointment_id], occurrence_start):
+            occurrences.append(AppointmentOccurrence(series_by_id[appointment_id], occurrence_start, exception))
+
+    return sorted(
+        (occurrence for occurrence in occurrences
+         if occurrence.status != 'canceled' and window_start <= occurrence.start_datetime <= window_end),
+        key=lambda occurrence: (occurrence.start_datetime, occurrence.id)
+    )
+
+
+def get_recurring_series(rescue_id, window_start, window_end, dog_id=None):
+    """Query for the recurring series that can have occurrences within a window (dog and type eager-loaded)."""
+    query = Appointment.query.options(joinedload(Appointment.dog), joinedload(Appointment.type)).filter(
+        recurring_criterion(),
+        Appointment.start_datetime <= window_end,
+        or_(Appointment.recurrence_until.is_(None), Appointment.recurrence_until >= window_start.date())
+    )
+    if rescue_id is not None:
+        query = query.filter(Appointment.rescue_id == rescue_id)
+    if dog_id is not None:
+        query = query.filter(Appointment.dog_id == dog_id)
+    return query
+
+
+def get_rescue_appointments_in_window(rescue_id, window_start, window_end, dog_id=None):
+    """
+    Get a rescue's appointments starting within a window, recurring series expanded.
+
+    One-off appointments come from an indexed range query; series from a
+    query for the (few) series that can overlap the window.
+
+    Args:
+        rescue_id (int): Rescue id, None for all rescues
+        window_start (datetime): Inclusive start of the window
+        window_end (datetime): Inclusive end of the window
+        dog_id (int): Limit to one dog
+
+    Returns:
+        list: Appointments and AppointmentOccurrences sorted by start_datetime
+    """
+    single = Appointment.query.options(joinedload(Appointment.dog), joinedload(Appointment.type)).filter(
+        single_criterion(),
+        Appointment.start_datetime >= window_start,
+        Appointment.start_datetime <= window_end
+    )
+    if rescue_id is not None:
+        single = single.filter(Appointment.rescue_id == rescue_id)
+    if dog_id is not None:
+        single = single.filter(Appointment.dog_id == dog_id)
+    occurrences = get_appointment_occurrences(get_recurring_series(rescue_id, window_start, window_end, dog_id).all(),
+                                              window_start, window_end)
+    return sorted(single.all() + occurrences, key=lambda appointment: (appointment.start_datetime, appointment.id))
+
+
+def find_occurrence_start(appointment, occurrence_key):
+    """
+    Parse an occurrence key and check that the series' rule has that occurrence.
+
+    Returns:
+        datetime: The occurrence's rule start, or None if the key is invalid or not an occurrence
+    """
+    if not is_recurring(appointment):
+        return None
+    try:
+        occurrence_start = datetime.strptime(occurrence_key, OCCURRENCE_KEY_FORMAT)
+    except ValueError:
+        return None
+    return occurrence_start if is_rule_occurrence(appointment, occurrence_start) else None
+
+
+def get_next_occurrence(appointment, after):
+    """The series' first still-scheduled occurrence starting after a time, or None (looks a year ahead)."""
+    for occurrence in get_appointment_occurrences([appointment], after, after + timedelta(days=366)):
+        if occurrence.status != 'completed':
+            return occurrence
+    return None
+
+
+def set_occurrence_exception(appointment, occurrence_start, status, start_datetime=None, end_datetime=None):
+    """
+    Store a change to one occurrence of a series, replacing any earlier change to it. Does not commit.
+
+    Args:
+        appointment: Recurring Appointment
+        occurrence_start (datetime): The occurrence's rule start (see find_occurrence_start)
+        status (str): One of EXCEPTION_STATUSES
+        start_datetime (datetime): New start for a moved occurrence
+        end_datetime (datetime): New end for a moved occurrence
+
+    Returns:
+        AppointmentException: The added or updated exception
+    """
+    exception = AppointmentException.query.filter_by(
+        appointment_id=appointment.id, occurrence_start=occurrence_start
+    ).first()
+    if exception is None:
+        exception = AppointmentException(appointment_id=appointment.id, rescue_id=appointment.rescue_id,
+                                         occurrence_start=occurrence_start)
+        db.session.add(exception)
+    exception.status = status
+    exception.start_datetime = start_datetime
+    exception.end_datetime = end_datetime
+    return exception
@@ -0,0 +1,448 @@
+# Standard library imports
+from datetime import datetime, timedelta
+
+# Third-party imports
+from flask import current_app
+from sqlalchemy import insert, literal, or_, select
+from sqlalchemy.orm import joinedload
+
+# Local application imports
+from blueprints.core.dog_events import append_reminder_events, append_reminder_status_events, delete_source_events
+from blueprints.core.recurrence import get_appointment_occurrences, is_recurring, recurring_criterion, single_criterion
+from blueprints.core.schedules import (DOSE_REMINDER_TYPE, MISSED_DOSE_LOOKBACK,
+                                       get_medicine_display_name)
+from blueprints.core.utils import get_first_user_id, parse_medicine_frequency
+from extensions import db
+from models import (Appointment, DogMedicine, Reminder, ReminderArchive, bump_dog_history_versions,
+                    bump_rescue_data_versions)
+
+DEFAULT_REMINDER_HORIZON_DAYS = 30
+DEFAULT_REMINDER_ARCHIVE_AFTER_DAYS = 90
+
+
+def get_reminder_horizon_end(now=None):
+    """Return the latest due time reminders are materialized up to (REMINDER_HORIZON_DAYS ahead)."""
+    days = current_app.config.get('REMINDER_HORIZON_DAYS', DEFAULT_REMINDER_HORIZON_DAYS)
+    return (now or datetime.utcnow()) + timedelta(days=days)
+
+
+def limit_to_horizon(rows, horizon_end=None):
+    """
+    Drop reminder rows due after the materialization horizon.
+
+    Later rows are written by the background materializer as the horizon rolls
+    forward (see materialize_reminder_horizon).
+    """
+    horizon_end = horizon_end or get_reminder_horizon_end()
+    return [row for row in rows if row['due_datetime'] <= horizon_end]
+
+
+def build_appointment_reminder_rows(appointment, dog, user_id, now=None, horizon_end=None):
+    """
+    Build the reminder rows for an appointment (info, 24 hours before, 1 hour before).
+
+    A recurring series gets the rows of each of its upcoming occurrences up to
+    the horizon; canceled and completed occurrences get none.
+
+    Args:
+        appointment: Appointment or AppointmentOccurrence (must have an id)
+        dog: The appointment's Dog
+        user_id: User ID for reminder creation
+        now (datetime): Reference time for deciding which advance reminders apply
+        horizon_end (datetime): How far ahead to expand a series (default: the materialization horizon)
+
+    Returns:
+        list: Reminder column mappings, ready for insert_reminders()
+    """
+    now = now or datetime.utcnow()
+    if is_recurring(appointment):
+        # Advance reminders are due up to 24 hours before an occurrence starts
+        window_end = (horizon_end or get_reminder_horizon_end(now)) + timedelta(hours=24)
+        return [
+            row
+            for occurrence in get_appointment_occurrences([appointment], now, window_end)
+            if occurrence.status not in ('completed', 'canceled')
+            for row in build_appointment_reminder_rows(occurrence, dog, user_id, now=now)
+        ]
+    title = appointment.title if appointment.title else 'Appointment'
+    start = appointment.start_datetime
+    base = {
+        'status': 'pending',
+        'dog_id': dog.id,
+        'rescue_id': dog.rescue_id,
+        'appointment_id': appointment.id,
+        'user_id': user_id,
+    }
+
+    # Reminder 1: Info about the appointment itself
+    rows = [dict(
+        base,
+        message=f"{dog.name}'s appointment for '{title}' is scheduled on {start.strftime('%Y-%m-%d at %I:%M %p')}.",
+        due_datetime=start,
+        reminder_type='appointment_info'
+    )]
+
+    # Reminder 2: 24 hours before (if applicable)
+    if start > now + timedelta(hours=23): # Give a bit of buffer
+        due_24h = start - timedelta(hours=24)
+        rows.append(dict(
+            base,
+            message=f"REMINDER: {dog.name}'s appointment '{title}' is in 24 hours ({due_24h.strftime('%Y-%m-%d at %I:%M %p')}).",
+            due_datetime=due_24h,
+            reminder_type='appointment_upcoming_24h'
+        ))
+
+    # Reminder 3: 1 hour before (if applicable)
+    if start > now + timedelta(minutes=59): # Give a bit of buffer
+        due_1h = start - timedelta(hours=1)
+        rows.append(dict(
+            base,
+            message=f"REMINDER: {dog.name}'s appointment '{title}' is in 1 hour ({due_1h.strftime('%Y-%m-%d at %I:%M %p')}).",
+            due_datetime=due_1h,
+            reminder_type='appointment_upcoming_1h'
+        ))
+    return rows
+
+
+def build_medicine_start_reminder_row(dog_medicine, dog, user_id):
+    """
+    Build the one-off "prescription starts" reminder row for a medicine.
+
+    Returns:
+        dict: Reminder column mapping, ready for insert_reminders()
+    """
+    frequency_data = parse_medicine_frequency(dog_medicine.frequency)
+    medicine_name = get_medicine_display_name(dog_medicine)
+    return {
+        'message': f"{dog.name}'s prescription for '{medicine_name}' is scheduled to start on {dog_medicine.start_date.strftime('%Y-%m-%d')} - {frequency_data['display_name']}.",
+        'due_datetime': datetime.combine(dog_medicine.start_date, datetime.min.time()) + timedelta(hours=9),
+        'status': 'pending',
+        'reminder_type': 'medicine_start',
+        'dog_id': dog.id,
+        'rescue_id': dog.rescue_id,
+        'dog_medicine_id': dog_medicine.id,
+        'user_id': user_id,
+    }
+
+
+def insert_reminders(rows):
+    """
+    Insert a batch of reminders with a single executemany INSERT.
+
+    Bypasses the ORM unit of work: no Reminder objects are created, so use
+    this for generated batches rather than rows the request needs to modify.
+    Column defaults (created_at, updated_at) still apply, but model hooks do
+    not, so rows must carry rescue_id themselves. Each row's rescue_id bumps
+    that rescue's Rescue.data_version, and its dog_id bumps the dog's
+    Dog.history_version. The INSERT returns the new ids, which are used to
+    append the rows' dog_event entries. Does not commit.
+
+    Args:
+        rows (list): Reminder column mappings
+
+    Returns:
+        int: Number of rows inserted
+    """
+    if not rows:
+        return 0
+    reminder = Reminder.__table__
+    ids = db.session.execute(reminder.insert().returning(reminder.c.id, sort_by_parameter_order=True), rows).scalars().all()
+    connection = db.session.connection()
+    bump_rescue_data_versions(connection, {row['rescue_id'] for row in rows})
+    bump_dog_history_versions(connection, {row['dog_id'] for row in rows})
+    append_reminder_events(connection, [dict(row, id=reminder_id) for row, reminder_id in zip(rows, ids)])
+    return len(rows)
+
+
+def set_reminder_status(reminders_query, status):
+    """
+    Set the status of every pending reminder matched by a query with a single UPDATE.
+
+    The query must only filter on Reminder columns (no joins). The matched
+    rows are read first for their dog_event status entries. Does not commit.
+
+    Returns:
+        int: Number of reminders updated
+    """
+    pending_query = reminders_query.filter(Reminder.status == 'pending')
+    pending = [row._asdict() for row in pending_query.with_entities(
+        Reminder.id, Reminder.dog_id, Reminder.rescue_id, Reminder.message, Reminder.user_id)]
+    if not pending:
+        return 0
+    now = datetime.utcnow()
+    updated = pending_query.update(
+        {Reminder.status: status, Reminder.updated_at: now},
+        synchronize_session=False
+    )
+    connection = db.session.connection()
+    bump_rescue_data_versions(connection, {row['rescue_id'] for row in pending})
+    bump_dog_history_versions(connection, {row['dog_id'] for row in pending})
+    append_reminder_status_events(connection, [dict(row, status=status) for row in pending], timestamp=now)
+    return updated
+
+
+def reconcile_reminders(existing, target_rows):
+    """
+    Bring a record's stored reminders in line with its target reminder set.
+
+    Rows are matched on reminder_type. Pending reminders are updated in place
+    when their message or due time changed, and deleted when no longer part of
+    the target set. Acknowledged and dismissed reminders are never touched; a
+    target that matches one of them by due time is treated as already handled.
+    Only the differing rows are written. Does not commit.
+
+    Args:
+        existing (list): The record's current Reminder instances
+        target_rows (list): Reminder column mappings from a build_* helper
+
+    Returns:
+        dict: Counts of inserted, updated and deleted reminders
+    """
+    pending_by_type = {}
+    handled = set()
+    stale_ids = []
+    for reminder in existing:
+        if reminder.status != 'pending':
+            handled.add((reminder.reminder_type, reminder.due_datetime))
+        elif reminder.reminder_type in pending_by_type:
+            stale_ids.append(reminder.id)  # Duplicate from an earlier regeneration
+        else:
+            pending_by_type[reminder.reminder_type] = reminder
+
+    to_insert = []
+    updated = 0
+    for row in target_rows:
+        reminder = pending_by_type.pop(row['reminder_type'], None)
+        if (row['reminder_type'], row['due_datetime']) in handled:
+            if reminder is not None:
+                stale_ids.append(reminder.id)
+            continue
+        if reminder is None:
+            to_insert.append(row)
+        elif reminder.message != row['message'] or reminder.due_datetime != row['due_datetime']:
+            reminder.message = row['message']
+            reminder.due_datetime = row['due_datetime']
+            updated += 1
+
+    stale_ids.extend(reminder.id for reminder in pending_by_type.values())
+    if stale_ids:
+        Reminder.query.filter(Reminder.id.in_(stale_ids)).delete(synchronize_session=False)
+        bump_rescue_data_versions(db.session.connection(), {reminder.rescue_id for reminder in existing})
+        bump_dog_history_versions(db.session.connection(), {reminder.dog_id for reminder in existing})
+        delete_source_events(db.session.connection(), 'Reminder', stale_ids)
+
+    return {
+        'inserted': insert_reminders(to_insert),
+        'updated': updated,
+        'deleted': len(stale_ids),
+    }
+
+
+def reconcile_occurrence_reminders(existing, target_rows):
+    """
+    Like reconcile_reminders, for a recurring series whose reminders repeat per occurrence.
+
+    Rows are matched on (reminder_type, due_datetime), so a moved occurrence
+    replaces its pending reminders rather than updating them. Does not commit.
+    """
+    handled = {(reminder.reminder_type, reminder.due_datetime) for reminder in existing if reminder.status != 'pending'}
+    pending = {}
+    stale_ids = []
+    for reminder in existing:
+        if reminder.status != 'pending':
+            continue
+        key = (reminder.reminder_type, reminder.due_datetime)
+        if key in pending or key in handled:
+            stale_ids.append(reminder.id)
+        else:
+            pending[key] = reminder
+
+    to_insert = []
+    updated = 0
+    for row in target_rows:
+        key = (row['reminder_type'], row['due_datetime'])
+        reminder = pending.pop(key, None)
+        if key in handled:
+            continue
+        if reminder is None:
+            to_insert.append(row)
+        elif reminder.message != row['message']:
+            reminder.message = row['message']
+            updated += 1
+
+    stale_ids.extend(reminder.id for reminder in pending.values())
+    if stale_ids:
+        Reminder.query.filter(Reminder.id.in_(stale_ids)).delete(synchronize_session=False)
+        bump_rescue_data_versions(db.session.connection(), {reminder.rescue_id for reminder in existing})
+        bump_dog_history_versions(db.session.connection(), {reminder.dog_id for reminder in existing})
+        delete_source_events(db.session.connection(), 'Reminder', stale_ids)
+
+    return {
+        'inserted': insert_reminders(to_insert),
+        'updated': updated,
+        'deleted': len(stale_ids),
+    }
+
+
+def reconcile_appointment_reminders(appointment, dog, user_id):
+    """Reconcile an appointment's (or recurring series') reminders with its current details. Does not commit."""
+    # Archived reminders are all handled, so they keep their targets from being recreated
+    existing = Reminder.query.filter_by(appointment_id=appointment.id).all()
+    existing += ReminderArchive.query.filter_by(appointment_id=appointment.id).all()
+    target_rows = limit_to_horizon(build_appointment_reminder_rows(appointment, dog, user_id))
+    if is_recurring(appointment):
+        return reconcile_occurrence_reminders(existing, target_rows)
+    return reconcile_reminders(existing, target_rows)
+
+
+def reconcile_medicine_reminders(dog_medicine, dog, user_id):
+    """
+    Reconcile a medicine's stored reminders with its current details.
+
+    Daily dose exceptions (acknowledged/dismissed doses) are left alone; doses
+    themselves are expanded from the schedule on read. Does not commit.
+    """
+    existing = Reminder.query.filter(
+        Reminder.dog_medicine_id == dog_medicine.id,
+        Reminder.reminder_type != DOSE_REMINDER_TYPE
+    ).all()
+    existing += ReminderArchive.query.filter(
+        ReminderArchive.dog_medicine_id == dog_medicine.id,
+        ReminderArchive.reminder_type != DOSE_REMINDER_TYPE
+    ).all()
+    target_rows = [build_medicine_start_reminder_row(dog_medicine, dog, user_id)] if dog_medicine.start_date else []
+    return reconcile_reminders(existing, limit_to_horizon(target_rows))
+
+
+def _insert_missing_reminders(records, key_column, build_rows, horizon_end):
+    """Insert the in-horizon reminders of a batch of records that have no row of that type yet."""
+    existing = set(
+        db.session.query(key_column, Reminder.reminder_type)
+        .filter(key_column.in_([record.id for record in records]))
+    )
+    rows = [
+        row
+        for record in records
+        for row in limit_to_horizon(build_rows(record), horizon_end)
+        if (record.id, row['reminder_type']) not in existing
+    ]
+    return insert_reminders(rows)
+
+
+def _insert_missing_occurrence_reminders(series, key_column, build_rows, horizon_end):
+    """Like _insert_missing_reminders for recurring series, whose rows repeat per occurrence (matched on due time)."""
+    rows = [(record, row) for record in series for row in limit_to_horizon(build_rows(record), horizon_end)]
+    if not rows:
+        return 0
+    existing = set(
+        db.session.query(key_column, Reminder.reminder_type, Reminder.due_datetime)
+        .filter(key_column.in_([record.id for record in series]),
+                Reminder.due_datetime >= min(row['due_datetime'] for _, row in rows))
+    )
+    return insert_reminders([
+        row for record, row in rows
+        if (record.id, row['reminder_type'], row['due_datetime']) not in existing
+    ])
+
+
+def materialize_reminder_horizon(horizon_end=None, batch_size=500, now=None):
+    """
+    Extend stored appointment and medicine start reminders up to the horizon.
+
+    Records are walked in id order in batches of batch_size, each batch in its
+    own transaction. Only missing (record, reminder_type) rows are inserted, so
+    re-running over the same window is a no-op and acknowledged or dismissed
+    reminders are never recreated. Recurring appointments get rows for each
+    occurrence in the horizon, matched on due time as well. Daily doses are
+    not materialized; they are expanded from the medicine schedule on read.
+
+    Returns:
+        dict: Number of appointment and medicine reminders inserted
+    """
+    now = now or datetime.utcnow()
+    horizon_end = horizon_end or get_reminder_horizon_end(now)
+    user_id = get_first_user_id()
+    counts = {'appointment': 0, 'medicine': 0}
+
+    # Advance reminders are due up to 24 hours before the appointment starts
+    appointments = Appointment.query.options(joinedload(Appointment.dog)).filter(
+        single_criterion(),
+        Appointment.start_datetime > now,
+        Appointment.start_datetime <= horizon_end + timedelta(hours=24),
+        or_(Appointment.status.is_(None), Appointment.status.notin_(['completed', 'canceled']))
+    )
+    series = Appointment.query.options(joinedload(Appointment.dog)).filter(
+        recurring_criterion(),
+        Appointment.start_datetime <= horizon_end + timedelta(hours=24),
+        or_(Appointment.recurrence_until.is_(None), Appointment.recurrence_until >= now.date()),
+        or_(Appointment.status.is_(None), Appointment.status.notin_(['completed', 'canceled']))
+    )
+    medicines = DogMedicine.query.options(joinedload(DogMedicine.dog), joinedload(DogMedicine.preset)).filter(
+        DogMedicine.start_date >= now.date(),
+        DogMedicine.start_date <= horizon_end.date()
+    )
+    build_appointment_rows = lambda appt: build_appointment_reminder_rows(appt, appt.dog, user_id, now=now, horizon_end=horizon_end)
+    batches = [
+        ('appointment', appointments, Appointment, Reminder.appointment_id, build_appointment_rows, _insert_missing_reminders),
+        ('appointment', series, Appointment, Reminder.appointment_id, build_appointment_rows, _insert_missing_occurrence_reminders),
+        ('medicine', medicines, DogMedicine, Reminder.dog_medicine_id,
+         lambda med: [build_medicine_start_reminder_row(med, med.dog, user_id)], _insert_missing_reminders),
+    ]
+    for name, query, model, key_column, build_rows, insert_missing in batches:
+        last_id = 0
+        while True:
+            records = query.filter(model.id > last_id).order_by(model.id.asc()).limit(batch_size).all()
+            if not records:
+                break
+            counts[name] += insert_missing(records, key_column, build_rows, horizon_end)
+            db.session.commit()
+            last_id = records[-1].id
+    return counts
+
+
+def archive_reminders(older_than=None, chunk_size=1000, now=None):
+    """
+    Move handled reminders due before the cutoff into reminder_archive.
+
+    Each chunk of up to chunk_size rows is copied with INSERT ... SELECT and
+    deleted from reminder in its own transaction, so the hot table is never
+    locked for the whole move. Pending reminders are never archived. The
+    cutoff is kept beyond the missed-dose lookback so dose exceptions that
+    still hide expanded doses stay in the hot table.
+
+    Args:
+        older_than (timedelta): Age by due time (default REMINDER_ARCHIVE_AFTER_DAYS)
+
+    Returns:
+        int: Number of reminders archived
+    """
+    now = now or datetime.utcnow()
+    if older_than is None:
+        older_than = timedelta(days=current_app.config.get('REMINDER_ARCHIVE_AFTER_DAYS', DEFAULT_REMINDER_ARCHIVE_AFTER_DAYS))
+    cutoff = now - max(older_than, MISSED_DOSE_LOOKBACK)
+
+    reminder = Reminder.__table__
+    columns = [column.name for column in reminder.columns]
+    archived = 0
+    while True:
+        ids = db.session.execute(
+            select(reminder.c.id)
+            .where(reminder.c.status != 'pending', reminder.c.due_datetime < cutoff)
+            .order_by(reminder.c.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(
+            insert(ReminderArchive.__table__).from_select(
+                columns + ['archived_at'],
+                select(*[reminder.c[name] for name in columns], literal(now, ReminderArchive.archived_at.type))
+                .where(reminder.c.id.in_(ids))
+            )
+        )
+        db.session.execute(reminder.delete().where(reminder.c.id.in_(ids)))
+        db.session.commit()
+        archived += len(ids)
+        if len(ids) < chunk_size:
+            break
+    return archived
@@ -0,0 +1,347 @@
+# Standard library imports
+import heapq
+from datetime import datetime, time, timedelta
+
+# Third-party imports
+from sqlalchemy.orm import joinedload
+
+# Local application imports
+from blueprints.core.utils import parse_many, parse_medicine_frequency
+from extensions import db
+from models import DogMedicine, Reminder
+
+# Medicine doses are not stored as Reminder rows. A DogMedicine is the schedule
+# rule (frequency, dose_times, start/end date) and doses are expanded on read
+# for the window being displayed. Only doses that staff acknowledge or dismiss
+# are persisted, as 'medicine_daily' Reminder rows ("exception rows").
+
+DOSE_REMINDER_TYPE = 'medicine_daily'
+DOSE_KEY_FORMAT = '%Y%m%d%H%M'
+
+# How far back unacknowledged doses are still shown as overdue
+MISSED_DOSE_LOOKBACK = timedelta(days=7)
+
+
+def default_dose_times(times_per_day):
+    """Return the default administration times for a number of daily doses."""
+    if times_per_day <= 0:
+        return []
+    if times_per_day == 1:
+        return [time(9, 0)]  # 9 AM
+    if times_per_day == 2:
+        return [time(9, 0), time(21, 0)]  # 9 AM, 9 PM
+    if times_per_day == 3:
+        return [time(9, 0), time(15, 0), time(21, 0)]  # 9 AM, 3 PM, 9 PM
+    if times_per_day == 4:
+        return [time(1, 0), time(9, 0), time(15, 0), time(21, 0)]  # 1 AM, 9 AM, 3 PM, 9 PM
+    # For frequencies > 4, distribute evenly across 24 hours starting at 9 AM
+    hours_between = 24 / times_per_day
+    return sorted({time(int(9 + (i * hours_between)) % 24, 0) for i in range(times_per_day)})
+
+
+def format_dose_times(dose_times):
+    """Serialize dose times for DogMedicine.dose_times (e.g. "09:00,21:00")."""
+    return ','.join(t.strftime('%H:%M') for t in dose_times)
+
+
+def parse_dose_times(dose_times_text):
+    """Parse a DogMedicine.dose_times string into a sorted list of times."""
+    parsed = set()
+    for part in (dose_times_text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            parsed.add(datetime.strptime(part, '%H:%M').time())
+        except ValueError:
+            continue
+    return sorted(parsed)
+
+
+def get_dose_times(dog_medicine):
+    """
+    Get the daily administration times for a medicine.
+
+    Uses the stored dose_times rule, falling back to the defaults for the
+    parsed frequency for records created before dose_times existed.
+    """
+    if dog_medicine.dose_times:
+        return parse_dose_times(dog_medicine.dose_times)
+    frequency_data = parse_medicine_frequency(dog_medicine.frequency)
+    if frequency_data.get('is_as_needed', False):
+        return []
+    return default_dose_times(frequency_data.get('times_per_day', 1))
+
+
+def get_medicine_display_name(dog_medicine):
+    """Get the name shown for a DogMedicine in reminders and events."""
+    if dog_medicine.custom_name:
+        return dog_medicine.custom_name
+    if dog_medicine.preset:
+        return dog_medicine.preset.name
+    return 'Medicine'
+
+
+def build_dose_message(dog_medicine, frequency_display_name):
+    """Build the reminder message for a single scheduled dose."""
+    dog_name = dog_medicine.dog.name if dog_medicine.dog else 'the dog'
+    message = f"Give {dog_name} their {get_medicine_display_name(dog_medicine)}"
+    if dog_medicine.dosage and dog_medicine.unit:
+        message += f" ({dog_medicine.dosage} {dog_medicine.unit})"
+    return message + f" - {frequency_display_name}"
+
+
+def expand_dose_schedule(dog_medicine, window_start, window_end):
+    """
+    Yield the datetime of every scheduled dose of a medicine within a window.
+
+    Args:
+        dog_medicine: DogMedicine instance holding the schedule rule
+        window_start (datetime): Inclusive start of the window
+        window_end (datetime): Inclusive end of the window
+
+    Yields:
+        datetime: Dose due times in ascending order
+    """
+    if not dog_medicine.start_date:
+        return
+    dose_times = get_dose_times(dog_medicine)
+    if not dose_times:
+        return
+
+    # Doses before the prescription was recorded were never due
+    floor = window_start
+    if dog_medicine.created_at and dog_medicine.created_at > floor:
+        floor = dog_medicine.created_at
+
+    last_day = window_end.date()
+    if dog_medicine.end_date and dog_medicine.end_date < last_day:
+        last_day = dog_medicine.end_date
+
+    # Explicit every-x-days value wins over the frequency text (EOD, weekly, q48h...)
+    interval_days = max(dog_medicine.frequency_value or parse_medicine_frequency(dog_medicine.frequency)['interval_days'], 1)
+    current_day = dog_medicine.start_date
+    if floor.date() > current_day:
+        skipped = (floor.date() - current_day).days // interval_days
+        current_day += timedelta(days=skipped * interval_days)
+
+    while current_day <= last_day:
+        for dose_time in dose_times:
+            due = datetime.combine(current_day, dose_time)
+            if floor <= due <= window_end:
+                yield due
+        current_day += timedelta(days=interval_days)
+
+
+class VirtualDose:
+    """
+    A pending medicine dose expanded from a DogMedicine schedule.
+
+    Exposes the same attributes templates and serializers read from Reminder,
+    so both can be listed together. Acknowledging or dismissing a dose stores
+    it as a Reminder exception row (see record_dose_status).
+    """
+    is_virtual = True
+    status = 'pending'
+    reminder_type = DOSE_REMINDER_TYPE
+    appointment_id = None
+    appointment = None
+    user_id = None
+    user = None
+
+    def __init__(self, dog_medicine, due_datetime, message):
+        self.dog_medicine = dog_medicine
+        self.dog_medicine_id = dog_medicine.id
+        self.dog = dog_medicine.dog
+        self.dog_id = dog_medicine.dog_id
+        self.rescue_id = dog_medicine.rescue_id
+        self.due_datetime = due_datetime
+        self.message = message
+        self.dose_key = due_datetime.strftime(DOSE_KEY_FORMAT)
+        self.id = f"dose-{dog_medicine.id}-{self.dose_key}"
+        self.created_at = dog_medicine.created_at
+        self.updated_at = dog_medicine.updated_at
+
+    def __repr__(self):
+        return f"<VirtualDose medicine={self.dog_medicine_id} due={self.due_datetime}>"
+
+
+def get_virtual_doses(medicines, window_start, window_end):
+    """
+    Expand pending doses for a set of medicines within a window.
+
+    Doses that already have an exception row (acknowledged or dismissed) are
+    left out. Exceptions for all medicines are fetched with a single query.
+
+    Returns:
+        list: VirtualDose instances sorted by due_datetime
+    """
+    medicines = list(medicines)
+    if not medicines:
+        return []
+
+    recorded = set(
+        Reminder.query.with_entities(Reminder.dog_medicine_id, Reminder.due_datetime).filter(
+            Reminder.dog_medicine_id.in_([med.id for med in medicines]),
+            Reminder.reminder_type == DOSE_REMINDER_TYPE,
+            Reminder.due_datetime >= window_start,
+            Reminder.due_datetime <= window_end
+        ).all()
+    )
+
+    frequencies = parse_many(med.frequency for med in medicines)
+    doses = []
+    for med in medicines:
+        message = None
+        for due in expand_dose_schedule(med, window_start, window_end):
+            if (med.id, due) in recorded:
+                continue
+            if message is None:
+                message = build_dose_message(med, frequencies[med.frequency]['display_name'])
+            doses.append(VirtualDose(med, due, message))
+    doses.sort(key=lambda dose: (dose.due_datetime, dose.dog_medicine_id))
+    return doses
+
+
+def get_rescue_virtual_doses(rescue_id, window_start, window_end, dog_id=None):
+    """
+    Get pending virtual doses for a rescue (or all rescues when rescue_id is None).
+
+    Args:
+        rescue_id (int): Rescue to expand schedules for, None for all rescues
+        window_start (datetime): Inclusive start of the window
+        window_end (datetime): Inclusive end of the window
+        dog_id (int): Optionally restrict to a single dog
+
+    Returns:
+        list: VirtualDose instances sorted by due_datetime
+    """
+    medicines_query = DogMedicine.query.options(
+        joinedload(DogMedicine.dog),
+        joinedload(DogMedicine.preset)
+    ).filter(
+        DogMedicine.status == 'active',
+        DogMedicine.start_date <= window_end.date(),
+        (DogMedicine.end_date == None) | (DogMedicine.end_date >= window_start.date())
+    )
+    if rescue_id is not None:
+        medicines_query = medicines_query.filter(DogMedicine.rescue_id == rescue_id)
+    if dog_id is not None:
+        medicines_query = medicines_query.filter(DogMedicine.dog_id == dog_id)
+    return get_virtual_doses(medicines_query.all(), window_start, window_end)
+
+
+def merge_with_doses(reminders, doses):
+    """Merge stored reminders and virtual doses, both sorted by due_datetime."""
+    return list(heapq.merge(reminders, doses, key=lambda item: item.due_datetime))
+
+
+def find_scheduled_dose(dog_medicine, dose_key):
+    """
+    Resolve a dose key to its due datetime if it is part of the medicine's schedule.
+
+    Returns:
+        datetime or None: The dose due time, or None if no such dose is scheduled
+    """
+    try:
+        due = datetime.strptime(dose_key, DOSE_KEY_FORMAT)
+    except ValueError:
+        return None
+    for scheduled in expand_dose_schedule(dog_medicine, due, due):
+        return scheduled
+    return None
+
+
+def get_virtual_doses_by_id(dose_ids):
+    """
+    Resolve VirtualDose ids ("dose-<dog_medicine_id>-<dose_key>") back to pending doses.
+
+    Medicines and existing exceptions are each fetched with a single query.
+    Ids that are malformed, not on the schedule, or already recorded are skipped.
+
+    Returns:
+        list: VirtualDose instances sorted by due_datetime
+    """
+    wanted = set()
+    for dose_id in dose_ids:
+        _, _, rest = dose_id.partition('dose-')
+        med_id, _, dose_key = rest.partition('-')
+        if med_id.isdigit():
+            wanted.add((int(med_id), dose_key))
+    if not wanted:
+        return []
+
+    medicines = DogMedicine.query.options(
+        joinedload(DogMedicine.dog),
+        joinedload(DogMedicine.preset)
+    ).filter(DogMedicine.id.in_({med_id for med_id, _ in wanted})).all()
+    medicines = {med.id: med for med in medicines}
+    scheduled = []
+    for med_id, dose_key in wanted:
+        med = medicines.get(med_id)
+        due = find_scheduled_dose(med, dose_key) if med else None
+        if due is not None:
+            scheduled.append((med, due))
+    if not scheduled:
+        return []
+
+    recorded = set(
+        Reminder.query.with_entities(Reminder.dog_medicine_id, Reminder.due_datetime).filter(
+            Reminder.dog_medicine_id.in_({med.id for med, _ in scheduled}),
+            Reminder.reminder_type == DOSE_REMINDER_TYPE,
+            Reminder.due_datetime.in_({due for _, due in scheduled})
+        ).all()
+    )
+    frequencies = parse_many(med.frequency for med, _ in scheduled)
+    doses = [
+        VirtualDose(med, due, build_dose_message(med, frequencies[med.frequency]['display_name']))
+        for med, due in scheduled
+        if (med.id, due) not in recorded
+    ]
+    doses.sort(key=lambda dose: (dose.due_datetime, dose.dog_medicine_id))
+    return doses
+
+
+def build_dose_status_rows(doses, status, user_id=None):
+    """
+    Build exception rows recording virtual doses as acknowledged or dismissed.
+
+    Returns:
+        list: Reminder column mappings, ready for insert_reminders()
+    """
+    return [{
+        'message': dose.message,
+        'due_datetime': dose.due_datetime,
+        'status': status,
+        'reminder_type': DOSE_REMINDER_TYPE,
+        'dog_id': dose.dog_id,
+        'rescue_id': dose.dog.rescue_id,
+        'dog_medicine_id': dose.dog_medicine_id,
+        'user_id': user_id,
+    } for dose in doses]
+
+
+def record_dose_status(dog_medicine, due_datetime, status, user_id=None):
+    """
+    Persist an acknowledged or dismissed dose as a Reminder exception row.
+
+    Returns:
+        Reminder: The new or updated exception row (not yet committed)
+    """
+    reminder = Reminder.query.filter_by(
+        dog_medicine_id=dog_medicine.id,
+        reminder_type=DOSE_REMINDER_TYPE,
+        due_datetime=due_datetime
+    ).first()
+    if reminder is None:
+        reminder = Reminder(
+            message=build_dose_message(dog_medicine, parse_medicine_frequency(dog_medicine.frequency)['display_name']),
+            due_datetime=due_datetime,
+            reminder_type=DOSE_REMINDER_TYPE,
+            dog_id=dog_medicine.dog_id,
+            dog_medicine_id=dog_medicine.id,
+            user_id=user_id
+        )
+        db.session.add(reminder)
+    reminder.status = status
+    return reminder
@@ -1,14 +1,16 @@
 # Standard library imports
+import re
 from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 # Third-party imports
-from flask import abort, make_response, render_template
+from flask import Response, abort, make_response, render_template, stream_with_context
 from flask_login import current_user
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, or_
 
 # Local application imports
-from models import (Appointment, AppointmentType, Dog, DogMedicine, DogNote,
+from models import (Appointment, AppointmentType, Dog, DogMedicine,
                     MedicinePreset, Reminder, RescueMedicineActivation, User)
 
 
@@ -85,7 +87,7 @@ def get_rescue_medicine_presets(rescue_id=None):
 def get_rescue_reminders(rescue_id=None):
     """Get reminders for a specific rescue or current user's rescue."""
     rid = rescue_id if rescue_id is not None else current_user.rescue_id
-    return Reminder.query.filter(Reminder.dog.has(rescue_id=rid))
+    return Reminder.query.filter(Reminder.rescue_id == rid)
 
 
 def get_effective_rescue_id(rescue_id=None):
@@ -110,6 +112,16 @@ def get_effective_rescue_id(rescue_id=None):
     return current_user.rescue_id
 
 
+def has_rescue_scope(effective_rescue_id):
+    """
+    Whether queries scoped to an effective rescue_id may return anything.
+
+    None means all rescues only for superadmins; a regular user without a
+    rescue must see nothing rather than every rescue's data.
+    """
+    return effective_rescue_id is not None or current_user.role == 'superadmin'
+
+
 def filter_by_rescue(query, model_class, rescue_id=None):
     """
     Apply rescue filtering to a query based on user permissions.
@@ -130,8 +142,8 @@ def filter_by_rescue(query, model_class, rescue_id=None):
     
     # Filter by specific rescue
     if hasattr(model_class, 'rescue_id'):
-        # Direct rescue_id field
-        return query.filter_by(rescue_id=effective_rescue_id)
+        # Direct rescue_id field (denormalized on Reminder so this stays a plain indexed predicate)
+        return query.filter(model_class.rescue_id == effective_rescue_id)
     elif hasattr(model_class, 'dog'):
         # Through dog relationship
         return query.join(model_class.dog).filter(
@@ -141,120 +153,6 @@ def filter_by_rescue(query, model_class, rescue_id=None):
         raise ValueError(f"Model {model_class.__name__} does not have rescue_id field or dog relationship")
 
 
-def get_dog_history_events(dog_id):
-    """Get comprehensive history events for a specific dog."""
-    dog = Dog.query.options(
-        joinedload(Dog.appointments).joinedload(Appointment.type),
-        joinedload(Dog.appointments).joinedload(Appointment.creator),
-        joinedload(Dog.medicines).joinedload(DogMedicine.preset),
-        joinedload(Dog.medicines).joinedload(DogMedicine.creator),
-        joinedload(Dog.reminders).joinedload(Reminder.user)
-    ).get_or_404(dog_id)
-
-    # Get care notes separately since it's a dynamic relationship
-    care_notes = DogNote.query.filter_by(dog_id=dog_id).options(
-        joinedload(DogNote.user)
-    ).all()
-
-    history_events = []
-    
-    # 1. Dog Intake Event
-    if dog.intake_date:
-        history_events.append({
-            'timestamp': datetime.combine(dog.intake_date, datetime.min.time()),
-            'event_type': 'Dog Record', 
-            'description': f'{dog.name} was taken into care.',
-            'author': 'System', 
-            'source_model': 'Dog', 
-            'source_id': dog.id
-        })
-    
-    # 2. DogNote Events
-    for note in care_notes:
-        history_events.append({
-            'timestamp': note.timestamp, 
-            'event_type': f'Note - {note.category}',
-            'description': note.note_text, 
-            'author': note.user.name if note.user else 'Unknown User',
-            'source_model': 'DogNote', 
-            'source_id': note.id
-        })
-    
-    # 3. Appointment Events
-    for appt in dog.appointments:
-        history_events.append({
-            'timestamp': appt.created_at,
-            'event_type': f'Appointment - {appt.type.name if appt.type else "General"}',
-            'description': f'Appointment "{appt.title}" scheduled for {appt.start_datetime.strftime("%Y-%m-%d %I:%M %p")}. Status: {appt.status}.',
-            'author': appt.creator.name if appt.creator else 'System/Unknown', 
-            'source_model': 'Appointment', 
-            'source_id': appt.id
-        })
-        if appt.updated_at and appt.updated_at != appt.created_at:
-            history_events.append({
-                'timestamp': appt.updated_at, 
-                'event_type': f'Appointment Update - {appt.type.name if appt.type else "General"}',
-                'description': f'Details for appointment "{appt.title}" were updated. New Status: {appt.status}.',
-                'author': 'System/Unknown', 
-                'source_model': 'Appointment', 
-                'source_id': appt.id
-            })
-    
-    # 4. DogMedicine Events
-    for med in dog.medicines:
-        med_name = med.custom_name or (med.preset.name if med.preset else "Unnamed Medicine")
-        history_events.append({
-            'timestamp': datetime.combine(med.start_date, datetime.min.time()),
-            'event_type': f'Medication - {med_name}',
-            'description': f'Started medication: {med_name}. Dosage: {med.dosage} {med.unit}, Frequency: {med.frequency}. Status: {med.status}.',
-            'author': med.creator.name if med.creator else 'System/Unknown', 
-            'source_model': 'DogMedicine', 
-            'source_id': med.id
-        })
-        if med.end_date:
-            history_events.append({
-                'timestamp': datetime.combine(med.end_date, datetime.max.time() - timedelta(seconds=1)),
-                'event_type': f'Medication Ended - {med_name}',
-                'description': f'Ended medication: {med_name}.',
-                'author': med.creator.name if med.creator else 'System/Unknown', 
-                'source_model': 'DogMedicine', 
-                'source_id': med.id
-            })
-        if med.created_at.date() != med.start_date and med.created_at < datetime.combine(med.start_date, datetime.min.time()):
-            history_events.append({
-                'timestamp': med.created_at, 
-                'event_type': f'Medication Logged - {med_name}',
-                'description': f'Medication record for {med_name} was created/updated.',
-                'author': med.creator.name if med.creator else 'System/Unknown', 
-                'source_model': 'DogMedicine', 
-                'source_id': med.id
-            })
-    
-    # 5. Reminder Events
-    for reminder in dog.reminders:
-        history_events.append({
-            'timestamp': reminder.created_at, 
-            'event_type': 'Reminder Created',
-            'description': f'Reminder set: "{reminder.message}" due {reminder.due_datetime.strftime("%Y-%m-%d %I:%M %p")}',
-            'author': reminder.user.name if reminder.user else 'System', 
-            'source_model': 'Reminder', 
-            'source_id': reminder.id
-        })
-        if reminder.status == 'acknowledged' or reminder.status == 'dismissed':
-            status_change_time = reminder.updated_at
-            history_events.append({
-                'timestamp': status_change_time, 
-                'event_type': f'Reminder {reminder.status.title()}',
-                'description': f'Reminder "{reminder.message}" was {reminder.status}.',
-                'author': reminder.user.name if reminder.user else 'System', 
-                'source_model': 'Reminder', 
-                'source_id': reminder.id
-            })
-    
-    history_events.sort(key=lambda x: x['timestamp'], reverse=True)
-    return dog, history_events
-
-
 def get_first_user_id():
     """Helper to get the ID of the first available user, or None."""
     first_user = User.query.order_by(User.id.asc()).first()
@@ -321,191 +219,135 @@ def htmx_error_response(message, target_id, status_code=400):
 
 
 # Phase R4C-3: Medicine Frequency Interpretation Engine
+#
+# The grammar is built once at import time: an exact-match table of medical
+# abbreviations and phrases, then compiled patterns tried in order. Results are
+# memoized on the normalized text, so repeated frequencies (the common case
+# across a rescue's medicines) cost a dict lookup.
+
+FREQUENCY_CACHE_SIZE = 1024
+
+# Normalized text -> result fields; interval_days defaults to 1 and is_as_needed to False
+FREQUENCY_MAPPINGS = {
+    # Standard medical abbreviations
+    'sid': {'times_per_day': 1, 'display_name': 'Once daily (SID)'},
+    'qd': {'times_per_day': 1, 'display_name': 'Once daily (QD)'},
+    'od': {'times_per_day': 1, 'display_name': 'Once daily (OD)'},
+    'bid': {'times_per_day': 2, 'display_name': 'Twice daily (BID)'},
+    'tid': {'times_per_day': 3, 'display_name': 'Three times daily (TID)'},
+    'qid': {'times_per_day': 4, 'display_name': 'Four times daily (QID)'},
+    'q4h': {'times_per_day': 6, 'display_name': 'Every 4 hours (Q4H)'},
+    'q6h': {'times_per_day': 4, 'display_name': 'Every 6 hours (Q6H)'},
+    'q8h': {'times_per_day': 3, 'display_name': 'Every 8 hours (Q8H)'},
+    'q12h': {'times_per_day': 2, 'display_name': 'Every 12 hours (Q12H)'},
+    'q24h': {'times_per_day': 1, 'display_name': 'Every 24 hours (Q24H)'},
+    'eod': {'times_per_day': 1, 'interval_days': 2, 'display_name': 'Every other day (EOD)'},
+    'qod': {'times_per_day': 1, 'interval_days': 2, 'display_name': 'Every other day (QOD)'},
+
+    # As needed
+    'prn': {'times_per_day': 0, 'is_as_needed': True, 'display_name': 'As needed (PRN)'},
+    'as needed': {'times_per_day': 0, 'is_as_needed': True, 'display_name': 'As needed'},
+
+    # Common text variations
+    'once daily': {'times_per_day': 1, 'display_name': 'Once daily'},
+    'once a day': {'times_per_day': 1, 'display_name': 'Once daily'},
+    'daily': {'times_per_day': 1, 'display_name': 'Once daily'},
+    'twice daily': {'times_per_day': 2, 'display_name': 'Twice daily'},
+    'twice a day': {'times_per_day': 2, 'display_name': 'Twice daily'},
+    'three times daily': {'times_per_day': 3, 'display_name': 'Three times daily'},
+    'three times a day': {'times_per_day': 3, 'display_name': 'Three times daily'},
+    'four times daily': {'times_per_day': 4, 'display_name': 'Four times daily'},
+    'four times a day': {'times_per_day': 4, 'display_name': 'Four times daily'},
+    'every other day': {'times_per_day': 1, 'interval_days': 2, 'display_name': 'Every other day'},
+    'weekly': {'times_per_day': 1, 'interval_days': 7, 'display_name': 'Once weekly'},
+    'once weekly': {'times_per_day': 1, 'interval_days': 7, 'display_name': 'Once weekly'},
+    'once a week': {'times_per_day': 1, 'interval_days': 7, 'display_name': 'Once weekly'},
+    'every week': {'times_per_day': 1, 'interval_days': 7, 'display_name': 'Once weekly'},
+}
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+# "2x daily", "3 times a day", "2x per day"
+_TIMES_PER_DAY_PATTERN = re.compile(r'(\d+)x?\s*(?:times?\s*)?(?:per\s+day|daily|a\s+day)')
+# "every 8 hours", "q4h", "q 6 hrs"
+_EVERY_HOURS_PATTERN = re.compile(r'(?:every\s+|\bq\s*)(\d+)\s*h(?:ours?|rs?)?\b')
+# "every 3 days", "q2d"
+_EVERY_DAYS_PATTERN = re.compile(r'(?:every\s+|\bq\s*)(\d+)\s*d(?:ays?)?\b')
+
+
+def _frequency_result(times_per_day, display_name, parsed_from, interval_days=1, is_as_needed=False):
+    return {
+        'times_per_day': times_per_day,
+        'is_as_needed': is_as_needed,
+        'interval_days': interval_days,
+        'parsed_from': parsed_from,
+        'display_name': display_name,
+    }
+
+
+@lru_cache(maxsize=FREQUENCY_CACHE_SIZE)
+def _parse_normalized_frequency(normalized):
+    """Parse normalized frequency text. Returns None for the fallback case."""
+    # Check for exact matches first
+    mapping = FREQUENCY_MAPPINGS.get(normalized)
+    if mapping:
+        return _frequency_result(parsed_from='exact_match', **mapping)
+
+    match = _TIMES_PER_DAY_PATTERN.search(normalized)
+    if match:
+        times = int(match.group(1))
+        return _frequency_result(times, f'{times} times daily', 'pattern_match')
+
+    match = _EVERY_HOURS_PATTERN.search(normalized)
+    if match:
+        hours = int(match.group(1))
+        if hours > 24:
+            # Longer than a day: one dose every N days
+            return _frequency_result(1, f'Every {hours} hours', 'pattern_match', interval_days=hours // 24)
+        times_per_day = 24 // hours if hours > 0 else 1
+        return _frequency_result(times_per_day, f'Every {hours} hours ({times_per_day}x daily)', 'pattern_match')
+
+    match = _EVERY_DAYS_PATTERN.search(normalized)
+    if match:
+        days = max(int(match.group(1)), 1)
+        return _frequency_result(1, f'Every {days} days', 'pattern_match', interval_days=days)
+
+    return None
+
 
 def parse_medicine_frequency(frequency_text):
     """
     Parse medical frequency abbreviations into structured data.
     
     Args:
-        frequency_text (str): The frequency text (e.g., "BID", "twice daily", "2x daily")
+        frequency_text (str): The frequency text (e.g., "BID", "twice daily", "2x daily", "q4h", "EOD")
         
     Returns:
         dict: {
             'times_per_day': int,
             'is_as_needed': bool,
+            'interval_days': int,  # days between dosing days (2 for EOD, 7 for weekly)
             'parsed_from': str,
             'display_name': str
         }
     """
-    import re
-    
     if not frequency_text:
-        return {'times_per_day': 1, 'is_as_needed': False, 'parsed_from': 'default', 'display_name': 'Once daily'}
-    
-    # Normalize input
-    freq_lower = frequency_text.lower().strip()
-    
-    # Medical abbreviation mappings
-    frequency_mappings = {
-        # Standard medical abbreviations
-        'sid': {'times_per_day': 1, 'display_name': 'Once daily (SID)'},
-        'qd': {'times_per_day': 1, 'display_name': 'Once daily (QD)'},
-        'od': {'times_per_day': 1, 'display_name': 'Once daily (OD)'},
-        'bid': {'times_per_day': 2, 'display_name': 'Twice daily (BID)'},
-        'tid': {'times_per_day': 3, 'display_name': 'Three times daily (TID)'},
-        'qid': {'times_per_day': 4, 'display_name': 'Four times daily (QID)'},
-        'q6h': {'times_per_day': 4, 'display_name': 'Every 6 hours (Q6H)'},
-        'q8h': {'times_per_day': 3, 'display_name': 'Every 8 hours (Q8H)'},
-        'q12h': {'times_per_day': 2, 'display_name': 'Every 12 hours (Q12H)'},
-        
-        # As needed
-        'prn': {'times_per_day': 0, 'is_as_needed': True, 'display_name': 'As needed (PRN)'},
-        'as needed': {'times_per_day': 0, 'is_as_needed': True, 'display_name': 'As needed'},
-        
-        # Common text variations
-        'once daily': {'times_per_day': 1, 'display_name': 'Once daily'},
-        'once a day': {'times_per_day': 1, 'display_name': 'Once daily'},
-        'daily': {'times_per_day': 1, 'display_name': 'Once daily'},
-        'twice daily': {'times_per_day': 2, 'display_name': 'Twice daily'},
-        'twice a day': {'times_per_day': 2, 'display_name': 'Twice daily'},
-        'three times daily': {'times_per_day': 3, 'display_name': 'Three times daily'},
-        'three times a day': {'times_per_day': 3, 'display_name': 'Three times daily'},
-        'four times daily': {'times_per_day': 4, 'display_name': 'Four times daily'},
-        'four times a day': {'times_per_day': 4, 'display_name': 'Four times daily'},
-    }
-    
-    # Check for exact matches first
-    if freq_lower in frequency_mappings:
-        result = frequency_mappings[freq_lower].copy()
-        result['parsed_from'] = 'exact_match'
-        result.setdefault('is_as_needed', False)
-        return result
-    
-    # Pattern matching for "Nx daily", "X times daily", etc.
-    # Pattern: "2x daily", "3x a day", etc.
-    pattern1 = re.search(r'(\d+)x?\s*(?:times?\s*)?(?:per\s+day|daily|a\s+day)', freq_lower)
-    if pattern1:
-        times = int(pattern1.group(1))
-        return {
-            'times_per_day': times,
-            'is_as_needed': False,
-            'parsed_from': 'pattern_match',
-            'display_name': f'{times} times daily'
-        }
-    
-    # Pattern: "every X hours"
-    pattern2 = re.search(r'every\s+(\d+)\s*hours?', freq_lower)
-    if pattern2:
-        hours = int(pattern2.group(1))
-        times_per_day = 24 // hours if hours > 0 else 1
-        return {
-            'times_per_day': times_per_day,
-            'is_as_needed': False,
-            'parsed_from': 'pattern_match',
-            'display_name': f'Every {hours} hours ({times_per_day}x daily)'
-        }
-    
-    # Default fallback - treat as once daily
-    return {
-        'times_per_day': 1,
-        'is_as_needed': False,
-        'parsed_from': 'fallback',
-        'display_name': f'Once daily (from "{frequency_text}")'
-    }
+        return _frequency_result(1, 'Once daily', 'default')
+
+    result = _parse_normalized_frequency(_WHITESPACE_PATTERN.sub(' ', frequency_text.lower().strip()))
+    if result is None:
+        # Default fallback - treat as once daily
+        return _frequency_result(1, f'Once daily (from "{frequency_text}")', 'fallback')
+    return dict(result)  # Copy so callers can't modify the cached entry
 
 
-def generate_daily_medicine_reminders(dog_medicine, user_id):
+def parse_many(frequency_texts):
     """
-    Generate daily recurring reminders based on medicine frequency.
-    
-    Args:
-        dog_medicine: DogMedicine instance
-        user_id: User ID for reminder creation
-        
+    Parse a batch of frequency texts, e.g. for every medicine shown on a calendar or export.
+
     Returns:
-        list: Created Reminder instances
+        dict: frequency text -> parse_medicine_frequency() result, one entry per distinct text
     """
-    from datetime import time
-    
-    if not dog_medicine.start_date:
-        return []
-    
-    # Parse frequency
-    frequency_data = parse_medicine_frequency(dog_medicine.frequency)
-    
-    # Skip if it's PRN (as needed)
-    if frequency_data.get('is_as_needed', False):
-        return []
-    
-    times_per_day = frequency_data.get('times_per_day', 1)
-    
-    # Calculate end date (default to 30 days if no end date specified)
-    end_date = dog_medicine.end_date
-    if not end_date:
-        end_date = dog_medicine.start_date + timedelta(days=30)
-    
-    # Calculate date range
-    current_date = dog_medicine.start_date
-    created_reminders = []
-    
-    # Default reminder times based on frequency
-    if times_per_day == 1:
-        reminder_times = [time(9, 0)]  # 9 AM
-    elif times_per_day == 2:
-        reminder_times = [time(9, 0), time(21, 0)]  # 9 AM, 9 PM
-    elif times_per_day == 3:
-        reminder_times = [time(9, 0), time(15, 0), time(21, 0)]  # 9 AM, 3 PM, 9 PM
-    elif times_per_day == 4:
-        reminder_times = [time(9, 0), time(15, 0), time(21, 0), time(1, 0)]  # 9 AM, 3 PM, 9 PM, 1 AM
-    else:
-        # For frequencies > 4, distribute evenly across 24 hours
-        hours_between = 24 / times_per_day
-        reminder_times = []
-        for i in range(times_per_day):
-            hour = int(9 + (i * hours_between)) % 24  # Start at 9 AM and distribute
-            reminder_times.append(time(hour, 0))
-    
-    # Get medicine name for reminder message
-    medicine_name = 'Medicine'
-    if dog_medicine.medicine_id:
-        preset = MedicinePreset.query.get(dog_medicine.medicine_id)
-        if preset:
-            medicine_name = preset.name
-    elif dog_medicine.custom_name:
-        medicine_name = dog_medicine.custom_name
-    
-    # Generate reminders for each day in the range
-    while current_date <= end_date:
-        for reminder_time in reminder_times:
-            reminder_datetime = datetime.combine(current_date, reminder_time)
-            
-            # Skip if the reminder time is in the past
-            if reminder_datetime < datetime.now():
-                continue
-            
-            # Create reminder message
-            dosage_info = f"{dog_medicine.dosage} {dog_medicine.unit}" if dog_medicine.dosage and dog_medicine.unit else ""
-            reminder_message = f"Give {dog_medicine.dog.name} their {medicine_name}"
-            if dosage_info:
-                reminder_message += f" ({dosage_info})"
-            reminder_message += f" - {frequency_data['display_name']}"
-            
-            # Create reminder
-            reminder = Reminder(
-                message=reminder_message,
-                due_datetime=reminder_datetime,
-                status='pending',
-                reminder_type='medicine_daily',
-                dog_id=dog_medicine.dog_id,
-                dog_medicine_id=dog_medicine.id,
-                user_id=user_id
-            )
-            
-            created_reminders.append(reminder)
-        
-        current_date += timedelta(days=1)
-    
-    return created_reminders
+    return {text: parse_medicine_frequency(text) for text in set(frequency_texts)}
 
 
 def htmx_error_response(message, target_id=None, status_code=400):
@@ -543,10 +385,54 @@ def check_rescue_access(resource, resource_type='dog'):
         abort(403)
 
 
+def get_reminder_filter_window(filter_type, now=None):
+    """
+    Get the due-time window for a reminder filter type.
+    
+    Args:
+        filter_type (str): One of 'overdue', 'today', or 'upcoming'
+        now (datetime): Reference time (default: datetime.now())
+        
+    Returns:
+        tuple: (window_start, window_end). window_start is None for 'overdue',
+        which has no lower bound; window_end is exclusive for 'overdue'.
+    """
+    now = now or datetime.now()
+    if filter_type == 'overdue':
+        return None, now
+    if filter_type == 'today':
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+        return today_start, today_end
+    if filter_type == 'upcoming':
+        tomorrow_start = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        week_end = now + timedelta(days=7)
+        return tomorrow_start, week_end
+    raise ValueError(f"Invalid filter_type: {filter_type}. Must be one of 'overdue', 'today', or 'upcoming'.")
+
+
+def reminder_keyset_after(due_datetime, reminder_id=None):
+    """
+    SQL criterion for reminders after a (due_datetime, id) position in keyset order.
+    
+    Without reminder_id, every reminder due at due_datetime is skipped too
+    (used when the page ended on a virtual dose, which sorts after them).
+    """
+    if reminder_id is None:
+        return Reminder.due_datetime > due_datetime
+    return or_(
+        Reminder.due_datetime > due_datetime,
+        and_(Reminder.due_datetime == due_datetime, Reminder.id > reminder_id)
+    )
+
+
 def get_filtered_reminders(filter_type, rescue_id=None, offset=0, limit=None):
     """
     Get filtered reminders based on filter type (overdue, today, upcoming).
     
+    Rows are ordered by (due_datetime, id); the calendar tabs page through
+    them by cursor with stored_reminders_after (see dashboard.py).
+    
     Args:
         filter_type (str): One of 'overdue', 'today', or 'upcoming'
         rescue_id (int): Optional rescue ID to filter by (for superadmins)
@@ -556,34 +442,23 @@ def get_filtered_reminders(filter_type, rescue_id=None, offset=0, limit=None):
     Returns:
         SQLAlchemy query object with filtered reminders
     """
-    now = datetime.now()
+    window_start, window_end = get_reminder_filter_window(filter_type)
     
     # Build the base query based on user permissions
     base_query = Reminder.query.filter(Reminder.status == 'pending')
     reminders_query = filter_by_rescue(base_query, Reminder, rescue_id)
     
     # Apply filter based on type
-    if filter_type == 'overdue':
-        reminders_query = reminders_query.filter(Reminder.due_datetime < now)
-    elif filter_type == 'today':
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-        reminders_query = reminders_query.filter(
-            Reminder.due_datetime >= today_start,
-            Reminder.due_datetime <= today_end
-        )
-    elif filter_type == 'upcoming':
-        tomorrow_start = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        week_end = now + timedelta(days=7)
+    if window_start is None:
+        reminders_query = reminders_query.filter(Reminder.due_datetime < window_end)
+    else:
         reminders_query = reminders_query.filter(
-            Reminder.due_datetime >= tomorrow_start,
-            Reminder.due_datetime <= week_end
+            Reminder.due_datetime >= window_start,
+            Reminder.due_datetime <= window_end
         )
-    else:
-        raise ValueError(f"Invalid filter_type: {filter_type}. Must be one of 'overdue', 'today', or 'upcoming'.")
     
-    # Order by due date (ascending)
-    reminders_query = reminders_query.order_by(Reminder.due_datetime.asc())
+    # Order by due date (ascending), id breaking ties so keyset pages are stable
+    reminders_query = reminders_query.order_by(Reminder.due_datetime.asc(), Reminder.id.asc())
     
     # Apply pagination if requested
     if limit is not None:
@@ -592,12 +467,18 @@ def get_filtered_reminders(filter_type, rescue_id=None, offset=0, limit=None):
     return reminders_query
 
 
+CSV_CHUNK_SIZE = 64 * 1024  # Characters buffered before export_to_csv sends a chunk
+
+
 def export_to_csv(data, headers, filename):
     """
     Generic CSV export helper function.
     
+    Rows are written out in chunks as data is consumed, so a generator of
+    rows is streamed without holding the whole export in memory.
+    
     Args:
-        data (list): List of rows to export. Each row should be a list/tuple of values.
+        data (iterable): Rows to export. Each row should be a list/tuple of values.
         headers (list): List of column headers for the CSV.
         filename (str): The filename for the export (without extension).
         
@@ -607,21 +488,20 @@ def export_to_csv(data, headers, filename):
     import csv
     import io
     
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write headers
-    writer.writerow(headers)
-    
-    # Write data rows
-    for row in data:
-        writer.writerow(row)
-    
-    csv_content = output.getvalue()
+    def generate():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(headers)
+        for row in data:
+            writer.writerow(row)
+            if output.tell() >= CSV_CHUNK_SIZE:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        yield output.getvalue()
     
     # Create response with proper headers
-    response = make_response(csv_content)
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
     response.headers['Content-Disposition'] = f'attachment; filename={filename}.csv'
-    response.headers['Content-Type'] = 'text/csv'
     
     return response
\ No newline at end of file
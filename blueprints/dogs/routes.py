@@ -9,6 +9,7 @@ from flask import (abort, flash, g, jsonify, make_response, redirect,
                    render_template, render_template_string, request, send_file,
                    session, url_for)
 from flask_login import current_user, login_required
+from sqlalchemy import func
 from sqlalchemy.orm import joinedload
 
 # Local application imports
@@ -16,51 +17,32 @@ from . import dogs_bp
 from blueprints.core.audit_helpers import log_audit_event
 from blueprints.core.decorators import (rescue_access_required, role_required,
                                         roles_required)
+from blueprints.core.dog_events import (dog_event_keyset_before,
+                                         filter_dog_events,
+                                         get_dog_events_page,
+                                         get_dog_events_query,
+                                         get_recent_dog_events,
+                                         iter_dog_events)
+from blueprints.core.history_cache import cached_dog_history, snapshot_events
+from blueprints.core.pagination import decode_cursor, encode_cursor
 from blueprints.core.utils import (check_rescue_access, export_to_csv,
-                                   get_dog_history_events, get_first_user_id,
-                                   get_rescue_appointments, get_rescue_dogs,
+                                   get_first_user_id, get_rescue_appointments,
+                                   get_rescue_dogs,
                                    get_rescue_medicine_presets,
-                                   get_rescue_medicines, htmx_error_response)
+                                   get_rescue_medicines, htmx_error_response,
+                                   parse_many)
 from empathetic_messages import flash_error, flash_success
 from extensions import db
 from models import (Appointment, AppointmentType, AuditLog, Dog, DogMedicine,
                     DogNote, MedicinePreset, Reminder, Rescue, User)
 
 
-def _get_dog_history_events(dog_id):
-    """Get dog history events including personality information."""
-    dog, history_events = get_dog_history_events(dog_id)
-    
-    # Add personality observations if available
-    if dog.personality_notes or dog.energy_level or dog.social_notes or dog.special_story or dog.temperament_tags:
-        personality_details = []
-        if dog.energy_level:
-            personality_details.append(f"Energy level: {dog.energy_level}")
-        if dog.temperament_tags:
-            tags = [tag.strip() for tag in dog.temperament_tags.split(',') if tag.strip()]
-            if tags:
-                personality_details.append(f"Traits: {', '.join(tags[:3])}")
-        if dog.personality_notes:
-            personality_details.append(f"Character: {dog.personality_notes[:100]}{'...' if len(dog.personality_notes) > 100 else ''}")
-        if dog.social_notes:
-            personality_details.append(f"Social: {dog.social_notes[:100]}{'...' if len(dog.social_notes) > 100 else ''}")
-        
-        description = f"Personality observations recorded for {dog.name}. " + " | ".join(personality_details)
-        
-        # Use current time since we don't have specific personality update timestamps
-        history_events.append({
-            'timestamp': datetime.utcnow(),
-            'event_type': 'Personality Profile',
-            'description': description,
-            'author': 'Care Team',
-            'source_model': 'DogPersonality',
-            'source_id': dog.id
-        })
-        
-        # Re-sort after adding personality event
-        history_events.sort(key=lambda x: x['timestamp'], reverse=True)
-    
-    return dog, history_events
+def _get_history_page(dog_id, page, per_page):
+    """One page of a dog's timeline and its total event count, from the history cache."""
+    def compute():
+        events, total = get_dog_events_page(dog_id, page, per_page)
+        return snapshot_events(events), total
+    return cached_dog_history(dog_id, ('page', page, per_page), compute)
 
 
 def render_dog_cards_html(selected_rescue_id=None):
@@ -193,8 +175,8 @@ def dog_details(dog_id):
     sorted_categorized_medicine_presets = dict(sorted(categorized_medicine_presets.items()))
 
     # Get recent history events for the Recent Activity widget
-    _, all_history_events = _get_dog_history_events(dog_id)
-    recent_history_events = all_history_events[:5]
+    recent_history_events = cached_dog_history(
+        dog_id, ('recent', 5), lambda: snapshot_events(get_dog_events_query(dog_id).limit(5)))
 
     return render_template('dog_details.html', 
                            dog=dog, 
@@ -473,7 +455,6 @@ def dog_history(dog_id):
     """Dog history timeline with pagination."""
     dog = Dog.query.get_or_404(dog_id)
     check_rescue_access(dog)
-    dog, all_history_events = _get_dog_history_events(dog_id)
     
     # Calculate days in care if intake_date exists
     days_in_care = None
@@ -482,10 +463,7 @@ def dog_history(dog_id):
     
     page = request.args.get('page', 1, type=int)
     per_page = 50
-    total_events = len(all_history_events)
-    start_index = (page - 1) * per_page
-    end_index = start_index + per_page
-    paginated_events = all_history_events[start_index:end_index]
+    paginated_events, total_events = _get_history_page(dog_id, page, per_page)
 
     return render_template('dog_history.html', 
                            dog=dog, 
@@ -534,22 +512,29 @@ def dog_history_overview():
             dogs_by_letter[first_letter] = []
         dogs_by_letter[first_letter].append(dog)
     sorted_dogs_by_letter = dict(sorted(dogs_by_letter.items()))
+
+    # Appointment and medication counts for the page's dogs, one grouped query each
+    dog_ids = [dog.id for dog in dogs]
+    appointment_counts = dict(db.session.query(Appointment.dog_id, func.count(Appointment.id))
+                              .filter(Appointment.dog_id.in_(dog_ids)).group_by(Appointment.dog_id).all())
+    medicine_counts = dict(db.session.query(DogMedicine.dog_id, func.count(DogMedicine.id))
+                           .filter(DogMedicine.dog_id.in_(dog_ids)).group_by(DogMedicine.dog_id).all())
     
-    # Get recent history events across all dogs (last 20 events)
-    recent_events = []
-    for dog in dogs:
-        _, dog_events = _get_dog_history_events(dog.id)
-        for event in dog_events:
-            event['dog_name'] = dog.name
-            event['dog_id'] = dog.id
-        recent_events.extend(dog_events)
-    recent_events.sort(key=lambda x: x['timestamp'], reverse=True)
-    recent_events = recent_events[:20]
+    # Get recent history events across all of the rescue's dogs (last 20 events);
+    # only superadmins may see every rescue's, and a user without a rescue sees none
+    if current_user.role == 'superadmin':
+        recent_events = get_recent_dog_events(rescue_id or None, limit=20)
+    elif rescue_id is not None:
+        recent_events = get_recent_dog_events(rescue_id, limit=20)
+    else:
+        recent_events = []
     
     return render_template('dog_history_overview.html', 
                            dogs=dogs,
                            dogs_by_letter=sorted_dogs_by_letter,
                            recent_events=recent_events,
+                           appointment_counts=appointment_counts,
+                           medicine_counts=medicine_counts,
                            rescues=rescues,
                            selected_rescue_id=rescue_id,
                            pagination=dogs_pagination,
@@ -607,15 +592,10 @@ def add_dog_note(dog_id):
     db.session.commit()
 
     # Re-fetch all history events for the dog
-    dog_for_render, all_history_events_updated = _get_dog_history_events(dog_id)
-    page = 1 
-    per_page = 50 
-    start_index = (page - 1) * per_page
-    end_index = start_index + per_page
-    paginated_events_for_partial = all_history_events_updated[start_index:end_index]
+    paginated_events_for_partial, _ = _get_history_page(dog_id, 1, 50)
 
     if request.headers.get('HX-Request'):
-        return render_template('partials/history_event_list.html', history_events=paginated_events_for_partial, dog=dog_for_render) 
+        return render_template('partials/history_event_list.html', history_events=paginated_events_for_partial, dog=dog) 
     else:
         flash('Note added successfully!', 'success')
         return redirect(url_for('dogs.dog_history', dog_id=dog_id))
@@ -625,7 +605,13 @@ def add_dog_note(dog_id):
 @rescue_access_required(lambda kwargs: Dog.query.get(kwargs['dog_id']).rescue_id)
 @login_required
 def api_dog_history_events(dog_id):
-    """API endpoint for filtered dog history events."""
+    """
+    API endpoint for filtered dog history events.
+
+    Filters, counts and pages run in SQL against dog_event. Pages after the
+    first are fetched with ?cursor=... (the previous page's last event);
+    ?page=N still works for offset paging.
+    """
     dog = Dog.query.get_or_404(dog_id)
     
     # Get filter parameters from request
@@ -634,52 +620,50 @@ def api_dog_history_events(dog_id):
     event_types = request.args.getlist('event_types[]')
     categories = request.args.getlist('categories[]')
     search_query = request.args.get('search_query', '').strip()
+    cursor = request.args.get('cursor')
     page = request.args.get('page', 1, type=int)
     per_page = 25
     
-    # Get all history events
-    _, all_history_events = _get_dog_history_events(dog_id)
-    
-    # Apply filters
-    filtered_events = all_history_events
-    
-    # Date range filter
+    # Invalid dates are ignored, as before
+    start_dt = end_dt = None
     if start_date:
         try:
             start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            filtered_events = [e for e in filtered_events if e['timestamp'] >= start_dt]
         except ValueError:
             pass
-    
     if end_date:
         try:
             end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            filtered_events = [e for e in filtered_events if e['timestamp'] < end_dt]
         except ValueError:
             pass
     
-    # Event type filter
-    if event_types:
-        filtered_events = [e for e in filtered_events if any(et.lower() in e['event_type'].lower() for et in event_types)]
-    
-    # Category filter (for notes)
-    if categories:
-        filtered_events = [e for e in filtered_events 
-                         if 'Note - ' in e['event_type'] and 
-                         any(cat.lower() in e['event_type'].lower() for cat in categories)]
-    
-    # Search query filter
-    if search_query:
-        query_lower = search_query.lower()
-        filtered_events = [e for e in filtered_events 
-                         if query_lower in e['description'].lower() or 
-                         query_lower in e['event_type'].lower()]
-    
-    # Pagination
-    total_filtered = len(filtered_events)
-    start_index = (page - 1) * per_page
-    end_index = start_index + per_page
-    paginated_events = filtered_events[start_index:end_index]
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime, int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    def compute_filtered_page():
+        filtered_query = filter_dog_events(get_dog_events_query(dog_id), start=start_dt, end=end_dt,
+                                           event_types=event_types, categories=categories, search=search_query)
+        total = filtered_query.order_by(None).count()
+        if after:
+            page_query = filtered_query.filter(dog_event_keyset_before(*after))
+        else:
+            page_query = filtered_query.offset((max(page, 1) - 1) * per_page)
+        # One extra row tells whether another page follows
+        events = snapshot_events(page_query.limit(per_page + 1))
+        return events[:per_page], total, len(events) > per_page
+    
+    view_key = ('filtered', start_dt, end_dt, tuple(event_types), tuple(categories), search_query, after,
+                None if after else page)
+    paginated_events, total_filtered, has_more = cached_dog_history(dog_id, view_key, compute_filtered_page)
+    next_url = None
+    if has_more:
+        next_args = {key: values for key, values in request.args.lists() if key not in ('cursor', 'page')}
+        next_url = url_for('dogs.api_dog_history_events', dog_id=dog_id,
+                           cursor=encode_cursor(paginated_events[-1].timestamp, paginated_events[-1].id), **next_args)
     
     return render_template('partials/history_event_list.html', 
                            history_events=paginated_events,
@@ -687,6 +671,8 @@ def api_dog_history_events(dog_id):
                            page=page,
                            per_page=per_page,
                            total_events=total_filtered,
+                           next_url=next_url,
+                           is_continuation=bool(cursor),
                            is_filtered=True)
 
 
@@ -695,22 +681,20 @@ def api_dog_history_events(dog_id):
 @login_required
 def export_dog_history(dog_id):
     """Export complete dog history as CSV."""
-    dog, all_history_events = _get_dog_history_events(dog_id)
+    dog = Dog.query.get_or_404(dog_id)
     
     # Prepare headers
     headers = ['Timestamp', 'Event Type', 'Description', 'Author', 'Source Model', 'Source ID']
     
-    # Prepare data rows
-    data = []
-    for event in all_history_events:
-        data.append([
-            event['timestamp'].isoformat(),
-            event['event_type'],
-            event['description'],
-            event['author'],
-            event['source_model'],
-            event['source_id']
-        ])
+    # Rows are produced as the CSV streams out, one batch of events at a time
+    data = ([
+        event.timestamp.isoformat(),
+        event.event_type,
+        event.description,
+        event.author,
+        event.source_model,
+        event.source_id
+    ] for event in iter_dog_events(dog_id))
     
     # Generate filename
     filename = f"{dog.name}_history"
@@ -757,9 +741,10 @@ def export_medication_log(dog_id):
     dog = Dog.query.get_or_404(dog_id)
     
     # Prepare headers
-    headers = ['Medicine Name', 'Dosage', 'Unit', 'Form', 'Frequency', 'Start Date', 'End Date', 'Status', 'Notes']
+    headers = ['Medicine Name', 'Dosage', 'Unit', 'Form', 'Frequency', 'Schedule', 'Start Date', 'End Date', 'Status', 'Notes']
     
     # Prepare data rows
+    frequencies = parse_many(med.frequency for med in dog.medicines)
     data = []
     for med in dog.medicines:
         data.append([
@@ -768,6 +753,7 @@ def export_medication_log(dog_id):
             med.unit,
             med.form,
             med.frequency,
+            frequencies[med.frequency]['display_name'],
             med.start_date.isoformat() if med.start_date else '',
             med.end_date.isoformat() if med.end_date else '',
             med.status,
@@ -785,7 +771,7 @@ def export_medication_log(dog_id):
 @login_required
 def export_care_summary(dog_id):
     """Export comprehensive care summary as text file."""
-    dog, all_history_events = _get_dog_history_events(dog_id)
+    dog = Dog.query.get_or_404(dog_id)
     
     # Generate comprehensive text report
     report_lines = []
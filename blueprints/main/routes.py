@@ -1,10 +1,9 @@
 from flask import Blueprint, redirect, url_for, render_template, request
 from flask_login import login_required, current_user
-from datetime import datetime, timedelta, date
-from sqlalchemy.orm import joinedload
-from extensions import db
-from models import Reminder, Appointment, DogMedicine, Rescue
-from blueprints.core.utils import group_reminders_by_type
+from datetime import datetime
+from models import Rescue
+from blueprints.core.dashboard import get_dashboard_reminders
+from blueprints.core.utils import get_effective_rescue_id, group_reminders_by_type, has_rescue_scope
 
 main_bp = Blueprint('main', __name__, url_prefix='')
 
@@ -24,78 +23,19 @@ def dashboard():
     
     if current_user.role == 'superadmin':
         rescues = Rescue.query.order_by(Rescue.name.asc()).all()
-        if rescue_id:
-            # Filter reminders for specific rescue
-            overdue_reminders = Reminder.query.options(
-                db.joinedload(Reminder.appointment).joinedload(Appointment.type),
-                db.joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
-                db.joinedload(Reminder.dog)
-            ).filter(
-                Reminder.status == 'pending',
-                Reminder.due_datetime < datetime.utcnow(),
-                Reminder.dog.has(rescue_id=rescue_id)
-            ).order_by(Reminder.due_datetime.asc()).all()
-            
-            today_start = datetime.combine(date.today(), datetime.min.time())
-            today_end = today_start + timedelta(days=1)
-            today_reminders = Reminder.query.options(
-                db.joinedload(Reminder.appointment).joinedload(Appointment.type),
-                db.joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
-                db.joinedload(Reminder.dog)
-            ).filter(
-                Reminder.status == 'pending',
-                Reminder.due_datetime >= today_start,
-                Reminder.due_datetime < today_end,
-                Reminder.dog.has(rescue_id=rescue_id)
-            ).order_by(Reminder.due_datetime.asc()).all()
-        else:
-            # All reminders across all rescues
-            overdue_reminders = Reminder.query.options(
-                db.joinedload(Reminder.appointment).joinedload(Appointment.type),
-                db.joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
-                db.joinedload(Reminder.dog)
-            ).filter(
-                Reminder.status == 'pending',
-                Reminder.due_datetime < datetime.utcnow()
-            ).order_by(Reminder.due_datetime.asc()).all()
-            
-            today_start = datetime.combine(date.today(), datetime.min.time())
-            today_end = today_start + timedelta(days=1)
-            today_reminders = Reminder.query.options(
-                db.joinedload(Reminder.appointment).joinedload(Appointment.type),
-                db.joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
-                db.joinedload(Reminder.dog)
-            ).filter(
-                Reminder.status == 'pending',
-                Reminder.due_datetime >= today_start,
-                Reminder.due_datetime < today_end
-            ).order_by(Reminder.due_datetime.asc()).all()
     else:
-        # Regular users see only their rescue's reminders
         rescues = None
-        rescue_id = current_user.rescue_id
-        overdue_reminders = Reminder.query.options(
-            db.joinedload(Reminder.appointment).joinedload(Appointment.type),
-            db.joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
-            db.joinedload(Reminder.dog)
-        ).filter(
-            Reminder.status == 'pending',
-            Reminder.due_datetime < datetime.utcnow(),
-            Reminder.dog.has(rescue_id=rescue_id)
-        ).order_by(Reminder.due_datetime.asc()).all()
-        
-        today_start = datetime.combine(date.today(), datetime.min.time())
-        today_end = today_start + timedelta(days=1)
-        today_reminders = Reminder.query.options(
-            db.joinedload(Reminder.appointment).joinedload(Appointment.type),
-            db.joinedload(Reminder.dog_medicine).joinedload(DogMedicine.preset),
-            db.joinedload(Reminder.dog)
-        ).filter(
-            Reminder.status == 'pending',
-            Reminder.due_datetime >= today_start,
-            Reminder.due_datetime < today_end,
-            Reminder.dog.has(rescue_id=rescue_id)
-        ).order_by(Reminder.due_datetime.asc()).all()
+    rescue_id = get_effective_rescue_id(rescue_id)
+
+    # One pending-reminder query (plus dose expansion) up to the end of today, bucketed by due time;
+    # a user without a rescue has none
+    now = datetime.now()
+    if has_rescue_scope(rescue_id):
+        buckets = get_dashboard_reminders(rescue_id, now=now)
+    else:
+        buckets = {'overdue': [], 'today': []}
+    overdue_reminders = buckets['overdue']
+    today_reminders = buckets['today']
 
     # Group reminders by type for better organization
     overdue_grouped = group_reminders_by_type(overdue_reminders)
@@ -105,6 +45,6 @@ def dashboard():
                          current_user=current_user,
                          grouped_overdue_reminders=overdue_grouped,
                          grouped_today_reminders=today_grouped,
-                         now=datetime.utcnow(),
+                         now=now,
                          rescues=rescues,
                          selected_rescue_id=rescue_id)
\ No newline at end of file
@@ -9,17 +9,27 @@ from flask import (Blueprint, abort, flash, jsonify, make_response, redirect,
 from flask_login import current_user, login_required
 
 # Local application imports
+from blueprints.core.adherence import get_adherence_window, get_medicine_adherence
 from blueprints.core.audit_helpers import log_audit_event
 from blueprints.core.decorators import roles_required
-from blueprints.core.utils import (check_rescue_access,
-                                   generate_daily_medicine_reminders,
-                                   get_first_user_id, htmx_error_response,
+from blueprints.core.reminders import (build_medicine_start_reminder_row,
+                                       insert_reminders, limit_to_horizon,
+                                       reconcile_medicine_reminders)
+from blueprints.core.schedules import (default_dose_times,
+                                       format_dose_times)
+from blueprints.core.utils import (check_rescue_access, get_first_user_id,
+                                   htmx_error_response,
                                    parse_medicine_frequency)
-from models import (Dog, DogMedicine, MedicinePreset, Reminder, Rescue,
+from models import (Dog, DogMedicine, MedicinePreset, Rescue,
                     RescueMedicineActivation, db)
 
 medicines_bp = Blueprint('medicines', __name__, url_prefix='')
 
+@medicines_bp.app_template_global('medicine_adherence')
+def medicine_adherence(dog):
+    """Template helper: last-30-day adherence of each of a dog's medicines, by medicine id."""
+    return get_medicine_adherence(dog.id, *get_adherence_window())
+
 # Phase R4C-1: Medicine Preset Management Routes
 
 @medicines_bp.route('/rescue/medicines/manage')
@@ -305,6 +315,7 @@ def add_medicine(dog_id):
         unit=med_unit,
         form=med_form,
         frequency=med_frequency,
+        dose_times=format_dose_times(default_dose_times(parse_medicine_frequency(med_frequency)['times_per_day'])),
         start_date=start_date,
         end_date=end_date,
         status=med_status,
@@ -337,44 +348,15 @@ def add_medicine(dog_id):
         success=True
     )
 
-    # Phase R4C-3: Enhanced Reminder Generation with Frequency Interpretation
+    # Phase R4C-3: Start reminder. Daily doses are expanded from the medicine's
+    # schedule on read (blueprints/core/schedules.py) and are not stored.
     if med.start_date:
         try:
             # Create start date reminder (one-time)
-            reminder_due_dt = datetime.combine(med.start_date, datetime.min.time()) + timedelta(hours=9)
-            
-            medicine_name = med.custom_name
-            if not medicine_name and med.medicine_id:
-                preset = MedicinePreset.query.get(med.medicine_id)
-                if preset:
-                    medicine_name = preset.name
-            if not medicine_name:
-                medicine_name = "Medicine"
-
-            # Parse frequency for display
-            frequency_data = parse_medicine_frequency(med.frequency)
-            
-            start_reminder_message = f"{dog.name}'s prescription for '{medicine_name}' is scheduled to start on {med.start_date.strftime('%Y-%m-%d')} - {frequency_data['display_name']}."
-            
-            start_reminder = Reminder(
-                message=start_reminder_message,
-                due_datetime=reminder_due_dt,
-                status='pending',
-                reminder_type='medicine_start',
-                dog_id=dog.id,
-                dog_medicine_id=med.id,
-                user_id=temp_user_id
-            )
-            db.session.add(start_reminder)
-            
-            # Generate daily recurring reminders based on frequency
-            daily_reminders = generate_daily_medicine_reminders(med, temp_user_id)
-            for daily_reminder in daily_reminders:
-                db.session.add(daily_reminder)
-            
+            insert_reminders(limit_to_horizon([build_medicine_start_reminder_row(med, dog, temp_user_id)]))
             db.session.commit()
             
-            print(f"Created {len(daily_reminders) + 1} reminders for medicine: 1 start + {len(daily_reminders)} daily")
+            print(f"Created start reminder for medicine; doses scheduled at {med.dose_times or 'no fixed times'}")
             
         except Exception as e:
             db.session.rollback()
@@ -399,8 +381,6 @@ def edit_medicine(dog_id, medicine_id):
     med = DogMedicine.query.get_or_404(medicine_id)
     check_rescue_access(med)
 
-    old_start_date = med.start_date
-
     # Get data from form
     med_preset_id_str = request.form.get('med_preset_id')
     med_dosage = request.form.get('med_dosage', '').strip()
@@ -474,6 +454,7 @@ def edit_medicine(dog_id, medicine_id):
     med.unit = med_unit
     med.form = med_form
     med.frequency = med_frequency
+    med.dose_times = format_dose_times(default_dose_times(parse_medicine_frequency(med_frequency)['times_per_day']))
     med.start_date = start_date
     med.end_date = end_date
     med.status = med_status
@@ -505,52 +486,16 @@ def edit_medicine(dog_id, medicine_id):
         success=True
     )
 
-    # Phase R4C-3: Enhanced Reminder Generation/Update Logic with Frequency Interpretation
-    # Regenerate if start_date changed or for simplicity, always (current condition `or True`)
-    if med.start_date and (med.start_date != old_start_date or True):
-        try:
-            # Delete existing reminders for this medicine instance
-            Reminder.query.filter_by(dog_medicine_id=med.id).delete()
-
-            # Create new start date reminder
-            reminder_due_dt = datetime.combine(med.start_date, datetime.min.time()) + timedelta(hours=9)
-            
-            medicine_name = med.custom_name # Will be None if preset was chosen above
-            if not medicine_name and med.medicine_id:
-                preset = MedicinePreset.query.get(med.medicine_id)
-                if preset:
-                    medicine_name = preset.name
-            if not medicine_name: # Fallback if still no name
-                medicine_name = "Medicine"
-
-            # Parse frequency for display
-            frequency_data = parse_medicine_frequency(med.frequency)
-            
-            start_reminder_message = f"{dog.name}'s prescription for '{medicine_name}' is scheduled to start on {med.start_date.strftime('%Y-%m-%d')} - {frequency_data['display_name']}."
-            
-            updated_start_reminder = Reminder(
-                message=start_reminder_message,
-                due_datetime=reminder_due_dt,
-                status='pending',
-                reminder_type='medicine_start',
-                dog_id=dog.id,
-                dog_medicine_id=med.id,
-                user_id=temp_user_id
-            )
-            db.session.add(updated_start_reminder)
-            
-            # Generate daily recurring reminders based on frequency
-            daily_reminders = generate_daily_medicine_reminders(med, temp_user_id)
-            for daily_reminder in daily_reminders:
-                db.session.add(daily_reminder)
-            
-            db.session.commit() # Commit reminder changes
-            
-            print(f"Updated reminders for medicine: 1 start + {len(daily_reminders)} daily")
-            
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error updating/creating reminders for edited medicine: {e}")
+    # Phase R4C-3: Start reminder update. Daily doses follow the updated schedule
+    # automatically since they are expanded on read; only a changed start
+    # reminder is rewritten.
+    try:
+        changes = reconcile_medicine_reminders(med, dog, temp_user_id)
+        db.session.commit()
+        print(f"Reconciled start reminder for medicine ({changes}); doses scheduled at {med.dose_times or 'no fixed times'}")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error updating/creating reminders for edited medicine: {e}")
 
     dog = Dog.query.get_or_404(dog_id)
     medicine_presets_data = MedicinePreset.query.filter(
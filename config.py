@@ -31,6 +31,10 @@ class Config:
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'DogTracker <noreply@example.com>')
     
+    # Reminder Configuration
+    REMINDER_HORIZON_DAYS = int(os.getenv('REMINDER_HORIZON_DAYS', 30))  # Days of reminders kept materialized ahead
+    REMINDER_ARCHIVE_AFTER_DAYS = int(os.getenv('REMINDER_ARCHIVE_AFTER_DAYS', 90))  # Handled reminders older than this move to reminder_archive
+    
     @classmethod
     def init_app(cls, app):
         """Initialize app with configuration validation."""
@@ -0,0 +1,140 @@
+import heapq
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from models import Reminder
+
+# --- Due Reminder Scheduler ---
+class DueReminderScheduler:
+    """
+    In-process timer heap of pending reminders that become due soon.
+
+    Every reload_seconds the next lookahead window of pending reminders (and
+    virtual medicine doses) for the rescues that have connected clients is
+    loaded into a heap keyed on due time. The thread sleeps until the earliest
+    entry is due, then pushes one "reminder_due" event per rescue to that
+    rescue's subscribers (see the calendar reminder stream). Each worker
+    process runs its own scheduler for its own connected clients.
+    """
+    def __init__(self, app, lookahead_minutes=15, reload_seconds=60, subscriber_queue_size=100):
+        self.app = app
+        self.lookahead = timedelta(minutes=lookahead_minutes)
+        self.reload_interval = timedelta(seconds=reload_seconds)
+        self.subscriber_queue_size = subscriber_queue_size
+        self.heap = []  # (due_datetime, reminder id as str, rescue_id)
+        self.scheduled = set()
+        self.subscribers = defaultdict(set)  # rescue_id (None = all rescues) -> set of queue.Queue
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.fired_until = datetime.now()
+        self.last_reload = None
+        self.total_events_pushed = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def subscribe(self, rescue_id):
+        """Register a client for a rescue's due events (None for all rescues). Returns its queue."""
+        subscription = queue.Queue(maxsize=self.subscriber_queue_size)
+        with self.lock:
+            is_new_rescue = not self.subscribers[rescue_id]
+            self.subscribers[rescue_id].add(subscription)
+            if is_new_rescue:
+                self.last_reload = None  # Load this rescue's window right away
+        self.wakeup.set()
+        return subscription
+
+    def unsubscribe(self, rescue_id, subscription):
+        with self.lock:
+            self.subscribers[rescue_id].discard(subscription)
+            if not self.subscribers[rescue_id]:
+                del self.subscribers[rescue_id]
+
+    def _run(self):
+        while self.running:
+            now = datetime.now()
+            with self.lock:
+                rescue_ids = set(self.subscribers)
+            if rescue_ids and (self.last_reload is None or now - self.last_reload >= self.reload_interval):
+                try:
+                    self._reload(rescue_ids, now)
+                except Exception as e:
+                    print(f"[DueScheduler] Failed to load upcoming reminders: {e}")
+                self.last_reload = now
+            self._fire_due(datetime.now())
+
+            timeout = self.reload_interval.total_seconds()
+            if self.heap:
+                timeout = min(timeout, max((self.heap[0][0] - datetime.now()).total_seconds(), 0))
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+
+    def _reload(self, rescue_ids, now):
+        from blueprints.core.schedules import get_rescue_virtual_doses
+
+        window_start = self.fired_until
+        window_end = now + self.lookahead
+        with self.app.app_context():
+            query = Reminder.query.with_entities(Reminder.id, Reminder.due_datetime, Reminder.rescue_id).filter(
+                Reminder.status == 'pending',
+                Reminder.due_datetime > window_start,
+                Reminder.due_datetime <= window_end
+            )
+            if None not in rescue_ids:
+                query = query.filter(Reminder.rescue_id.in_(rescue_ids))
+            entries = [(due, str(reminder_id), rescue_id) for reminder_id, due, rescue_id in query.all()]
+            for rescue_id in ([None] if None in rescue_ids else rescue_ids):
+                entries.extend(
+                    (dose.due_datetime, dose.id, dose.rescue_id)
+                    for dose in get_rescue_virtual_doses(rescue_id, window_start, window_end)
+                    if dose.due_datetime > window_start
+                )
+        with self.lock:
+            for entry in entries:
+                if entry[1] not in self.scheduled:
+                    self.scheduled.add(entry[1])
+                    heapq.heappush(self.heap, entry)
+
+    def _fire_due(self, now):
+        due_by_rescue = defaultdict(list)
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                due, reminder_id, rescue_id = heapq.heappop(self.heap)
+                self.scheduled.discard(reminder_id)
+                due_by_rescue[rescue_id].append(reminder_id)
+            self.fired_until = max(self.fired_until, now)
+            for rescue_id, reminder_ids in due_by_rescue.items():
+                payload = {'rescue_id': rescue_id, 'count': len(reminder_ids), 'reminder_ids': reminder_ids}
+                for subscription in self.subscribers.get(rescue_id, set()) | self.subscribers.get(None, set()):
+                    try:
+                        subscription.put_nowait(payload)
+                        self.total_events_pushed += 1
+                    except queue.Full:
+                        pass  # Client stopped reading; it refreshes on reconnect
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        self.thread.join()
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'scheduled': len(self.heap),
+                'next_due': self.heap[0][0] if self.heap else None,
+                'subscribers': sum(len(subscriptions) for subscriptions in self.subscribers.values()),
+                'last_reload': self.last_reload,
+                'total_events_pushed': self.total_events_pushed,
+            }
+
+# Singleton scheduler instance, initialized by init_due_scheduler
+_due_scheduler = None
+
+def init_due_scheduler(app_instance, lookahead_minutes=15, reload_seconds=60):
+    global _due_scheduler
+    _due_scheduler = DueReminderScheduler(app=app_instance, lookahead_minutes=lookahead_minutes, reload_seconds=reload_seconds)
+
+def get_due_scheduler():
+    return _due_scheduler
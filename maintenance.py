@@ -0,0 +1,115 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import JobLock
+
+# Identifies this worker process in job_lock rows
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# --- Cross-worker job leases ---
+def acquire_job_lease(name, lease_seconds):
+    """
+    Try to take the lease for a periodic job.
+
+    Every worker process runs its own maintenance threads; the lease makes sure
+    only one of them does the work per interval. The lease is taken with a
+    single conditional UPDATE, so two workers racing for it cannot both win.
+    It is not released after the run: it doubles as the "ran this interval"
+    marker and simply expires.
+
+    Returns:
+        bool: True if this worker holds the lease and should run the job
+    """
+    if db.session.get(JobLock, name) is None:
+        try:
+            db.session.add(JobLock(name=name))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another worker created it first
+
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(JobLock)
+        .where(JobLock.name == name, or_(JobLock.locked_until.is_(None), JobLock.locked_until < now))
+        .values(locked_by=WORKER_ID, locked_until=now + timedelta(seconds=lease_seconds))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+# --- Periodic jobs ---
+def run_leased_job(name, job, lease_seconds):
+    """Run job() unless another worker already has this interval's lease for it."""
+    try:
+        if not acquire_job_lease(name, lease_seconds):
+            print(f"[{name}] Skipped: already run this interval.")
+            return
+        start = time.time()
+        result = job()
+        print(f"[{name}] {result}. Duration: {time.time() - start:.3f}s.")
+    except Exception as e:
+        db.session.rollback()
+        print(f"[{name}] Failed: {e}")
+
+class LeasedJobThread(threading.Thread):
+    def __init__(self, app, name, job, interval_hours=24):
+        self.app = app
+        super().__init__(daemon=True)
+        self.name = name
+        self.job = job
+        self.interval = interval_hours * 3600
+        self.running = True
+
+    def run(self):
+        while self.running:
+            with self.app.app_context():
+                # Lease slightly shorter than the interval so the next run is never blocked by this one
+                run_leased_job(self.name, self.job, max(self.interval - 300, 60))
+            time.sleep(self.interval)
+
+    def stop(self):
+        self.running = False
+
+# --- Reminder jobs ---
+def materialize_reminders_job(batch_size=500):
+    """Extend stored reminders up to the rolling horizon."""
+    from blueprints.core.reminders import materialize_reminder_horizon
+
+    counts = materialize_reminder_horizon(batch_size=batch_size)
+    return f"Inserted {counts['appointment']} appointment and {counts['medicine']} medicine reminders"
+
+def archive_reminders_job(chunk_size=1000):
+    """Move old acknowledged/dismissed reminders to the archive table."""
+    from blueprints.core.reminders import archive_reminders
+
+    return f"Archived {archive_reminders(chunk_size=chunk_size)} handled reminders"
+
+# --- Adherence jobs ---
+def close_adherence_days_job(batch_size=500):
+    """Count the doses scheduled on finished days, so the ones not given show as missed."""
+    from blueprints.core.adherence import close_adherence_days
+
+    return f"Closed {close_adherence_days(batch_size=batch_size)} medicine-days"
+
+_maintenance_threads = []
+
+def init_maintenance(app_instance, start_materializer=True, materializer_interval_hours=24, materializer_batch_size=500,
+                     start_archiver=True, archiver_interval_hours=24, archiver_chunk_size=1000,
+                     start_adherence=True, adherence_interval_hours=24):
+    jobs = []
+    if start_materializer:
+        jobs.append(('ReminderMaterializer', lambda: materialize_reminders_job(materializer_batch_size), materializer_interval_hours))
+    if start_archiver:
+        jobs.append(('ReminderArchiver', lambda: archive_reminders_job(archiver_chunk_size), archiver_interval_hours))
+    if start_adherence:
+        jobs.append(('AdherenceCloser', close_adherence_days_job, adherence_interval_hours))
+    for name, job, interval_hours in jobs:
+        thread = LeasedJobThread(app=app_instance, name=name, job=job, interval_hours=interval_hours)
+        thread.start()
+        _maintenance_threads.append(thread)
@@ -0,0 +1,36 @@
+"""Add range indexes for date-windowed calendar events
+
+Revision ID: a6f3d2b8c190
+Revises: e81b5c3d9a47
+Create Date: 2026-10-18 16:42:11.308514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6f3d2b8c190'
+down_revision = 'e81b5c3d9a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_rescue_id_start_datetime', ['rescue_id', 'start_datetime'], unique=False)
+        batch_op.create_index('ix_appointment_start_datetime', ['start_datetime'], unique=False)
+
+    with op.batch_alter_table('dog_medicine', schema=None) as batch_op:
+        batch_op.create_index('ix_dog_medicine_rescue_id_start_date', ['rescue_id', 'start_date'], unique=False)
+        batch_op.create_index('ix_dog_medicine_start_date', ['start_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('dog_medicine', schema=None) as batch_op:
+        batch_op.drop_index('ix_dog_medicine_start_date')
+        batch_op.drop_index('ix_dog_medicine_rescue_id_start_date')
+
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_start_datetime')
+        batch_op.drop_index('ix_appointment_rescue_id_start_datetime')
@@ -0,0 +1,45 @@
+"""Add the dog_event history timeline table
+
+Revision ID: a7d3e9b2f481
+Revises: f2a6c8e1d394
+Create Date: 2026-10-18 21:48:05.219374
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9b2f481'
+down_revision = 'f2a6c8e1d394'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dog_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dog_id', sa.Integer(), nullable=False),
+    sa.Column('rescue_id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('event_type', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('author', sa.String(length=120), nullable=True),
+    sa.Column('source_model', sa.String(length=50), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['dog_id'], ['dog.id'], ),
+    sa.ForeignKeyConstraint(['rescue_id'], ['rescue.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('dog_event', schema=None) as batch_op:
+        batch_op.create_index('ix_dog_event_dog_id_timestamp', ['dog_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_dog_event_source', ['source_model', 'source_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('dog_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_dog_event_source')
+        batch_op.drop_index('ix_dog_event_dog_id_timestamp')
+
+    op.drop_table('dog_event')
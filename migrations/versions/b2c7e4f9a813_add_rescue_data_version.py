@@ -0,0 +1,26 @@
+"""Add rescue.data_version for conditional GETs on the calendar APIs
+
+Revision ID: b2c7e4f9a813
+Revises: a6f3d2b8c190
+Create Date: 2026-10-18 17:20:36.417902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2c7e4f9a813'
+down_revision = 'a6f3d2b8c190'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('rescue', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('rescue', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,28 @@
+"""Add recent-activity indexes to dog_event
+
+Revision ID: b5e1c4d8a2f7
+Revises: a7d3e9b2f481
+Create Date: 2026-10-18 22:31:47.506218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e1c4d8a2f7'
+down_revision = 'a7d3e9b2f481'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('dog_event', schema=None) as batch_op:
+        batch_op.create_index('ix_dog_event_rescue_id_timestamp', ['rescue_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_dog_event_timestamp', ['timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('dog_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_dog_event_timestamp')
+        batch_op.drop_index('ix_dog_event_rescue_id_timestamp')
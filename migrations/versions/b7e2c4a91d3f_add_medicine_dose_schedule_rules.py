@@ -0,0 +1,37 @@
+"""Add medicine dose schedule rules
+
+Revision ID: b7e2c4a91d3f
+Revises: f53ad914b398
+Create Date: 2026-10-18 09:12:41.215530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4a91d3f'
+down_revision = 'f53ad914b398'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('dog_medicine', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('dose_times', sa.String(length=100), nullable=True))
+
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.create_index('ix_reminder_dog_medicine_id_due_datetime', ['dog_medicine_id', 'due_datetime'], unique=False)
+
+    # Daily doses are now expanded from the DogMedicine schedule on read.
+    # Pending pre-generated dose rows would duplicate them; acknowledged and
+    # dismissed rows are kept as dose exceptions.
+    op.execute("DELETE FROM reminder WHERE reminder_type = 'medicine_daily' AND status = 'pending'")
+
+
+def downgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_dog_medicine_id_due_datetime')
+
+    with op.batch_alter_table('dog_medicine', schema=None) as batch_op:
+        batch_op.drop_column('dose_times')
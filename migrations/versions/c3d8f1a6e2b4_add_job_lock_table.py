@@ -0,0 +1,29 @@
+"""Add job lock table for background jobs
+
+Revision ID: c3d8f1a6e2b4
+Revises: b7e2c4a91d3f
+Create Date: 2026-10-18 11:40:07.382114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8f1a6e2b4'
+down_revision = 'b7e2c4a91d3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_lock',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('locked_by', sa.String(length=255), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_lock')
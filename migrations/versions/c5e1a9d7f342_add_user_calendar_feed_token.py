@@ -0,0 +1,28 @@
+"""Add user.calendar_feed_token for the ICS calendar feed
+
+Revision ID: c5e1a9d7f342
+Revises: b2c7e4f9a813
+Create Date: 2026-10-18 18:05:12.503114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1a9d7f342'
+down_revision = 'b2c7e4f9a813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('calendar_feed_token', sa.String(length=100), nullable=True))
+        batch_op.create_unique_constraint('uq_user_calendar_feed_token', ['calendar_feed_token'])
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_user_calendar_feed_token', type_='unique')
+        batch_op.drop_column('calendar_feed_token')
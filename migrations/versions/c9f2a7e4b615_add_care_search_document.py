@@ -0,0 +1,71 @@
+"""Add care_search_document and its full-text index
+
+Revision ID: c9f2a7e4b615
+Revises: b5e1c4d8a2f7
+Create Date: 2026-10-18 23:12:09.843117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f2a7e4b615'
+down_revision = 'b5e1c4d8a2f7'
+branch_labels = None
+depends_on = None
+
+# Same statements as CARE_SEARCH_FTS_DDL in models.py at this revision
+FTS_DDL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE care_search_fts USING fts5("
+        "body, content='care_search_document', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER care_search_document_ai AFTER INSERT ON care_search_document BEGIN "
+        "INSERT INTO care_search_fts(rowid, body) VALUES (new.id, new.body); END",
+        "CREATE TRIGGER care_search_document_ad AFTER DELETE ON care_search_document BEGIN "
+        "INSERT INTO care_search_fts(care_search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+        "CREATE TRIGGER care_search_document_au AFTER UPDATE ON care_search_document BEGIN "
+        "INSERT INTO care_search_fts(care_search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+        "INSERT INTO care_search_fts(rowid, body) VALUES (new.id, new.body); END",
+    ],
+    'postgresql': [
+        "CREATE INDEX ix_care_search_document_body_fts ON care_search_document "
+        "USING gin (to_tsvector('english', body))",
+    ],
+}
+
+
+def upgrade():
+    op.create_table('care_search_document',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rescue_id', sa.Integer(), nullable=False),
+    sa.Column('dog_id', sa.Integer(), nullable=False),
+    sa.Column('source_model', sa.String(length=50), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['dog_id'], ['dog.id'], ),
+    sa.ForeignKeyConstraint(['rescue_id'], ['rescue.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source_model', 'source_id', name='uq_care_search_document_source')
+    )
+    with op.batch_alter_table('care_search_document', schema=None) as batch_op:
+        batch_op.create_index('ix_care_search_document_dog_id', ['dog_id'], unique=False)
+        batch_op.create_index('ix_care_search_document_rescue_id', ['rescue_id'], unique=False)
+
+    for statement in FTS_DDL.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS care_search_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_care_search_document_body_fts')
+
+    with op.batch_alter_table('care_search_document', schema=None) as batch_op:
+        batch_op.drop_index('ix_care_search_document_rescue_id')
+        batch_op.drop_index('ix_care_search_document_dog_id')
+
+    op.drop_table('care_search_document')
@@ -0,0 +1,26 @@
+"""Add dog.history_version for the per-dog history cache
+
+Revision ID: d3a8f1c6e927
+Revises: c9f2a7e4b615
+Create Date: 2026-10-18 23:54:36.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f1c6e927'
+down_revision = 'c9f2a7e4b615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('dog', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('history_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('dog', schema=None) as batch_op:
+        batch_op.drop_column('history_version')
@@ -0,0 +1,38 @@
+"""Denormalize rescue_id onto reminder and add tenant-scoped indexes
+
+Revision ID: d4a9e7c2f815
+Revises: c3d8f1a6e2b4
+Create Date: 2026-10-18 13:05:52.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9e7c2f815'
+down_revision = 'c3d8f1a6e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rescue_id', sa.Integer(), nullable=True))
+
+    # Backfill from the owning dog; every reminder has a dog and every dog a rescue
+    op.execute("UPDATE reminder SET rescue_id = (SELECT dog.rescue_id FROM dog WHERE dog.id = reminder.dog_id)")
+
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.alter_column('rescue_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_reminder_rescue_id_rescue', 'rescue', ['rescue_id'], ['id'])
+        batch_op.create_index('ix_reminder_rescue_id_status_due_datetime', ['rescue_id', 'status', 'due_datetime'], unique=False)
+        batch_op.create_index('ix_reminder_status_due_datetime', ['status', 'due_datetime'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_status_due_datetime')
+        batch_op.drop_index('ix_reminder_rescue_id_status_due_datetime')
+        batch_op.drop_constraint('fk_reminder_rescue_id_rescue', type_='foreignkey')
+        batch_op.drop_column('rescue_id')
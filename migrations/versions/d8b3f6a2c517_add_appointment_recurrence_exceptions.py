@@ -0,0 +1,48 @@
+"""Add appointment.recurrence_until and the appointment_exception table
+
+Revision ID: d8b3f6a2c517
+Revises: c5e1a9d7f342
+Create Date: 2026-10-18 19:12:44.218930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8b3f6a2c517'
+down_revision = 'c5e1a9d7f342'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recurrence_until', sa.Date(), nullable=True))
+
+    op.create_table('appointment_exception',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('appointment_id', sa.Integer(), nullable=False),
+    sa.Column('rescue_id', sa.Integer(), nullable=False),
+    sa.Column('occurrence_start', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('start_datetime', sa.DateTime(), nullable=True),
+    sa.Column('end_datetime', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointment.id'], ),
+    sa.ForeignKeyConstraint(['rescue_id'], ['rescue.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('appointment_id', 'occurrence_start', name='uq_appointment_exception_occurrence')
+    )
+    with op.batch_alter_table('appointment_exception', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_exception_start_datetime', ['start_datetime'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('appointment_exception', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_exception_start_datetime')
+
+    op.drop_table('appointment_exception')
+    with op.batch_alter_table('appointment', schema=None) as batch_op:
+        batch_op.drop_column('recurrence_until')
@@ -0,0 +1,33 @@
+"""Extend the pending-reminder indexes with id for keyset pagination
+
+Revision ID: e4c7a1f9b263
+Revises: d8b3f6a2c517
+Create Date: 2026-10-18 17:42:10.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c7a1f9b263'
+down_revision = 'd8b3f6a2c517'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Reminder pages are ordered and continued on (due_datetime, id)
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_status_due_datetime')
+        batch_op.drop_index('ix_reminder_rescue_id_status_due_datetime')
+        batch_op.create_index('ix_reminder_rescue_id_status_due_datetime_id', ['rescue_id', 'status', 'due_datetime', 'id'], unique=False)
+        batch_op.create_index('ix_reminder_status_due_datetime_id', ['status', 'due_datetime', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reminder', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_status_due_datetime_id')
+        batch_op.drop_index('ix_reminder_rescue_id_status_due_datetime_id')
+        batch_op.create_index('ix_reminder_rescue_id_status_due_datetime', ['rescue_id', 'status', 'due_datetime'], unique=False)
+        batch_op.create_index('ix_reminder_status_due_datetime', ['status', 'due_datetime'], unique=False)
@@ -0,0 +1,53 @@
+"""Add reminder archive table
+
+Revision ID: e81b5c3d9a47
+Revises: d4a9e7c2f815
+Create Date: 2026-10-18 15:21:36.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81b5c3d9a47'
+down_revision = 'd4a9e7c2f815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reminder_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('due_datetime', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('reminder_type', sa.String(length=50), nullable=False),
+    sa.Column('dog_id', sa.Integer(), nullable=False),
+    sa.Column('rescue_id', sa.Integer(), nullable=False),
+    sa.Column('appointment_id', sa.Integer(), nullable=True),
+    sa.Column('dog_medicine_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointment.id'], ),
+    sa.ForeignKeyConstraint(['dog_id'], ['dog.id'], ),
+    sa.ForeignKeyConstraint(['dog_medicine_id'], ['dog_medicine.id'], ),
+    sa.ForeignKeyConstraint(['rescue_id'], ['rescue.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('reminder_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_reminder_archive_appointment_id'), ['appointment_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_reminder_archive_dog_id'), ['dog_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_reminder_archive_dog_medicine_id'), ['dog_medicine_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reminder_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_reminder_archive_dog_medicine_id'))
+        batch_op.drop_index(batch_op.f('ix_reminder_archive_dog_id'))
+        batch_op.drop_index(batch_op.f('ix_reminder_archive_appointment_id'))
+
+    op.drop_table('reminder_archive')
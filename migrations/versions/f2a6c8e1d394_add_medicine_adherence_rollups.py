@@ -0,0 +1,55 @@
+"""Add dose times to dog_medicine_history and the medicine_adherence_day rollup table
+
+Revision ID: f2a6c8e1d394
+Revises: e4c7a1f9b263
+Create Date: 2026-10-18 20:26:31.604822
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6c8e1d394'
+down_revision = 'e4c7a1f9b263'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('dog_medicine_history', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('due_datetime', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('given_at', sa.DateTime(), nullable=True))
+        batch_op.create_unique_constraint('uq_dog_medicine_history_dose', ['dog_medicine_id', 'due_datetime'])
+
+    op.create_table('medicine_adherence_day',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dog_medicine_id', sa.Integer(), nullable=False),
+    sa.Column('dog_id', sa.Integer(), nullable=False),
+    sa.Column('rescue_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('doses_scheduled', sa.Integer(), nullable=True),
+    sa.Column('given_on_time', sa.Integer(), nullable=False),
+    sa.Column('given_late', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['dog_id'], ['dog.id'], ),
+    sa.ForeignKeyConstraint(['dog_medicine_id'], ['dog_medicine.id'], ),
+    sa.ForeignKeyConstraint(['rescue_id'], ['rescue.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dog_medicine_id', 'day', name='uq_medicine_adherence_day')
+    )
+    with op.batch_alter_table('medicine_adherence_day', schema=None) as batch_op:
+        batch_op.create_index('ix_medicine_adherence_day_dog_id_day', ['dog_id', 'day'], unique=False)
+        batch_op.create_index('ix_medicine_adherence_day_rescue_id_day', ['rescue_id', 'day'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('medicine_adherence_day', schema=None) as batch_op:
+        batch_op.drop_index('ix_medicine_adherence_day_rescue_id_day')
+        batch_op.drop_index('ix_medicine_adherence_day_dog_id_day')
+
+    op.drop_table('medicine_adherence_day')
+    with op.batch_alter_table('dog_medicine_history', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_dog_medicine_history_dose', type_='unique')
+        batch_op.drop_column('given_at')
+        batch_op.drop_column('due_datetime')
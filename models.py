@@ -1,7 +1,8 @@
 from extensions import db
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime, date, timedelta
-from sqlalchemy import Index
+from itertools import chain
+from sqlalchemy import DDL, Index, event, inspect, select, update
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
@@ -28,6 +29,9 @@ class Rescue(db.Model):
     data_consent = db.Column(db.Boolean, default=False)
     marketing_consent = db.Column(db.Boolean, default=False)
     
+    # Bumped whenever calendar-visible data of this rescue changes (see the hooks below Reminder)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     users = relationship('User', backref='rescue', lazy=True, foreign_keys='User.rescue_id')
     dogs = relationship('Dog', backref='rescue', lazy=True)
     appointment_types = relationship('AppointmentType', backref='rescue', lazy=True)
@@ -60,6 +64,9 @@ class User(UserMixin, db.Model):
     password_reset_token = db.Column(db.String(100))
     password_reset_expires = db.Column(db.DateTime)
     
+    # Calendar subscription (ICS feed URL); cleared to revoke
+    calendar_feed_token = db.Column(db.String(100), unique=True)
+    
     # Consent tracking
     data_consent = db.Column(db.Boolean, default=False)
     marketing_consent = db.Column(db.Boolean, default=False)
@@ -96,6 +103,15 @@ class User(UserMixin, db.Model):
                 self.password_reset_expires and 
                 self.password_reset_expires > datetime.utcnow())
     
+    def generate_calendar_feed_token(self):
+        """Generate a new calendar feed token, invalidating any previous feed URL."""
+        self.calendar_feed_token = secrets.token_urlsafe(32)
+        return self.calendar_feed_token
+    
+    def revoke_calendar_feed_token(self):
+        """Revoke the calendar feed URL."""
+        self.calendar_feed_token = None
+    
     def is_superadmin(self):
         """Check if user is a superadmin."""
         return self.role == 'superadmin'
@@ -129,6 +145,9 @@ class Dog(db.Model):
     special_story = db.Column(db.Text)                    # Adoption story or special memories
     temperament_tags = db.Column(db.String(200))          # Simple comma-separated tags
     
+    # Bumped on any change to the dog or its history sources; keys the history cache (blueprints/core/history_cache.py)
+    history_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     appointments = relationship('Appointment', backref='dog', lazy=True, cascade='all, delete-orphan')
     medicines = relationship('DogMedicine', backref='dog', lazy=True, cascade='all, delete-orphan')
 
@@ -150,12 +169,44 @@ class Appointment(db.Model):
     end_datetime = db.Column(db.DateTime)
     recurrence = db.Column(db.String(20))  # none, daily, weekly, monthly, yearly, every_x_days, custom_text
     recurrence_value = db.Column(db.Integer)  # for every_x_days
+    recurrence_until = db.Column(db.Date)  # Last day of a recurring series; null = open-ended
     status = db.Column(db.String(20), default='scheduled')  # scheduled, completed, canceled
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     reminders = relationship('Reminder', backref='appointment', lazy=True, cascade='all, delete-orphan')
     creator = relationship('User', foreign_keys=[created_by], backref=db.backref('created_appointments', lazy=True))
+    exceptions = relationship('AppointmentException', backref='appointment', lazy=True, cascade='all, delete-orphan')
+
+    # Recurring appointments are expanded into occurrences on read (see blueprints/core/recurrence.py);
+    # stored rows are never occurrences.
+    is_occurrence = False
+
+    __table_args__ = (
+        Index('ix_appointment_rescue_id_start_datetime', 'rescue_id', 'start_datetime'),
+        Index('ix_appointment_start_datetime', 'start_datetime'),
+    )
+
+class AppointmentException(db.Model):
+    """A single occurrence of a recurring appointment that was canceled, completed or moved."""
+    __tablename__ = 'appointment_exception'
+    id = db.Column(db.Integer, primary_key=True)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'), nullable=False)
+    rescue_id = db.Column(db.Integer, db.ForeignKey('rescue.id'), nullable=False)
+    occurrence_start = db.Column(db.DateTime, nullable=False)  # Start the rule gives this occurrence
+    status = db.Column(db.String(20), nullable=False)  # scheduled (moved), completed, canceled
+    start_datetime = db.Column(db.DateTime)  # Moved start, null = unchanged
+    end_datetime = db.Column(db.DateTime)  # Moved end, null = keep the series' duration
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('appointment_id', 'occurrence_start', name='uq_appointment_exception_occurrence'),
+        Index('ix_appointment_exception_start_datetime', 'start_datetime'),
+    )
+
+    def __repr__(self):
+        return f"<AppointmentException appointment={self.appointment_id} occurrence={self.occurrence_start} {self.status}>"
 
 class MedicinePreset(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -181,6 +232,7 @@ class DogMedicine(db.Model):
     form = db.Column(db.String(100), nullable=True)  # e.g., "Tablet (Oral)", "Injectable (Solution)"
     frequency = db.Column(db.String(100), nullable=False)
     frequency_value = db.Column(db.Integer)  # for every_x_days
+    dose_times = db.Column(db.String(100))  # Comma-separated HH:MM dose times, e.g. "09:00,21:00"
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date)
     notes = db.Column(db.Text)
@@ -192,6 +244,11 @@ class DogMedicine(db.Model):
     history = relationship('DogMedicineHistory', backref='dog_medicine', lazy=True, cascade='all, delete-orphan')
     creator = relationship('User', foreign_keys=[created_by], backref=db.backref('created_dog_medicines', lazy=True))
 
+    __table_args__ = (
+        Index('ix_dog_medicine_rescue_id_start_date', 'rescue_id', 'start_date'),
+        Index('ix_dog_medicine_start_date', 'start_date'),
+    )
+
 class Reminder(db.Model):
     __tablename__ = 'reminder'
     id = db.Column(db.Integer, primary_key=True)
@@ -201,6 +258,8 @@ class Reminder(db.Model):
     reminder_type = db.Column(db.String(50), nullable=False, index=True) # e.g., appointment_upcoming, medicine_due
 
     dog_id = db.Column(db.Integer, db.ForeignKey('dog.id'), nullable=False)
+    # Denormalized from dog.rescue_id for tenant-scoped queries; kept in sync by the hooks below the model
+    rescue_id = db.Column(db.Integer, db.ForeignKey('rescue.id'), nullable=False)
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'), nullable=True)
     dog_medicine_id = db.Column(db.Integer, db.ForeignKey('dog_medicine.id'), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -214,12 +273,141 @@ class Reminder(db.Model):
     # The 'dog_medicine' backref is already defined in the DogMedicine model's 'reminders' relationship.
     user = relationship('User', backref=db.backref('created_reminders', lazy=True)) # User who might have created/triggered this reminder
 
+    # Medicine doses are expanded from their DogMedicine schedule (see blueprints/core/schedules.py);
+    # stored rows are never virtual.
+    is_virtual = False
+
+    __table_args__ = (
+        Index('ix_reminder_dog_medicine_id_due_datetime', 'dog_medicine_id', 'due_datetime'),
+        Index('ix_reminder_rescue_id_status_due_datetime_id', 'rescue_id', 'status', 'due_datetime', 'id'),
+        Index('ix_reminder_status_due_datetime_id', 'status', 'due_datetime', 'id'),
+    )
+
+class ReminderArchive(db.Model):
+    """Acknowledged and dismissed reminders moved out of the hot reminder table (see maintenance.py)."""
+    __tablename__ = 'reminder_archive'
+    id = db.Column(db.Integer, primary_key=True)  # Same id the row had in reminder
+    message = db.Column(db.Text, nullable=False)
+    due_datetime = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    reminder_type = db.Column(db.String(50), nullable=False)
+
+    dog_id = db.Column(db.Integer, db.ForeignKey('dog.id'), nullable=False, index=True)
+    rescue_id = db.Column(db.Integer, db.ForeignKey('rescue.id'), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'), nullable=True, index=True)
+    dog_medicine_id = db.Column(db.Integer, db.ForeignKey('dog_medicine.id'), nullable=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Deleting a dog, appointment or medicine removes its archived reminders too, as it does for live ones
+    dog = relationship('Dog', backref=db.backref('archived_reminders', lazy=True, cascade='all, delete-orphan'))
+    appointment = relationship('Appointment', backref=db.backref('archived_reminders', lazy=True, cascade='all, delete-orphan'))
+    dog_medicine = relationship('DogMedicine', backref=db.backref('archived_reminders', lazy=True, cascade='all, delete-orphan'))
+    user = relationship('User')
+
+    is_virtual = False
+
+    def __repr__(self):
+        return f"<ReminderArchive {self.id} {self.reminder_type} {self.status} dog={self.dog_id}>"
+
+# Reminder.rescue_id mirrors its dog's rescue. Bulk Core inserts (blueprints/core/reminders.py)
+# bypass these hooks and set rescue_id in the row mappings themselves.
+@event.listens_for(Reminder, 'before_insert')
+@event.listens_for(Reminder, 'before_update')
+def _sync_reminder_rescue_id(mapper, connection, target):
+    if target.rescue_id is not None and not inspect(target).attrs.dog_id.history.has_changes():
+        return
+    dog = target.__dict__.get('dog')
+    if dog is not None and dog.id == target.dog_id:
+        target.rescue_id = dog.rescue_id
+    else:
+        target.rescue_id = connection.scalar(select(Dog.rescue_id).where(Dog.id == target.dog_id))
+
+@event.listens_for(Dog, 'after_update')
+def _propagate_dog_rescue_id(mapper, connection, target):
+    if inspect(target).attrs.rescue_id.history.has_changes():
+        connection.execute(
+            update(Reminder.__table__)
+            .where(Reminder.__table__.c.dog_id == target.id)
+            .values(rescue_id=target.rescue_id)
+        )
+
+# Rescue.data_version backs the ETags on the calendar JSON APIs (blueprints/core/etags.py).
+# Any ORM change to calendar-visible rows bumps the owning rescue's version in the same
+# transaction; Core bulk writers in blueprints/core/reminders.py bump it themselves.
+VERSIONED_MODELS = (Dog, Appointment, AppointmentException, AppointmentType, DogMedicine, MedicinePreset, Reminder)
+
+def bump_rescue_data_versions(connection, rescue_ids):
+    """Increment data_version of the given rescues. A None id (global preset) bumps every rescue."""
+    rescue_ids = set(rescue_ids)
+    if not rescue_ids:
+        return
+    rescue_table = Rescue.__table__
+    statement = update(rescue_table).values(data_version=rescue_table.c.data_version + 1)
+    if None not in rescue_ids:
+        statement = statement.where(rescue_table.c.id.in_(rescue_ids))
+    connection.execute(statement)
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_rescue_versions(session, flush_context):
+    rescue_ids = set()
+    for target in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(target, (Rescue,) + VERSIONED_MODELS):
+            continue
+        if target in session.dirty and not session.is_modified(target):
+            continue
+        if isinstance(target, Rescue):
+            rescue_ids.add(target.id)  # Renamed rescues change the superadmin rescue lists
+            continue
+        rescue_ids.add(target.rescue_id)
+        rescue_ids.update(inspect(target).attrs.rescue_id.history.deleted)  # Moved between rescues
+    bump_rescue_data_versions(session.connection(), rescue_ids)
+
 class DogMedicineHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     dog_medicine_id = db.Column(db.Integer, db.ForeignKey('dog_medicine.id'), nullable=False)
     date_given = db.Column(db.Date, default=date.today)
     given_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     notes = db.Column(db.Text)
+    due_datetime = db.Column(db.DateTime)  # Scheduled dose this records, null for unscheduled doses
+    given_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.UniqueConstraint('dog_medicine_id', 'due_datetime', name='uq_dog_medicine_history_dose'),
+    )
+
+class MedicineAdherenceDay(db.Model):
+    """
+    Dose counts for one medicine on one day (the day the doses were due).
+
+    Given counts are incremented as doses are recorded (see adherence.py);
+    doses_scheduled is filled in by the nightly job once the day is over, so
+    missed = doses_scheduled - given for closed days.
+    """
+    __tablename__ = 'medicine_adherence_day'
+    id = db.Column(db.Integer, primary_key=True)
+    dog_medicine_id = db.Column(db.Integer, db.ForeignKey('dog_medicine.id'), nullable=False)
+    dog_id = db.Column(db.Integer, db.ForeignKey('dog.id'), nullable=False)
+    rescue_id = db.Column(db.Integer, db.ForeignKey('rescue.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    doses_scheduled = db.Column(db.Integer)  # Null until the day is closed
+    given_on_time = db.Column(db.Integer, nullable=False, default=0)
+    given_late = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    dog_medicine = relationship('DogMedicine', backref=db.backref('adherence_days', lazy=True, cascade='all, delete-orphan'))
+
+    __table_args__ = (
+        db.UniqueConstraint('dog_medicine_id', 'day', name='uq_medicine_adherence_day'),
+        Index('ix_medicine_adherence_day_rescue_id_day', 'rescue_id', 'day'),
+        Index('ix_medicine_adherence_day_dog_id_day', 'dog_id', 'day'),
+    )
+
+    def __repr__(self):
+        return f"<MedicineAdherenceDay medicine={self.dog_medicine_id} day={self.day}>"
 
 class DogNote(db.Model):
     __tablename__ = 'dog_note'
@@ -240,6 +428,124 @@ class DogNote(db.Model):
     def __repr__(self):
         return f"<DogNote {self.id} - Dog {self.dog_id} - Category {self.category}>"
 
+# Dog.history_version keys the per-dog history cache (blueprints/core/history_cache.py).
+# ORM changes to a dog or anything on its timeline bump it in the same transaction;
+# Core bulk writers in blueprints/core/reminders.py bump it themselves.
+HISTORY_MODELS = (Dog, DogNote, Appointment, DogMedicine, Reminder)
+
+def bump_dog_history_versions(connection, dog_ids):
+    """Increment history_version of the given dogs."""
+    dog_ids = {dog_id for dog_id in dog_ids if dog_id is not None}
+    if not dog_ids:
+        return
+    dog_table = Dog.__table__
+    connection.execute(
+        update(dog_table).where(dog_table.c.id.in_(dog_ids)).values(history_version=dog_table.c.history_version + 1)
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_dog_history_versions(session, flush_context):
+    dog_ids = set()
+    for target in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(target, HISTORY_MODELS):
+            continue
+        if target in session.dirty and not session.is_modified(target):
+            continue
+        if isinstance(target, Dog):
+            if target not in session.deleted:
+                dog_ids.add(target.id)
+            continue
+        dog_ids.add(target.dog_id)
+        dog_ids.update(inspect(target).attrs.dog_id.history.deleted)  # Moved to another dog
+    bump_dog_history_versions(session.connection(), dog_ids)
+
+class DogEvent(db.Model):
+    """
+    One entry of a dog's history timeline (see blueprints/core/dog_events.py).
+
+    Written when the underlying record changes, so history pages read an
+    ordered index range instead of rebuilding the timeline from every source.
+    """
+    __tablename__ = 'dog_event'
+    id = db.Column(db.Integer, primary_key=True)
+    dog_id = db.Column(db.Integer, db.ForeignKey('dog.id'), nullable=False)
+    rescue_id = db.Column(db.Integer, db.ForeignKey('rescue.id'), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    event_type = db.Column(db.String(255), nullable=False)  # e.g. "Note - Medical Observation", "Reminder Acknowledged"
+    description = db.Column(db.Text, nullable=False)
+    author = db.Column(db.String(120))
+    source_model = db.Column(db.String(50), nullable=False)  # Dog, DogNote, Appointment, DogMedicine, Reminder, DogPersonality
+    source_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    dog = relationship('Dog', backref=db.backref('events', lazy='dynamic', passive_deletes='all'))  # Deleted with the dog by a before_delete hook
+
+    __table_args__ = (
+        Index('ix_dog_event_dog_id_timestamp', 'dog_id', 'timestamp'),
+        Index('ix_dog_event_rescue_id_timestamp', 'rescue_id', 'timestamp'),
+        Index('ix_dog_event_timestamp', 'timestamp'),
+        Index('ix_dog_event_source', 'source_model', 'source_id'),
+    )
+
+    @property
+    def dog_name(self):
+        return self.dog.name if self.dog else None
+
+    def __repr__(self):
+        return f"<DogEvent {self.id} dog={self.dog_id} {self.event_type}>"
+
+class CareSearchDocument(db.Model):
+    """
+    Searchable text of a dog, care note or appointment (see blueprints/core/care_search.py).
+
+    The full-text index over body depends on the backend and is created with
+    the table: an FTS5 table kept in sync by triggers on SQLite, a GIN index
+    over to_tsvector('english', body) on PostgreSQL.
+    """
+    __tablename__ = 'care_search_document'
+    id = db.Column(db.Integer, primary_key=True)
+    rescue_id = db.Column(db.Integer, db.ForeignKey('rescue.id'), nullable=False)
+    dog_id = db.Column(db.Integer, db.ForeignKey('dog.id'), nullable=False)
+    source_model = db.Column(db.String(50), nullable=False)  # Dog, DogNote, Appointment
+    source_id = db.Column(db.Integer, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    dog = relationship('Dog')  # Documents are deleted with the dog by a before_delete hook
+
+    __table_args__ = (
+        db.UniqueConstraint('source_model', 'source_id', name='uq_care_search_document_source'),
+        Index('ix_care_search_document_rescue_id', 'rescue_id'),
+        Index('ix_care_search_document_dog_id', 'dog_id'),
+    )
+
+    def __repr__(self):
+        return f"<CareSearchDocument {self.source_model} {self.source_id}>"
+
+# The same statements are run by the migration that adds care_search_document
+CARE_SEARCH_FTS_DDL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE care_search_fts USING fts5("
+        "body, content='care_search_document', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER care_search_document_ai AFTER INSERT ON care_search_document BEGIN "
+        "INSERT INTO care_search_fts(rowid, body) VALUES (new.id, new.body); END",
+        "CREATE TRIGGER care_search_document_ad AFTER DELETE ON care_search_document BEGIN "
+        "INSERT INTO care_search_fts(care_search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+        "CREATE TRIGGER care_search_document_au AFTER UPDATE ON care_search_document BEGIN "
+        "INSERT INTO care_search_fts(care_search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+        "INSERT INTO care_search_fts(rowid, body) VALUES (new.id, new.body); END",
+    ],
+    'postgresql': [
+        "CREATE INDEX ix_care_search_document_body_fts ON care_search_document "
+        "USING gin (to_tsvector('english', body))",
+    ],
+}
+
+for _dialect_name, _statements in CARE_SEARCH_FTS_DDL.items():
+    for _statement in _statements:
+        event.listen(CareSearchDocument.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect_name))
+event.listen(CareSearchDocument.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS care_search_fts').execute_if(dialect='sqlite'))
+
 class AuditLog(db.Model):
     __tablename__ = 'audit_log'
     id = db.Column(db.Integer, primary_key=True)
@@ -288,4 +594,14 @@ class RescueMedicineActivation(db.Model):
     reactivator = relationship('User', foreign_keys=[reactivated_by], backref=db.backref('reactivated_medicine_activations', lazy=True))
 
     def __repr__(self):
-        return f"<RescueMedicineActivation rescue_id={self.rescue_id} medicine_preset_id={self.medicine_preset_id} is_active={self.is_active}>" 
\ No newline at end of file
+        return f"<RescueMedicineActivation rescue_id={self.rescue_id} medicine_preset_id={self.medicine_preset_id} is_active={self.is_active}>" 
+
+class JobLock(db.Model):
+    """Lease row letting one worker process run a periodic background job per interval."""
+    __tablename__ = 'job_lock'
+    name = db.Column(db.String(100), primary_key=True)
+    locked_by = db.Column(db.String(255))
+    locked_until = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<JobLock {self.name} locked_by={self.locked_by} until={self.locked_until}>"
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+Fill the care_search_document full-text search table from dogs, care notes
+and appointments.
+
+Run once after the migration that adds care_search_document; from then on the
+model hooks in blueprints/core/care_search.py keep it current. Safe to re-run:
+documents are replaced.
+
+Usage:
+    python scripts/backfill_care_search.py [--batch-size 500]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from blueprints.core.care_search import rebuild_care_search_documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500, help='Records per transaction')
+    args = parser.parse_args()
+
+    with app.app_context():
+        written = rebuild_care_search_documents(batch_size=args.batch_size)
+    print(f"Wrote {written} search documents")
+
+
+if __name__ == '__main__':
+    main()
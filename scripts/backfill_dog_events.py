@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+"""
+Fill the dog_event history timeline from the source tables.
+
+Run once after the migration that adds dog_event; from then on the model hooks
+in blueprints/core/dog_events.py keep it current. Safe to re-run: each dog's
+events are deleted and regenerated.
+
+Usage:
+    python scripts/backfill_dog_events.py [--dog-id 12 --dog-id 40] [--batch-size 100]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from blueprints.core.dog_events import rebuild_dog_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dog-id', type=int, action='append', dest='dog_ids',
+                        help='Only rebuild this dog (repeatable); default all dogs')
+    parser.add_argument('--batch-size', type=int, default=100, help='Dogs per transaction')
+    args = parser.parse_args()
+
+    with app.app_context():
+        written = rebuild_dog_events(dog_ids=args.dog_ids, batch_size=args.batch_size)
+    print(f"Wrote {written} dog events")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Check and benchmark the calendar event title classifier.
+
+Builds a 5,000-event month (appointments and medicine starts over a few
+hundred dogs and a realistic set of type and medicine names), checks that
+blueprints.core.event_titles produces the same titles as the previous inline
+classification in calendar_events_api (exit status 1 on any mismatch), then
+times both: the inline version with and without its three per-event debug
+prints, and the classifier with a cold and a warm memo.
+
+Usage:
+    python scripts/bench_event_titles.py [--events 5000] [--rounds 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blueprints.core import event_titles
+
+APPOINTMENT_TYPES = [
+    'Vet Visit', 'Vaccination', 'Annual Checkup', 'Grooming', 'Nail Trim', 'Bath', 'Adoption Meet',
+    'Home Visit', 'Spay Surgery', 'Dental Procedure', 'Training', 'Transport', 'RescueComfort NSAID',
+    'Rescue Probiotic', 'Medication Review', 'Heartworm Pill', 'Fish Oil Dose', 'Benadryl Dose',
+    'Rescue Multivitamin', 'Rescue Supplement', 'Dr. Exam', 'Photo Day', 'RescueFlow', '',
+]
+MEDICINE_NAMES = [
+    'Carprofen', 'Rescue Comfort', 'RescueDigest Probiotic', 'Rescue Omega Oil', 'Rescue Multivitamin',
+    'Rescue Calm', 'Benadryl', 'Diphenhydramine', 'Apoquel', 'Gabapentin', 'Metronidazole',
+    'Trazodone', 'Rescue Supplement', 'Fish Oil NSAID', 'Cerenia', 'Simparica Trio',
+]
+DOG_NAME_STEMS = ['Rex', 'Bella', 'Max', 'Luna', 'Charlie', 'Daisy', 'Rocky', 'Molly', 'Buddy', 'Sadie']
+
+
+def build_month(num_events, num_dogs=300, seed=7):
+    """(kind, raw dog name, raw type or medicine name) for a month of events."""
+    rng = random.Random(seed)
+    dogs = []
+    for i in range(num_dogs):
+        stem = DOG_NAME_STEMS[i % len(DOG_NAME_STEMS)]
+        prefix = rng.choice(['', f'{i}-C ', f'{i}-OB ', f'{i} ', f'{i}B '])
+        dogs.append(f'{prefix}{stem} {i // len(DOG_NAME_STEMS)}')
+    events = []
+    for i in range(num_events):
+        if i % 3:
+            events.append(('appointment', rng.choice(dogs), rng.choice(APPOINTMENT_TYPES) or 'Appointment'))
+        else:
+            events.append(('medicine', rng.choice(dogs), rng.choice(MEDICINE_NAMES)))
+    return events
+
+
+def legacy_title(kind, raw_dog_name, raw_name, debug_prints):
+    """The inline classification calendar_events_api used before event_titles existed."""
+    clean_dog_name = raw_dog_name
+    clean_dog_name = re.sub(r'^\d+-[A-Z]+\s+', '', clean_dog_name)
+    clean_dog_name = re.sub(r'^\d+[A-Z]?\s+', '', clean_dog_name)
+
+    clean_name = raw_name
+    name_lower = clean_name.lower()
+    if kind == 'appointment':
+        if any(med in name_lower for med in ['rescue', 'nsaid', 'medication', 'medicine', 'drug', 'pill', 'tablet', 'dose']):
+            if any(word in name_lower for word in ['comfort', 'nsaid', 'pain', 'anti-inflammatory']):
+                clean_name = "Pain Medication"
+            elif any(word in name_lower for word in ['digest', 'probiotic', 'stomach', 'gastro']):
+                clean_name = "Digestive Medication"
+            elif any(word in name_lower for word in ['vitamin', 'supplement', 'nutrition']):
+                clean_name = "Vitamin/Supplement"
+            elif any(word in name_lower for word in ['oil', 'omega', 'fatty']):
+                clean_name = "Nutritional Oil"
+            elif any(word in name_lower for word in ['benadryl', 'diphenhydramine', 'allergy', 'antihistamine']):
+                clean_name = "Allergy Medication"
+            else:
+                clean_name = "Medication"
+        elif any(word in name_lower for word in ['vet', 'visit', 'checkup', 'exam', 'doctor']):
+            clean_name = "Vet Visit"
+        elif any(word in name_lower for word in ['groom', 'bath', 'nail', 'trim']):
+            clean_name = "Grooming"
+        elif any(word in name_lower for word in ['adoption', 'adopt', 'home']):
+            clean_name = "Adoption"
+        elif any(word in name_lower for word in ['surgery', 'operation', 'procedure']):
+            clean_name = "Surgery"
+        else:
+            clean_name = re.sub(r'^Rescue\w*\s*', '', clean_name, flags=re.IGNORECASE)
+            clean_name = re.sub(r'\s*(NSAID|Probiotic|Multivitamin|Supplement)\s*$', '', clean_name, flags=re.IGNORECASE)
+            if not clean_name.strip():
+                clean_name = "Appointment"
+    else:
+        if any(med in name_lower for med in ['rescue', 'nsaid', 'comfort']):
+            if any(word in name_lower for word in ['comfort', 'nsaid', 'pain']):
+                clean_name = "Pain Medication"
+            elif any(word in name_lower for word in ['digest', 'probiotic']):
+                clean_name = "Digestive Medication"
+            elif any(word in name_lower for word in ['oil', 'omega']):
+                clean_name = "Nutritional Oil"
+            elif any(word in name_lower for word in ['vitamin', 'multivitamin']):
+                clean_name = "Vitamin/Supplement"
+            else:
+                clean_name = "Medication"
+        elif any(word in name_lower for word in ['benadryl', 'diphenhydramine']):
+            clean_name = "Allergy Medication"
+        else:
+            clean_name = re.sub(r'^Rescue\w*\s*', '', clean_name, flags=re.IGNORECASE)
+            clean_name = re.sub(r'\s*(NSAID|Probiotic|Multivitamin|Supplement)\s*$', '', clean_name, flags=re.IGNORECASE)
+            if not clean_name.strip():
+                clean_name = "Medication"
+
+    title = f"{clean_dog_name}: {clean_name}"
+    if debug_prints and kind == 'appointment':
+        print(f"[CALENDAR API] Raw dog name: '{raw_dog_name}' -> Clean: '{clean_dog_name}'")
+        print(f"[CALENDAR API] Raw appt type: '{raw_name}' -> Clean: '{clean_name}'")
+        print(f"[CALENDAR API] Final event title: '{title}'")
+    return title
+
+
+def classifier_title(kind, raw_dog_name, raw_name):
+    if kind == 'appointment':
+        category = event_titles.classify_appointment_type(raw_name)
+    else:
+        category = event_titles.classify_medicine_name(raw_name)
+    return f"{event_titles.clean_dog_name(raw_dog_name)}: {category}"
+
+
+def check_equivalence(events):
+    extra = [('appointment', name, name) for name in APPOINTMENT_TYPES + MEDICINE_NAMES + ['   ', 'Rescue']]
+    extra += [('medicine', name, name) for name in APPOINTMENT_TYPES + MEDICINE_NAMES + ['   ', 'Rescue']]
+    mismatches = [(event, legacy_title(*event, False), classifier_title(*event))
+                  for event in set(events) | set(extra)
+                  if legacy_title(*event, False) != classifier_title(*event)]
+    for event, expected, actual in mismatches:
+        print(f"FAIL {event!r}: expected {expected!r}, got {actual!r}")
+    print(f"Equivalence: {len(set(events) | set(extra)) - len(mismatches)} distinct inputs match")
+    return not mismatches
+
+
+def time_month(render, events, rounds, before_round=None):
+    timings = []
+    for _ in range(rounds):
+        if before_round:
+            before_round()
+        start = time.perf_counter()
+        render(events)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    events = build_month(args.events)
+    ok = check_equivalence(events)
+
+    def legacy_with_prints(month):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [legacy_title(*event, True) for event in month]
+
+    def legacy(month):
+        return [legacy_title(*event, False) for event in month]
+
+    def classifier(month):
+        return [classifier_title(*event) for event in month]
+
+    results = [
+        ('inline + debug prints', time_month(legacy_with_prints, events, args.rounds)),
+        ('inline, no prints', time_month(legacy, events, args.rounds)),
+        ('classifier, cold memo', time_month(classifier, events, args.rounds, event_titles.clear_title_cache)),
+        ('classifier, warm memo', time_month(classifier, events, args.rounds)),
+    ]
+    print(f"{args.events}-event month, median of {args.rounds} rounds:")
+    for label, seconds in results:
+        print(f"  {label:<24} {seconds * 1000:8.2f} ms")
+    print(f"memo: {event_titles.classify_appointment_type.cache_info()}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
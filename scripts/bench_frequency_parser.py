@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Check and benchmark the medicine frequency parser.
+
+Runs the table-driven corpus below through parse_medicine_frequency and
+reports any mismatches (exit status 1), then times uncached parses, cached
+parses and parse_many over a realistic mix of frequency texts.
+
+Usage:
+    python scripts/bench_frequency_parser.py [--iterations 100000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blueprints.core.utils import (_parse_normalized_frequency, parse_many,
+                                   parse_medicine_frequency)
+
+# (frequency text, times_per_day, interval_days, is_as_needed, parsed_from)
+CORPUS = [
+    # Empty input
+    (None, 1, 1, False, 'default'),
+    ('', 1, 1, False, 'default'),
+    # Standard abbreviations, any case and spacing
+    ('SID', 1, 1, False, 'exact_match'),
+    ('qd', 1, 1, False, 'exact_match'),
+    ('OD', 1, 1, False, 'exact_match'),
+    ('BID', 2, 1, False, 'exact_match'),
+    (' bid ', 2, 1, False, 'exact_match'),
+    ('TID', 3, 1, False, 'exact_match'),
+    ('QID', 4, 1, False, 'exact_match'),
+    ('q4h', 6, 1, False, 'exact_match'),
+    ('Q6H', 4, 1, False, 'exact_match'),
+    ('q8h', 3, 1, False, 'exact_match'),
+    ('Q12H', 2, 1, False, 'exact_match'),
+    ('q24h', 1, 1, False, 'exact_match'),
+    ('EOD', 1, 2, False, 'exact_match'),
+    ('QOD', 1, 2, False, 'exact_match'),
+    # As needed
+    ('PRN', 0, 1, True, 'exact_match'),
+    ('as needed', 0, 1, True, 'exact_match'),
+    # Phrases
+    ('Once daily', 1, 1, False, 'exact_match'),
+    ('once a day', 1, 1, False, 'exact_match'),
+    ('Daily', 1, 1, False, 'exact_match'),
+    ('Twice  daily', 2, 1, False, 'exact_match'),
+    ('twice a day', 2, 1, False, 'exact_match'),
+    ('three times daily', 3, 1, False, 'exact_match'),
+    ('Four times a day', 4, 1, False, 'exact_match'),
+    ('every other day', 1, 2, False, 'exact_match'),
+    ('Weekly', 1, 7, False, 'exact_match'),
+    ('once a week', 1, 7, False, 'exact_match'),
+    # Times per day patterns
+    ('2x daily', 2, 1, False, 'pattern_match'),
+    ('3x a day', 3, 1, False, 'pattern_match'),
+    ('5 times per day', 5, 1, False, 'pattern_match'),
+    ('1 time daily with food', 1, 1, False, 'pattern_match'),
+    # Hourly patterns
+    ('every 8 hours', 3, 1, False, 'pattern_match'),
+    ('Every 6 hrs', 4, 1, False, 'pattern_match'),
+    ('q2h', 12, 1, False, 'pattern_match'),
+    ('q 3 hours', 8, 1, False, 'pattern_match'),
+    ('every 0 hours', 1, 1, False, 'pattern_match'),
+    ('q48h', 1, 2, False, 'pattern_match'),
+    ('every 72 hours', 1, 3, False, 'pattern_match'),
+    # Day interval patterns
+    ('every 3 days', 1, 3, False, 'pattern_match'),
+    ('q2d', 1, 2, False, 'pattern_match'),
+    ('q14d', 1, 14, False, 'pattern_match'),
+    # Unrecognized
+    ('with breakfast', 1, 1, False, 'fallback'),
+    ('see notes', 1, 1, False, 'fallback'),
+]
+
+# A rescue's medicine list: a handful of distinct texts repeated many times
+WORKLOAD = ['BID', 'SID', 'q8h', 'twice daily', 'PRN', 'EOD', 'every 12 hours', '2x daily', 'with food', 'Weekly'] * 50
+
+
+def check_corpus():
+    failures = []
+    for text, times_per_day, interval_days, is_as_needed, parsed_from in CORPUS:
+        result = parse_medicine_frequency(text)
+        actual = (result['times_per_day'], result['interval_days'], result['is_as_needed'], result['parsed_from'])
+        expected = (times_per_day, interval_days, is_as_needed, parsed_from)
+        if actual != expected:
+            failures.append((text, expected, actual))
+    for text, expected, actual in failures:
+        print(f"FAIL {text!r}: expected {expected}, got {actual}")
+    print(f"Corpus: {len(CORPUS) - len(failures)}/{len(CORPUS)} passed")
+    return not failures
+
+
+def uncached_parse(text):
+    _parse_normalized_frequency.cache_clear()
+    return parse_medicine_frequency(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    ok = check_corpus()
+
+    n = args.iterations
+    texts = WORKLOAD * (n // len(WORKLOAD) + 1)
+    uncached = timeit.timeit(lambda: [uncached_parse(text) for text in texts[:n // 10]], number=1) / (n // 10)
+    cached = timeit.timeit(lambda: [parse_medicine_frequency(text) for text in texts[:n]], number=1) / n
+    batch = timeit.timeit(lambda: parse_many(WORKLOAD), number=n // len(WORKLOAD)) / (n // len(WORKLOAD) * len(WORKLOAD))
+
+    print(f"uncached parse:           {uncached * 1e6:6.2f} us/call")
+    print(f"cached parse:             {cached * 1e6:6.2f} us/call")
+    print(f"parse_many ({len(WORKLOAD)} texts): {batch * 1e6:6.2f} us/text")
+    print(f"cache: {_parse_normalized_frequency.cache_info()}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
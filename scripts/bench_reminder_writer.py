@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-row ORM reminder inserts vs the bulk reminder writer.
+
+Writes the reminders for a 90-day TID medicine course (270 doses) both ways
+and reports the median time per course. Runs against an in-memory SQLite
+database by default; pass --database-url to measure a real server.
+
+Usage:
+    python scripts/bench_reminder_writer.py [--rounds 20] [--database-url URL]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from extensions import db
+from models import Dog, DogMedicine, Reminder, Rescue
+
+
+def create_bench_app(database_url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def build_course_rows(med, dog):
+    """Expand a 90-day TID course into reminder rows."""
+    from blueprints.core.schedules import build_dose_message, expand_dose_schedule
+
+    window_start = datetime.combine(med.start_date, datetime.min.time())
+    window_end = datetime.combine(med.end_date, datetime.max.time())
+    message = build_dose_message(med, 'Three times daily (TID)')
+    return [{
+        'message': message,
+        'due_datetime': due,
+        'status': 'pending',
+        'reminder_type': 'medicine_daily',
+        'dog_id': dog.id,
+        'rescue_id': dog.rescue_id,
+        'dog_medicine_id': med.id,
+    } for due in expand_dose_schedule(med, window_start, window_end)]
+
+
+def write_orm(rows):
+    for row in rows:
+        db.session.add(Reminder(**row))
+    db.session.commit()
+
+
+def write_bulk(rows):
+    from blueprints.core.reminders import insert_reminders
+
+    insert_reminders(rows)
+    db.session.commit()
+
+
+def time_writer(writer, rows, rounds):
+    timings = []
+    for _ in range(rounds):
+        Reminder.query.delete()
+        db.session.commit()
+        start = time.perf_counter()
+        writer(rows)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--database-url', default='sqlite://')
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    with app.app_context():
+        db.create_all()
+        rescue = Rescue(name='Benchmark Rescue')
+        db.session.add(rescue)
+        db.session.flush()
+        dog = Dog(name='Bench', rescue_id=rescue.id)
+        db.session.add(dog)
+        db.session.flush()
+        start_date = date.today()
+        med = DogMedicine(
+            dog_id=dog.id, rescue_id=rescue.id, custom_name='Benchmarkol',
+            dosage='10', unit='mg', frequency='TID',
+            start_date=start_date, end_date=start_date + timedelta(days=89),
+            created_at=datetime.combine(start_date, datetime.min.time())
+        )
+        db.session.add(med)
+        db.session.commit()
+
+        rows = build_course_rows(med, dog)
+        orm_time = time_writer(write_orm, rows, args.rounds)
+        bulk_time = time_writer(write_bulk, rows, args.rounds)
+
+        print(f"90-day TID course: {len(rows)} reminders, median of {args.rounds} rounds")
+        print(f"  ORM session.add per row: {orm_time * 1000:8.2f} ms")
+        print(f"  insert_reminders (bulk): {bulk_time * 1000:8.2f} ms")
+        print(f"  speedup: {orm_time / bulk_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
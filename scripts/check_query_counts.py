@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Assert read endpoints issue a constant number of queries.
+
+Seeds a throwaway SQLite database and requests /dashboard and
+/api/calendar/reminders (first page of every group, then the next page of
+one group) as a rescue admin and as a superadmin, with a small and a large
+set of pending reminders (appointment and medicine reminders plus scheduled
+doses). Counts the SQL statements the request thread executes and exits
+with status 1 if a count grows with the number of reminders or exceeds the
+endpoint's budget in QUERY_BUDGETS.
+
+Usage:
+    python scripts/check_query_counts.py [--small 5] [--large 200] [--verbose]
+"""
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+QUERY_BUDGETS = {
+    # user, rescue list or rescue, pending reminders, medicines to expand doses from, their dose exceptions
+    'dashboard': 5,
+    # user, data version(s), medicines, dose exceptions, group counts, ranked first pages, their dogs, rescue list
+    'reminders API': 9,
+    # user, data version(s), medicines, dose exceptions, page, its dogs
+    'reminders API next page': 7,
+}
+
+
+def seed_reminders(db, models, rescue_id, dog_ids, type_id, preset_id, count, now):
+    for i in range(count):
+        dog_id = dog_ids[i % len(dog_ids)]
+        due = now - timedelta(hours=12) + timedelta(minutes=7 * i) % timedelta(hours=20)
+        if i % 2:
+            appointment = models.Appointment(dog_id=dog_id, rescue_id=rescue_id, type_id=type_id,
+                                             title=f'Checkup {i}', start_datetime=due)
+            db.session.add(appointment)
+            db.session.flush()
+            db.session.add(models.Reminder(message='Appointment', due_datetime=due, status='pending',
+                                           reminder_type='appointment_info', dog_id=dog_id,
+                                           appointment_id=appointment.id))
+        else:
+            medicine = models.DogMedicine(dog_id=dog_id, rescue_id=rescue_id, medicine_id=preset_id,
+                                          dosage='10', unit='mg', frequency='BID', status='active',
+                                          start_date=date.today() - timedelta(days=3))
+            db.session.add(medicine)
+            db.session.flush()
+            db.session.add(models.Reminder(message='Medicine', due_datetime=due, status='pending',
+                                           reminder_type='medicine_start', dog_id=dog_id,
+                                           dog_medicine_id=medicine.id))
+    db.session.commit()
+
+
+def count_request_queries(app, db, user_id, url):
+    from sqlalchemy import event
+
+    statements = []
+    request_thread = threading.get_ident()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        # Background maintenance threads share the engine; only count this request
+        if threading.get_ident() == request_thread:
+            statements.append(statement)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+    if response.status_code != 200:
+        raise SystemExit(f"GET {url} returned {response.status_code}")
+    return statements, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--small', type=int, default=5)
+    parser.add_argument('--large', type=int, default=200)
+    parser.add_argument('--verbose', action='store_true', help='Print the counted statements')
+    args = parser.parse_args()
+
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix='.db')
+    os.close(tmp_fd)
+    os.environ['DATABASE_URL'] = f'sqlite:///{tmp_path}'
+    os.environ.setdefault('SECRET_KEY', secrets.token_hex(32))
+
+    try:
+        import models
+        from app import app
+        from extensions import db
+
+        with app.app_context():
+            db.create_all()
+            rescue = models.Rescue(name='Query Count Rescue', status='approved')
+            db.session.add(rescue)
+            db.session.flush()
+            admin = models.User(name='Admin', email='admin@example.com', role='admin',
+                                rescue_id=rescue.id, password_hash='x')
+            superadmin = models.User(name='Super', email='super@example.com', role='superadmin', password_hash='x')
+            dogs = [models.Dog(name=f'Dog {i}', rescue_id=rescue.id) for i in range(10)]
+            appointment_type = models.AppointmentType(name='Vet Visit', rescue_id=rescue.id)
+            preset = models.MedicinePreset(name='Carprofen', is_global=True)
+            db.session.add_all([admin, superadmin, appointment_type, preset, *dogs])
+            db.session.commit()
+            ids = (rescue.id, [dog.id for dog in dogs], appointment_type.id, preset.id)
+            admin_id, superadmin_id = admin.id, superadmin.id
+
+        now = datetime.now()
+        counts = {}
+        for label, total in (('small', args.small), ('large', args.large)):
+            with app.app_context():
+                seed_reminders(db, models, *ids, total - models.Reminder.query.count(), now)
+            for user_label, user_id in (('admin', admin_id), ('superadmin', superadmin_id)):
+                # limit=1 so both data sets have a next page to follow
+                statements, response = count_request_queries(app, db, user_id, '/api/calendar/reminders?limit=1')
+                cursor = response.get_json()['next_cursors']['Vet Reminders']
+                requests = [
+                    ('dashboard', '/dashboard', None),
+                    ('reminders API', '/api/calendar/reminders?limit=1', statements),
+                    ('reminders API next page', f'/api/calendar/reminders?limit=1&group=Vet%20Reminders&cursor={cursor}', None),
+                ]
+                for endpoint, url, statements in requests:
+                    if statements is None:
+                        statements, _ = count_request_queries(app, db, user_id, url)
+                    counts[(endpoint, user_label, label)] = len(statements)
+                    print(f"{endpoint} as {user_label}, {total} reminders: {len(statements)} queries")
+                    if args.verbose:
+                        for statement in statements:
+                            print(f"   {' '.join(statement.split())[:160]}")
+
+        ok = True
+        for endpoint, budget in QUERY_BUDGETS.items():
+            for user_label in ('admin', 'superadmin'):
+                small, large = counts[(endpoint, user_label, 'small')], counts[(endpoint, user_label, 'large')]
+                if large != small:
+                    print(f"FAIL {endpoint} as {user_label}: query count grew from {small} to {large} with more reminders")
+                    ok = False
+                if large > budget:
+                    print(f"FAIL {endpoint} as {user_label}: {large} queries exceeds its budget of {budget}")
+                    ok = False
+        print("OK" if ok else "FAILED")
+        sys.exit(0 if ok else 1)
+    finally:
+        os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    main()
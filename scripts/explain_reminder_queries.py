@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Query plans for the tenant-scoped reminder queries, before and after the
+denormalized Reminder.rescue_id column and its composite indexes.
+
+Seeds a throwaway database with --reminders rows spread over --rescues
+rescues, then for each hot query prints the plan and median run time of:
+  before: the Reminder.dog.has(rescue_id=...) EXISTS predicate, without the
+          composite indexes
+  after:  the direct Reminder.rescue_id predicate with the composite indexes
+
+Usage:
+    python scripts/explain_reminder_queries.py [--reminders 500000] [--database-url URL]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import insert
+
+from extensions import db
+from models import Dog, Reminder, Rescue
+
+NEW_INDEXES = [index for index in Reminder.__table__.indexes
+               if index.name in ('ix_reminder_rescue_id_status_due_datetime_id', 'ix_reminder_status_due_datetime_id')]
+STATUSES = ['pending'] * 6 + ['acknowledged'] * 3 + ['dismissed']
+REMINDER_TYPES = ['appointment_info', 'appointment_upcoming_24h', 'appointment_upcoming_1h', 'medicine_start', 'medicine_daily']
+
+
+def create_explain_app(database_url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(num_rescues, dogs_per_rescue, num_reminders, now, chunk_size=50000):
+    db.session.execute(insert(Rescue), [{'id': i, 'name': f'Rescue {i}'} for i in range(1, num_rescues + 1)])
+    dogs = [{'id': i, 'name': f'Dog {i}', 'rescue_id': (i - 1) // dogs_per_rescue + 1}
+            for i in range(1, num_rescues * dogs_per_rescue + 1)]
+    db.session.execute(insert(Dog), dogs)
+
+    rng = random.Random(42)
+    for chunk_start in range(0, num_reminders, chunk_size):
+        rows = []
+        for _ in range(min(chunk_size, num_reminders - chunk_start)):
+            dog = rng.choice(dogs)
+            rows.append({
+                'message': 'Seeded reminder',
+                'due_datetime': now + timedelta(minutes=rng.randint(-180 * 24 * 60, 180 * 24 * 60)),
+                'status': rng.choice(STATUSES),
+                'reminder_type': rng.choice(REMINDER_TYPES),
+                'dog_id': dog['id'],
+                'rescue_id': dog['rescue_id'],
+            })
+        db.session.execute(insert(Reminder), rows)
+    db.session.commit()
+
+
+def hot_queries(rescue_predicate, now):
+    """The reminder queries issued by dashboard, calendar_view, get_filtered_reminders and calendar_reminders_api."""
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    pending = Reminder.query.filter(Reminder.status == 'pending', rescue_predicate)
+    return {
+        'dashboard overdue': pending.filter(Reminder.due_datetime < now).order_by(Reminder.due_datetime.asc()),
+        'dashboard today': pending.filter(
+            Reminder.due_datetime >= today_start,
+            Reminder.due_datetime < today_start + timedelta(days=1)
+        ).order_by(Reminder.due_datetime.asc()),
+        'filtered upcoming (page 1)': pending.filter(
+            Reminder.due_datetime >= today_start + timedelta(days=1),
+            Reminder.due_datetime <= now + timedelta(days=7)
+        ).order_by(Reminder.due_datetime.asc()).limit(10),
+        'calendar / reminders API': pending.order_by(Reminder.due_datetime.asc()),
+    }
+
+
+def explain(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    with db.engine.connect() as connection:
+        if db.engine.dialect.name == 'sqlite':
+            params = tuple(compiled.params[name] for name in compiled.positiontup)
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+            return [row[3] for row in rows]
+        rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).fetchall()
+        return [row[0] for row in rows]
+
+
+def median_ms(query, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        query.all()
+        timings.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    return statistics.median(timings) * 1000
+
+
+def report(label, queries, rounds):
+    print(f"=== {label} ===")
+    for name, query in queries.items():
+        print(f"-- {name}: {median_ms(query, rounds):.1f} ms (median of {rounds})")
+        for line in explain(query):
+            print(f"   {line}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reminders', type=int, default=500000)
+    parser.add_argument('--rescues', type=int, default=50)
+    parser.add_argument('--dogs-per-rescue', type=int, default=40)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--database-url', help='Empty database to seed (default: temporary SQLite file)')
+    args = parser.parse_args()
+
+    tmp_path = None
+    if not args.database_url:
+        tmp_fd, tmp_path = tempfile.mkstemp(suffix='.db')
+        os.close(tmp_fd)
+        args.database_url = f'sqlite:///{tmp_path}'
+
+    app = create_explain_app(args.database_url)
+    try:
+        with app.app_context():
+            db.create_all()
+            now = datetime.utcnow()
+            print(f"Seeding {args.reminders} reminders over {args.rescues} rescues...")
+            start = time.perf_counter()
+            seed(args.rescues, args.dogs_per_rescue, args.reminders, now)
+            print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+            rescue_id = args.rescues // 2
+
+            for index in NEW_INDEXES:
+                index.drop(db.engine)
+            db.session.execute(db.text('ANALYZE'))
+            report('before: Reminder.dog.has(rescue_id=...), no composite indexes',
+                   hot_queries(Reminder.dog.has(rescue_id=rescue_id), now), args.rounds)
+
+            for index in NEW_INDEXES:
+                index.create(db.engine)
+            db.session.execute(db.text('ANALYZE'))
+            report('after: Reminder.rescue_id == ..., composite indexes',
+                   hot_queries(Reminder.rescue_id == rescue_id, now), args.rounds)
+
+            db.session.remove()
+            if tmp_path is None:
+                db.drop_all()
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize show more functionality
     initializeShowMore();
     
+    // Listen for reminders becoming due
+    initializeDueReminderStream();
+    
     // Update today's date
     updateTodayDate();
 });
@@ -341,6 +344,70 @@ function checkEmptyTabs() {
     });
 }
 
+// Subscribe to server-pushed "reminder_due" events so overdue reminders show up without a reload
+function initializeDueReminderStream() {
+    if (!window.EventSource || !document.getElementById('overdue-content')) return;
+    
+    const params = new URLSearchParams();
+    const rescueId = new URLSearchParams(window.location.search).get('rescue_id');
+    if (rescueId) {
+        params.append('rescue_id', rescueId);
+    }
+    
+    const source = new EventSource(buildUrlWithParams('/calendar/reminders/stream', params));
+    source.addEventListener('reminder_due', function(e) {
+        const payload = JSON.parse(e.data);
+        handleRemindersDue(payload, rescueId);
+    });
+    window.addEventListener('beforeunload', () => source.close());
+}
+
+// Move reminders that just became due from the today/upcoming tabs into the overdue tab
+function handleRemindersDue(payload, rescueId) {
+    payload.reminder_ids.forEach(id => {
+        document.querySelectorAll(`#today-content [data-reminder-id="${id}"], #upcoming-content [data-reminder-id="${id}"]`)
+            .forEach(item => item.remove());
+    });
+    
+    const content = document.getElementById('overdue-content');
+    const shownCount = content.querySelectorAll('.reminder-item').length;
+    const params = new URLSearchParams();
+    if (rescueId) {
+        params.append('rescue_id', rescueId);
+    }
+    params.append('limit', Math.max(5, shownCount + payload.count).toString());
+    
+    fetch(buildUrlWithParams('/calendar/reminders/overdue', params), {
+        headers: {
+            'HX-Request': 'true'
+        }
+    })
+    .then(response => response.text())
+    .then(html => {
+        const tempDiv = document.createElement('div');
+        tempDiv.innerHTML = html.trim();
+        
+        content.querySelectorAll('.reminder-item, .empty-reminders').forEach(item => item.remove());
+        const showMoreBtn = content.querySelector('.show-more-btn');
+        tempDiv.querySelectorAll('.reminder-item').forEach(item => {
+            content.insertBefore(item, showMoreBtn);
+        });
+        if (showMoreBtn) {
+            // The refreshed list replaced every shown item, so paging continues from its cursor
+            const pageCursor = tempDiv.querySelector('.reminder-page-cursor');
+            showMoreBtn.dataset.cursor = pageCursor ? pageCursor.dataset.nextCursor : '';
+            showMoreBtn.dataset.total = (parseInt(showMoreBtn.dataset.total) || 0) + payload.count;
+        }
+        
+        updateReminderCounts();
+        checkEmptyTabs();
+        showAlert(`${payload.count} reminder${payload.count === 1 ? ' is' : 's are'} now due.`, 'info');
+    })
+    .catch(error => {
+        console.error('Error refreshing overdue reminders:', error);
+    });
+}
+
 // Update today's date
 function updateTodayDate() {
     const todayEl = document.querySelector('.today-date');
@@ -414,7 +481,7 @@ function showMoreReminders(category, btn) {
     const remainingCount = totalCount - currentCount;
     const itemsToShow = Math.min(incrementSize, remainingCount);
     
-    if (itemsToShow <= 0) {
+    if (itemsToShow <= 0 || !btn.dataset.cursor) {
         btn.classList.add('d-none');
         return;
     }
@@ -430,7 +497,8 @@ function showMoreReminders(category, btn) {
     if (rescueId) {
         params.append('rescue_id', rescueId);
     }
-    params.append('offset', currentCount.toString());
+    // Keyset cursor past the last shown item, so reminders completed meanwhile don't shift the page
+    params.append('cursor', btn.dataset.cursor);
     params.append('limit', itemsToShow.toString());
     
     const url = buildUrlWithParams(`/calendar/reminders/${category}`, params);
@@ -472,9 +540,11 @@ function showMoreReminders(category, btn) {
                 smoothScrollToElement(lastNewItem);
             }, 100);
             
-            // Update button text and state
+            // Update button text and state; no next cursor means the last page was reached
+            const pageCursor = tempDiv.querySelector('.reminder-page-cursor');
+            btn.dataset.cursor = pageCursor ? pageCursor.dataset.nextCursor : '';
             const newTotalShown = content.querySelectorAll('.reminder-item').length;
-            const allShown = newTotalShown >= totalCount;
+            const allShown = !pageCursor || newTotalShown >= totalCount;
             updateShowMoreButton(btn, newTotalShown, totalCount, allShown);
         } else {
             // No more items available
@@ -501,7 +571,8 @@ function showLessReminders(category, btn) {
         }
     });
     
-    // Update button state
+    // Update button state; paging restarts after the server-rendered first page
+    btn.dataset.cursor = btn.dataset.initialCursor || '';
     const totalCount = parseInt(btn.dataset.total) || 0;
     const currentVisible = 5; // Now showing first 5
     updateShowMoreButton(btn, currentVisible, totalCount, false);